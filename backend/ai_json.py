@@ -0,0 +1,272 @@
+"""
+🧩 EXTRAGERE ȘI REPARARE JSON DIN RĂSPUNSURILE LLM
+O singură trecere liniară (și incrementală, pe bucăți de stream) găsește primul
+obiect JSON echilibrat din text, ignorând proza și blocurile ``` din jur.
+Defectele frecvente (virgule finale, ghilimele simple, True/None în stil Python,
+răspuns trunchiat) sunt reparate, iar câmpurile lipsă sunt completate, ca mai
+puține răspunsuri să cadă la validare și să coste un apel la alt motor.
+"""
+
+import json
+import re
+from typing import Optional, Any, Dict, List, Tuple
+
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_NUMBER = re.compile(r"-?\d[\d.,]*")
+_GROUPED = re.compile(r"-?\d{1,3}(?:[.,]\d{3})+")
+
+# Câte obiecte {...} candidate se încearcă înainte de a renunța
+MAX_CANDIDATES = 8
+
+# Contoare expuse în /api/v1/metrics
+extraction_stats = {"parsed": 0, "repaired": 0, "truncated": 0, "failed": 0}
+
+
+class JSONObjectScanner:
+    """Găsește incremental primul obiect {...} echilibrat (fiecare caracter e citit o dată)"""
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._start: Optional[int] = None
+        self._stack: List[str] = []
+        self._quote: Optional[str] = None
+        self._escape = False
+        self._scanned = 0
+        self._last_comma: Optional[Tuple[int, List[str]]] = None
+        self.result: Optional[str] = None
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Adaugă text; întoarce obiectul când s-a închis"""
+        if self.result is not None:
+            return self.result
+        self._buffer.append(chunk)
+        text = "".join(self._buffer)
+        self._buffer = [text]
+
+        for i in range(self._scanned, len(text)):
+            char = text[i]
+            if self._start is None:
+                if char == "{":
+                    self._start = i
+                    self._stack.append("}")
+                continue
+
+            if self._quote:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == self._quote:
+                    self._quote = None
+                continue
+
+            if char == '"' or char == "'":
+                self._quote = char
+            elif char == "{":
+                self._stack.append("}")
+            elif char == "[":
+                self._stack.append("]")
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    self.result = text[self._start:i + 1]
+                    self._scanned = i + 1
+                    return self.result
+            elif char == ",":
+                self._last_comma = (i, list(self._stack))
+
+        self._scanned = len(text)
+        return None
+
+    def finish(self) -> Optional[str]:
+        """La sfârșitul textului: obiectul complet sau, dacă e trunchiat, închis forțat"""
+        if self.result is not None or self._start is None:
+            return self.result
+        text = self._buffer[0]
+        extraction_stats["truncated"] += 1
+        if self._last_comma:
+            # Renunță la ultimul element incomplet; cele de dinainte sunt întregi
+            end, stack = self._last_comma
+            return text[self._start:end] + "".join(reversed(stack))
+        return text[self._start:] + (self._quote or "") + "".join(reversed(self._stack))
+
+
+def strip_code_fences(text: str) -> str:
+    """Conținutul primului bloc ```json ... ``` (sau textul, dacă nu există)"""
+    start = text.find("```")
+    if start < 0:
+        return text
+    body_start = text.find("\n", start)
+    end = text.find("```", body_start + 1) if body_start >= 0 else -1
+    if body_start < 0 or end < 0:
+        return text[body_start + 1:] if body_start >= 0 else text
+    return text[body_start + 1:end]
+
+
+def repair_json(fragment: str) -> str:
+    """Virgule finale, ghilimele simple, literali Python, comentarii //"""
+    out: List[str] = []
+    i = 0
+    length = len(fragment)
+    while i < length:
+        char = fragment[i]
+        if char == '"':
+            # String JSON normal: copiat ca atare
+            j = i + 1
+            while j < length and fragment[j] != '"':
+                j += 2 if fragment[j] == "\\" else 1
+            out.append(fragment[i:j + 1])
+            i = j + 1
+        elif char == "'":
+            # String cu ghilimele simple -> ghilimele duble
+            j = i + 1
+            chars = []
+            while j < length and fragment[j] != "'":
+                if fragment[j] == "\\" and j + 1 < length:
+                    chars.append(fragment[j + 1] if fragment[j + 1] == "'" else fragment[j:j + 2])
+                    j += 2
+                    continue
+                chars.append('\\"' if fragment[j] == '"' else fragment[j])
+                j += 1
+            out.append('"' + "".join(chars) + '"')
+            i = j + 1
+        elif char == ",":
+            j = i + 1
+            while j < length and fragment[j].isspace():
+                j += 1
+            if j >= length or fragment[j] not in "}]":
+                out.append(char)
+            i += 1
+        elif char == "/" and fragment.startswith("//", i):
+            newline = fragment.find("\n", i)
+            i = length if newline < 0 else newline
+        elif char.isalpha():
+            j = i
+            while j < length and (fragment[j].isalnum() or fragment[j] == "_"):
+                j += 1
+            word = fragment[i:j]
+            out.append(_PY_LITERALS.get(word, word))
+            i = j
+        else:
+            out.append(char)
+            i += 1
+    return "".join(out)
+
+
+def _parse_fragment(fragment: str) -> Optional[Dict[str, Any]]:
+    """Obiectul din fragment (direct sau după reparare); None dacă nu e un obiect JSON"""
+    try:
+        parsed = json.loads(fragment, strict=False)
+        stat = "parsed"
+    except ValueError:
+        try:
+            parsed = json.loads(repair_json(fragment), strict=False)
+            stat = "repaired"
+        except ValueError:
+            return None
+    if not isinstance(parsed, dict):
+        return None
+    extraction_stats[stat] += 1
+    return parsed
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Primul obiect JSON valid din text, reparat dacă e nevoie; None dacă nu există
+
+    Acoladele din proză ("Text {cu acolade} apoi {...}") dau candidați care nu
+    se parsează: scanarea continuă de la următoarea acoladă deschisă.
+    """
+    if not text:
+        extraction_stats["failed"] += 1
+        return None
+
+    text = strip_code_fences(text)
+    start = text.find("{")
+    for _ in range(MAX_CANDIDATES):
+        if start < 0:
+            break
+        scanner = JSONObjectScanner()
+        fragment = scanner.feed(text[start:]) or scanner.finish()
+        parsed = _parse_fragment(fragment) if fragment is not None else None
+        if parsed is not None:
+            return parsed
+        start = text.find("{", start + 1)
+
+    extraction_stats["failed"] += 1
+    return None
+
+
+def _parse_number(token: str) -> Optional[float]:
+    """Un număr cu separatori de mii și/sau zecimale, în stil RO sau EN; None dacă e ambiguu
+
+    "1.200" / "1,200" -> 1200 (separator urmat de exact 3 cifre), "1.200,50" /
+    "1,200.50" -> 1200.5 (ultimul separator e cel zecimal), "0,850" -> 0.85.
+    """
+    token = token.rstrip(".,")
+    commas, dots = token.count(","), token.count(".")
+    if commas and dots:
+        decimal = "," if token.rfind(",") > token.rfind(".") else "."
+        whole, _, fraction = token.rpartition(decimal)
+        # Separatorul zecimal o singură dată, iar cel de mii strict pe grupe de 3
+        if decimal in whole or not _GROUPED.fullmatch(whole):
+            return None
+        return float(re.sub(r"[.,]", "", whole) + "." + fraction)
+    if commas + dots == 0:
+        return float(token)
+
+    separator = "," if commas else "."
+    whole, _, fraction = token.partition(separator)
+    if commas + dots > 1:
+        # Mai multe apariții: doar separator de mii ("1.200.000")
+        return float(re.sub(r"[.,]", "", token)) if _GROUPED.fullmatch(token) else None
+    if len(fraction) == 3 and whole.lstrip("-") not in ("", "0"):
+        return float(whole + fraction)
+    return float(whole + "." + fraction)
+
+
+def _as_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        # "1.200 RON", "1,200.50 RON", "1 200,50 lei" -> 1200 / 1200.5 / 1200.5
+        text = re.sub(r"[\s\u00a0\u202f]", "", value)
+        match = _NUMBER.search(text)
+        if match:
+            return _parse_number(match.group())
+    return None
+
+
+def _as_list(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(item) for item in value if item not in (None, "")]
+    if isinstance(value, str) and value.strip():
+        parts = [part.strip(" -•\t") for part in re.split(r"\n|;", value)]
+        return [part for part in parts if part]
+    return []
+
+
+def normalize_diagnostic(data: Dict[str, Any], defaults: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Aduce câmpurile la tipurile cerute de validate_ai_response și completează lipsurile"""
+    result = dict(data)
+    result["problems"] = _as_list(data.get("problems"))
+    result["solutions"] = _as_list(data.get("solutions"))
+
+    if not data.get("diagnostic") and result["problems"]:
+        result["diagnostic"] = "; ".join(result["problems"][:2])
+
+    price = _as_number(data.get("total_price"))
+    if price is not None:
+        result["total_price"] = max(0.0, price)
+
+    confidence = _as_number(data.get("ai_confidence"))
+    if confidence is not None:
+        # Unele modele răspund în procente
+        result["ai_confidence"] = confidence / 100 if 1 < confidence <= 100 else confidence
+
+    for key, value in (defaults or {}).items():
+        if result.get(key) in (None, "", []):
+            result[key] = value
+    return result
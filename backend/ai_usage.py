@@ -0,0 +1,167 @@
+"""
+🧮 CONSUM DE TOKENI ȘI COST PER MOTOR AI
+Extrage din răspunsurile furnizorilor tokenii de prompt/completare și latența
+raportată (Ollama: eval_duration, prompt_eval_duration), estimează costul și
+agregă totul în memorie, ca max_tokens, dimensiunea promptului și ordinea
+motoarelor să poată fi reglate pe baza datelor.
+"""
+
+import os
+import threading
+from collections import defaultdict, deque
+from typing import Optional, Any, Deque, Dict
+
+# USD per 1M tokeni (input, output); suprascrise prin AI_PRICE_<MOTOR>_INPUT/OUTPUT
+DEFAULT_PRICES = {
+    "openai": (0.50, 1.50),
+    "gemini": (0.125, 0.375),
+    "local": (0.0, 0.0),
+}
+
+LATENCY_WINDOW = 500  # ultimele N latențe per motor, pentru percentile
+
+
+def engine_prices(engine: str) -> tuple:
+    """Prețurile (input, output) per 1M tokeni pentru motor"""
+    default_in, default_out = DEFAULT_PRICES.get(engine, (0.0, 0.0))
+    prefix = f"AI_PRICE_{engine.upper()}"
+    return (
+        float(os.getenv(f"{prefix}_INPUT", default_in)),
+        float(os.getenv(f"{prefix}_OUTPUT", default_out)),
+    )
+
+
+def build_usage(
+    engine: str,
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    latency_ms: float,
+    provider_ms: Optional[float] = None,
+    prompt_chars: int = 0,
+    **extra: Any,
+) -> Dict[str, Any]:
+    """Înregistrarea de consum atașată răspunsului"""
+    price_in, price_out = engine_prices(engine)
+    usage = {
+        "engine": engine,
+        "model": model,
+        "prompt_tokens": int(prompt_tokens or 0),
+        "completion_tokens": int(completion_tokens or 0),
+        "total_tokens": int(prompt_tokens or 0) + int(completion_tokens or 0),
+        "latency_ms": round(latency_ms, 2),
+        "provider_ms": round(provider_ms, 2) if provider_ms is not None else None,
+        "prompt_chars": prompt_chars,
+        "cost_usd": round(
+            ((prompt_tokens or 0) * price_in + (completion_tokens or 0) * price_out) / 1_000_000, 8
+        ),
+    }
+    usage.update(extra)
+    return usage
+
+
+def openai_usage(body: Dict[str, Any], model: str, latency_ms: float, prompt_chars: int = 0) -> Dict[str, Any]:
+    usage = body.get("usage") or {}
+    return build_usage(
+        "openai",
+        body.get("model", model),
+        usage.get("prompt_tokens", 0),
+        usage.get("completion_tokens", 0),
+        latency_ms,
+        prompt_chars=prompt_chars,
+        finish_reason=(body.get("choices") or [{}])[0].get("finish_reason"),
+    )
+
+
+def gemini_usage(body: Dict[str, Any], model: str, latency_ms: float, prompt_chars: int = 0) -> Dict[str, Any]:
+    usage = body.get("usageMetadata") or {}
+    return build_usage(
+        "gemini",
+        model,
+        usage.get("promptTokenCount", 0),
+        usage.get("candidatesTokenCount", 0),
+        latency_ms,
+        prompt_chars=prompt_chars,
+        finish_reason=(body.get("candidates") or [{}])[0].get("finishReason"),
+    )
+
+
+def ollama_usage(body: Dict[str, Any], model: str, latency_ms: float, prompt_chars: int = 0) -> Dict[str, Any]:
+    # Ollama raportează duratele în nanosecunde
+    def ms(key: str) -> Optional[float]:
+        value = body.get(key)
+        return value / 1_000_000 if value is not None else None
+
+    total_ms = ms("total_duration")
+    eval_ms = ms("eval_duration")
+    eval_count = body.get("eval_count", 0)
+    return build_usage(
+        "local",
+        body.get("model", model),
+        body.get("prompt_eval_count", 0),
+        eval_count,
+        latency_ms,
+        provider_ms=total_ms,
+        prompt_chars=prompt_chars,
+        prompt_eval_ms=ms("prompt_eval_duration"),
+        eval_ms=eval_ms,
+        load_ms=ms("load_duration"),
+        tokens_per_second=round(eval_count / (eval_ms / 1000), 2) if eval_ms else None,
+    )
+
+
+def _percentile(values, fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 2)
+
+
+class UsageStats:
+    """Agregate per motor: apeluri, tokeni, cost, latențe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def record(self, engine: str, usage: Optional[Dict[str, Any]], valid: bool):
+        """Un apel terminat (200 de la furnizor), valid sau nu după parsare/validare"""
+        if not usage:
+            return
+        with self._lock:
+            totals = self._totals[engine]
+            totals["calls"] += 1
+            totals["valid"] += 1 if valid else 0
+            totals["prompt_tokens"] += usage["prompt_tokens"]
+            totals["completion_tokens"] += usage["completion_tokens"]
+            totals["prompt_chars"] += usage.get("prompt_chars", 0)
+            totals["cost_usd"] += usage["cost_usd"]
+            if usage.get("finish_reason") in ("length", "MAX_TOKENS"):
+                totals["truncated"] += 1
+            self._latencies[engine].append(usage["latency_ms"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            result = {}
+            for engine, totals in self._totals.items():
+                calls = totals["calls"] or 1
+                latencies = self._latencies[engine]
+                result[engine] = {
+                    "calls": int(totals["calls"]),
+                    "valid_responses": int(totals["valid"]),
+                    "truncated": int(totals["truncated"]),
+                    "prompt_tokens": int(totals["prompt_tokens"]),
+                    "completion_tokens": int(totals["completion_tokens"]),
+                    "avg_prompt_tokens": round(totals["prompt_tokens"] / calls, 1),
+                    "avg_completion_tokens": round(totals["completion_tokens"] / calls, 1),
+                    "avg_prompt_chars": round(totals["prompt_chars"] / calls, 1),
+                    "cost_usd": round(totals["cost_usd"], 6),
+                    "cost_per_valid_usd": round(totals["cost_usd"] / totals["valid"], 6) if totals["valid"] else None,
+                    "latency_p50_ms": _percentile(latencies, 0.5),
+                    "latency_p95_ms": _percentile(latencies, 0.95),
+                }
+            return result
+
+
+usage_stats = UsageStats()
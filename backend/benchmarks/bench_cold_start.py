@@ -0,0 +1,86 @@
+"""
+📊 BENCHMARK COLD START
+Măsoară timpul de import al aplicației (`import main`) în procese noi și îl
+compară cu bugetul COLD_START_BUDGET_MS. Afișează și cele mai lente importuri
+(stil `python -X importtime`).
+
+Rulare: python benchmarks/bench_cold_start.py [repetări]
+Cod de ieșire 1 dacă mediana depășește bugetul.
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", "1500"))
+
+IMPORT_APP = "import main"
+
+
+def measure_once() -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", IMPORT_APP],
+        cwd=BACKEND_DIR,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_interpreter() -> float:
+    """Costul interpretorului gol, scăzut din timpul aplicației"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def slowest_imports(top: int = 15):
+    """Rulează `-X importtime` și întoarce modulele cu cel mai mare timp cumulativ"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_APP],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            rows.append((int(match.group(2)), int(match.group(1)), match.group(4).strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    measure_once()  # încălzește cache-ul de fișiere și .pyc
+    interpreter_ms = statistics.median(measure_interpreter() for _ in range(runs))
+    samples = [measure_once() for _ in range(runs)]
+    median_ms = statistics.median(samples)
+    app_ms = median_ms - interpreter_ms
+
+    print(f"Repetări: {runs}")
+    print(f"Interpretor gol:     {interpreter_ms:8.1f} ms")
+    print(f"import main (median): {median_ms:8.1f} ms  (min {min(samples):.1f}, max {max(samples):.1f})")
+    print(f"Cost aplicație:      {app_ms:8.1f} ms  (buget {BUDGET_MS:.0f} ms)")
+
+    print("\nCele mai lente importuri (cumulativ µs | self µs | modul):")
+    for cumulative, own, module in slowest_imports():
+        print(f"  {cumulative:>9} | {own:>8} | {module}")
+
+    if app_ms > BUDGET_MS:
+        print(f"\n❌ Cold start peste buget: {app_ms:.1f} ms > {BUDGET_MS:.0f} ms")
+        sys.exit(1)
+    print("\n✅ Cold start în buget")
+
+
+if __name__ == "__main__":
+    main()
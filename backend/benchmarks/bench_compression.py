@@ -0,0 +1,170 @@
+"""
+📊 BENCHMARK COMPRIMARE RĂSPUNSURI: OCTEȚI PE FIR vs CPU
+Pe payload-uri reprezentative (răspuns de diagnostic cu obd2_analysis complet,
+/api/v1/obd2/data, deviz de flotă JSON și NDJSON în streaming) compară fiecare
+codare/nivel disponibil: mărime, raport, timp de comprimare pe server,
+decomprimare pe client și timpul total estimat pe o legătură mobilă
+(comprimare + transfer + decomprimare).
+
+Rulare: python benchmarks/bench_compression.py [vehicule_în_lot]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compression import AVAILABLE_ENCODINGS, ResponseCompressor, brotli, zstandard  # noqa: E402
+from obd2_analysis import analyze_obd2_data  # noqa: E402
+from obd2_sample import to_api  # noqa: E402
+from obd2_scenarios import get_cycle  # noqa: E402
+from pricing import DEFAULT_TABLE_PATH, PricingEngine  # noqa: E402
+
+# Niveluri încercate per codare (primul e cel implicit al serverului)
+LEVELS = {"gzip": (6, 1, 9), "br": (4, 1, 11), "zstd": (3, 1, 10)}
+
+# Legături tipice pentru clienții mobili (Mbit/s)
+LINKS = (("3G", 1.0), ("LTE", 10.0))
+
+NDJSON_CHUNK = 500
+
+
+def diagnostic_payload() -> bytes:
+    """DiagnosticResponse cu obd2_analysis complet (scenariul de supraîncălzire)"""
+    sample = get_cycle("overheating").sample(900, time.time())
+    analysis = analyze_obd2_data(sample, ["P0217", "P0128"])
+    return json.dumps({
+        "diagnostic": (
+            "Motorul se supraîncălzește în trafic urban: temperatura lichidului de răcire depășește "
+            "105°C la ralanti, iar ventilatorul nu pornește. Codurile P0217 și P0128 indică "
+            "un termostat blocat sau un senzor de temperatură defect."
+        ),
+        "problems": ["Supraîncălzire motor - termostat blocat", "Ventilator răcire inactiv"],
+        "solutions": [
+            "Înlocuire termostat și garnitură",
+            "Verificare releu și motor ventilator",
+            "Aerisire circuit răcire și completare antigel",
+        ],
+        "total_price": 1180.0,
+        "ai_confidence": 0.86,
+        "processing_time": "2.41s",
+        "ai_engine_used": "openai",
+        "car_type": "Dacia",
+        "model": "Logan",
+        "timestamp": "2026-10-19T10:15:00",
+        "obd2_analysis": analysis,
+        "diagnostic_id": "3f1c2a9e-7b44-4c1e-9a0d-5d2e8b6f1a70",
+        "usage": {"engine": "openai", "input_tokens": 812, "output_tokens": 264, "cost_usd": 0.00041},
+        "routing": {"tier": "complex", "reason": "dtc_and_live_data"},
+        "provisional": False,
+    }, ensure_ascii=False).encode()
+
+
+def obd2_data_payload() -> bytes:
+    sample = get_cycle("city").sample(400, time.time())
+    return json.dumps({
+        "status": "success",
+        "data": to_api(sample),
+        "versions": {"live": 400, "dtc": 1},
+        "timestamp": "2026-10-19T10:15:00",
+    }).encode()
+
+
+def fleet_quotes(count: int):
+    rng = random.Random(7)
+    engine = PricingEngine(DEFAULT_TABLE_PATH, 3600)
+    vehicles = [
+        {
+            "car_type": rng.choice(["dacia", "vw", "bmw", "renault", "skoda"]),
+            "model": rng.choice(["logan", "golf", "seria 3", "clio", "octavia"]),
+            "year": rng.randint(2008, 2022),
+            "mileage": rng.randint(20000, 300000),
+            "simptome": rng.sample(["consum mare", "rateuri motor", "temperatură mare", "pornire grea"], k=2),
+            "coduri_dtc": rng.sample(["P0171", "P0300", "P0420", "P0217", "P0562"], k=rng.randint(0, 2)),
+        }
+        for _ in range(count)
+    ]
+    return engine.quote_batch(vehicles)
+
+
+def ndjson_chunks(quotes):
+    return [
+        "".join(json.dumps(quote, ensure_ascii=False) + "\n" for quote in quotes[start:start + NDJSON_CHUNK]).encode()
+        for start in range(0, len(quotes), NDJSON_CHUNK)
+    ]
+
+
+def decompressor(encoding: str):
+    if encoding == "gzip":
+        return lambda data: zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(data)
+    if encoding == "br":
+        return brotli.decompress
+    return lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def compress_chunks(compressor: ResponseCompressor, encoding: str, chunks) -> bytes:
+    """Ca middleware-ul în streaming: flush după fiecare bucată, finish la ultima"""
+    encoder = compressor.encoder(encoding)
+    out = []
+    for index, chunk in enumerate(chunks):
+        out.append(encoder.compress(chunk))
+        out.append(encoder.flush() if index < len(chunks) - 1 else encoder.finish())
+    return b"".join(out)
+
+
+def report(label: str, chunks, repeat: int):
+    raw = sum(len(chunk) for chunk in chunks)
+    print(f"\n{label}: {raw:,} B necomprimat" + (f", {len(chunks)} bucăți" if len(chunks) > 1 else ""))
+    header = f"{'codare':<10}{'octeți':>11}{'raport':>8}{'comprimare':>13}{'decomprimare':>14}"
+    header += "".join(f"{'total ' + name:>13}" for name, _ in LINKS)
+    print(header)
+    identity = "".join(f"{raw * 8 / (mbps * 1e6) * 1000:>10.1f} ms" for _, mbps in LINKS)
+    print(f"{'identity':<10}{raw:>11,}{1.0:>8.3f}{'-':>13}{'-':>14}{identity}")
+
+    for encoding in AVAILABLE_ENCODINGS:
+        for level in LEVELS[encoding]:
+            compressor = ResponseCompressor(gzip_level=level, brotli_quality=level, zstd_level=level)
+            compress = lambda: compress_chunks(compressor, encoding, chunks)  # noqa: E731
+            body = compress()
+            seconds = best_of(compress, repeat)
+            decode = decompressor(encoding)
+            decode_seconds = best_of(lambda: decode(body), repeat)
+            totals = "".join(
+                f"{(seconds + decode_seconds + len(body) * 8 / (mbps * 1e6)) * 1000:>10.1f} ms" for _, mbps in LINKS
+            )
+            print(f"{f'{encoding}-{level}':<10}{len(body):>11,}{len(body) / raw:>8.3f}"
+                  f"{seconds * 1e3:>10.3f} ms{decode_seconds * 1e3:>11.3f} ms{totals}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    missing = [name for name in ("br", "zstd") if name not in AVAILABLE_ENCODINGS]
+    print(f"Codări disponibile: {', '.join(AVAILABLE_ENCODINGS)}"
+          + (f" (lipsesc: {', '.join(missing)} - pip install brotli zstandard)" if missing else ""))
+
+    quotes = fleet_quotes(count)
+    report("Răspuns diagnostic (DiagnosticResponse + obd2_analysis)", [diagnostic_payload()], 200)
+    report("/api/v1/obd2/data", [obd2_data_payload()], 200)
+    report(f"/api/v1/pricing/batch JSON ({count} vehicule)",
+           [json.dumps({"status": "success", "count": len(quotes), "quotes": quotes}, ensure_ascii=False).encode()], 10)
+    report(f"/api/v1/pricing/batch NDJSON ({count} vehicule)", ndjson_chunks(quotes), 10)
+
+    print(f"\nTotal = comprimare pe server + transfer + decomprimare pe client; "
+          f"prag server {ResponseCompressor().min_size} B (sub el răspunsul pleacă necomprimat)")
+
+
+if __name__ == "__main__":
+    main()
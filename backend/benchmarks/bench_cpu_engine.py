@@ -0,0 +1,84 @@
+"""
+📊 BENCHMARK MOTOR CPU (CLASIFICATOR PE ISTORIC)
+Antrenare pe diagnostice sintetice, latența unei predicții și latența per
+cerere cu N cereri concurente grupate în loturi.
+
+Rulare: python benchmarks/bench_cpu_engine.py [exemple_antrenare] [cereri_concurente]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cpu_engine import BatchingPredictor, DiagnosticClassifier  # noqa: E402
+from pricing import DEFAULT_TABLE_PATH, PricingEngine  # noqa: E402
+
+CASES = [
+    (["P0300", "P0301"], ["rateuri motor", "vibrații la ralanti"], "Aprindere defectuoasă cilindrul 1", 850),
+    (["P0171"], ["consum mare", "lipsă putere"], "Amestec sărac - admisie neetanșă", 600),
+    (["P0420"], ["miros de ars"], "Catalizator ineficient", 3200),
+    (["P0562"], ["pornire grea", "lumini slabe"], "Tensiune sistem scăzută - alternator", 1400),
+    (["P0217"], ["temperatură mare", "abur din motor"], "Supraîncălzire motor - termostat blocat", 1100),
+    (["P0700", "P0730"], ["schimbări greoaie"], "Defect transmisie automată", 4500),
+]
+
+
+def synthetic_request(rng: random.Random):
+    codes, symptoms, problem, price = rng.choice(CASES)
+    car = {
+        "car_type": rng.choice(["dacia", "vw", "bmw"]),
+        "model": "test",
+        "year": rng.randint(2008, 2022),
+        "simptome": rng.sample(symptoms, k=rng.randint(1, len(symptoms))),
+        "coduri_dtc": list(codes),
+    }
+    response = {
+        "problems": [problem],
+        "solutions": [f"Verificare: {problem.lower()}"],
+        "total_price": price * rng.uniform(0.8, 1.2),
+    }
+    return car, response
+
+
+async def concurrent(predictor: BatchingPredictor, requests):
+    return await asyncio.gather(*(predictor.predict(car) for car, _ in requests))
+
+
+def main():
+    examples = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    rng = random.Random(7)
+
+    pricing = PricingEngine(DEFAULT_TABLE_PATH, 3600)
+    classifier = DiagnosticClassifier(pricer=lambda car, obd2: pricing.quote(car, obd2)["total"])
+    started = time.perf_counter()
+    for _ in range(examples):
+        classifier.learn(*synthetic_request(rng))
+    print(f"Antrenare: {examples} exemple în {(time.perf_counter() - started) * 1000:.1f} ms -> {classifier.stats()}")
+
+    requests = [synthetic_request(rng) for _ in range(concurrency)]
+    started = time.perf_counter()
+    correct = 0
+    for car, response in requests:
+        result = classifier.predict(car)
+        correct += bool(result) and result["problems"][0] == response["problems"][0]
+    single_ms = (time.perf_counter() - started) * 1000 / len(requests)
+    print(f"Predicție individuală: {single_ms:.3f} ms/cerere, acuratețe top-1 {correct / len(requests):.1%}")
+
+    predictor = BatchingPredictor(classifier)
+    started = time.perf_counter()
+    asyncio.run(concurrent(predictor, requests))
+    elapsed = (time.perf_counter() - started) * 1000
+    stats = predictor.stats()
+    print(
+        f"{concurrency} cereri concurente: {elapsed:.1f} ms total, "
+        f"lot mediu {stats['avg_batch_size']}, p50 {stats['latency_p50_ms']} ms, p95 {stats['latency_p95_ms']} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
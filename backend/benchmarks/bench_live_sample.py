@@ -0,0 +1,104 @@
+"""
+📊 BENCHMARK MOSTRĂ LIVE: DICȚIONAR vs LiveSample (__slots__)
+Memoria per mostră păstrată (tracemalloc) și mostre/s pentru generare,
+analiză, sumar de drum, frame binar /ws/obd2 și conversia la granița API,
+comparând formatul vechi (dicționar cu 16 chei, timestamp ISO) cu schema fixă.
+
+Rulare: python benchmarks/bench_live_sample.py [mostre]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_ingest import DriveSummary  # noqa: E402
+from obd2_analysis import analyze_obd2_data  # noqa: E402
+from obd2_protocol import LiveFrameEncoder  # noqa: E402
+from obd2_sample import SIGNALS  # noqa: E402
+from obd2_scenarios import get_cycle  # noqa: E402
+
+
+def dict_sample(cycle, index: int, timestamp: str):
+    """Formatul de dinainte: un dicționar per mostră, timestamp ISO"""
+    index %= cycle.length
+    sample = {"engine_on": bool(cycle.engine_on[index])}
+    for name in SIGNALS:
+        sample[name] = cycle.signals[name][index]
+    sample["timestamp"] = timestamp
+    return sample
+
+
+def retained_bytes(build, count: int) -> float:
+    """Octeți alocați per mostră pentru count mostre ținute simultan în memorie"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    samples = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del samples
+    return (after - before) / count
+
+
+def rate(label: str, count: int, elapsed: float, baseline: float = None):
+    speedup = f"  x{baseline / elapsed:.2f}" if baseline else ""
+    print(f"{label:<34}{count / elapsed:>14,.0f} mostre/s  ({elapsed * 1e6 / count:.2f} µs){speedup}")
+
+
+def timed(func, samples) -> float:
+    started = time.perf_counter()
+    func(samples)
+    return time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    cycle = get_cycle("city")
+    now = time.time()
+    iso = datetime.fromtimestamp(now).isoformat()
+
+    # Fiecare mostră cu timestamp propriu, ca într-o sesiune reală
+    dict_bytes = retained_bytes(lambda i: dict_sample(cycle, i, datetime.fromtimestamp(now + i / 10).isoformat()), count)
+    slot_bytes = retained_bytes(lambda i: cycle.sample(i, now + i / 10), count)
+    print(f"Memorie per mostră: dicționar {dict_bytes:.0f} B, LiveSample {slot_bytes:.0f} B "
+          f"({dict_bytes / slot_bytes:.1f}x mai puțin)\n")
+
+    baseline = timed(lambda _: [dict_sample(cycle, k, iso) for k in range(count)], None)
+    rate("generare (dicționar)", count, baseline)
+    rate("generare (LiveSample)", count, timed(lambda _: [cycle.sample(k, now) for k in range(count)], None), baseline)
+
+    dicts = [dict_sample(cycle, k, iso) for k in range(count)]
+    slots = [cycle.sample(k, now) for k in range(count)]
+
+    def analyze(samples):
+        for sample in samples:
+            analyze_obd2_data(sample, [])
+
+    def summarize(samples):
+        summary = DriveSummary(0)
+        for sample in samples:
+            summary.add(sample)
+
+    def encode(samples):
+        encoder = LiveFrameEncoder()
+        for sample in samples:
+            encoder.encode(sample)
+
+    def boundary(samples):
+        for sample in samples:
+            sample.to_dict()
+
+    for label, func in (("analyze_obd2_data", analyze), ("DriveSummary.add", summarize), ("frame binar /ws/obd2", encode)):
+        # DriveSummary.add scoate dtc_codes din dicționar: fiecare rulare primește copii
+        baseline = timed(func, [dict(sample) for sample in dicts] if func is summarize else dicts)
+        rate(f"{label} (dicționar)", count, baseline)
+        rate(f"{label} (LiveSample)", count, timed(func, slots), baseline)
+
+    rate("to_dict() la granița API", count, timed(boundary, slots))
+
+
+if __name__ == "__main__":
+    main()
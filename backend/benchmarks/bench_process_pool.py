@@ -0,0 +1,122 @@
+"""
+📊 BENCHMARK POOL DE PROCESE
+Scalarea pe nuclee (1, 2, 4, ... workeri) pentru prețurile unei flote mari și
+pentru ferestre de mostre OBD2 analizate în paralel, față de rularea în
+procesul curent; apoi transferul unei ferestre mari (listă de mostre sau
+coloane) prin pickle vs memorie partajată.
+
+Rulare: python benchmarks/bench_process_pool.py [vehicule] [mostre_per_fereastră] [ferestre]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pricing import create_pricing_engine  # noqa: E402
+from process_pool import WarmProcessPool, analyze_samples_task, quote_batch_task  # noqa: E402
+
+MAKES = [("Dacia", "Logan"), ("BMW", "320d"), ("Toyota", "Corolla"), ("VW", "Golf"), ("Tesla", "Model 3")]
+
+
+def fleet(size: int, rng: random.Random):
+    vehicles = []
+    for _ in range(size):
+        make, model = rng.choice(MAKES)
+        vehicles.append({
+            "car_type": make,
+            "model": model,
+            "year": rng.randint(2000, 2024),
+            "mileage": rng.randint(0, 350000),
+            "simptome": ["zgomot"] * rng.randint(0, 3),
+            "coduri_dtc": rng.sample(["P0300", "P0171", "P0420", "U0100"], rng.randint(0, 2)),
+        })
+    return vehicles
+
+
+def window(size: int, rng: random.Random):
+    return [
+        {
+            "timestamp": float(i),
+            "rpm": rng.choice([0, 750, 2200, 4300]),
+            "speed": rng.choice([0, 15, 60, 120]),
+            "coolant_temp": rng.gauss(92, 6),
+            "fuel_pressure": rng.gauss(400, 60),
+            "oxygen_sensor_voltage": rng.random(),
+            "battery_voltage": rng.gauss(13.6, 0.8),
+            "fuel_level": rng.uniform(5, 100),
+            "engine_on": True,
+        }
+        for i in range(size)
+    ]
+
+
+async def measure(pool: WarmProcessPool, vehicles, windows):
+    started = time.perf_counter()
+    await pool.map_chunks(quote_batch_task, vehicles)
+    pricing_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await asyncio.gather(*(pool.analyze_window(samples) for samples in windows))
+    window_s = time.perf_counter() - started
+    return pricing_s, window_s
+
+
+async def main():
+    vehicles_n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    window_n = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    windows_n = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    rng = random.Random(5)
+    vehicles = fleet(vehicles_n, rng)
+    windows = [window(window_n, rng) for _ in range(windows_n)]
+    samples_total = window_n * windows_n
+
+    started = time.perf_counter()
+    create_pricing_engine().quote_batch(vehicles)
+    inline_pricing = time.perf_counter() - started
+    started = time.perf_counter()
+    for samples in windows:
+        analyze_samples_task([dict(s) for s in samples])
+    inline_window = time.perf_counter() - started
+    print(f"În proces: prețuri {vehicles_n / inline_pricing:,.0f} vehicule/s, "
+          f"ferestre {samples_total / inline_window:,.0f} mostre/s")
+
+    counts, workers = [], 1
+    while workers < (os.cpu_count() or 1):
+        counts.append(workers)
+        workers *= 2
+    counts.append(os.cpu_count() or 1)
+
+    print(f"{'workeri':>8} {'pornire ms':>11} {'vehicule/s':>12} {'x':>6} {'mostre/s':>12} {'x':>6}")
+    for workers in counts:
+        pool = WarmProcessPool(workers=workers).start()
+        pricing_s, window_s = await measure(pool, vehicles, windows)
+        pool.shutdown()
+        print(f"{workers:>8} {pool.warmup_ms:>11.0f} {vehicles_n / pricing_s:>12,.0f} "
+              f"{inline_pricing / pricing_s:>6.2f} {samples_total / window_s:>12,.0f} {inline_window / window_s:>6.2f}")
+
+    # O fereastră mare: listă de mostre (pickle), coloane prin pickle vs memorie partajată
+    pool = WarmProcessPool(workers=1).start()
+    samples = windows[0]
+    columns = {name: [sample.get(name) for sample in samples] for name in samples[0]}
+    for label, threshold, layout in (
+        ("mostre, pickle", 1 << 62, "mostre"),
+        ("coloane, pickle", 1 << 62, "coloane"),
+        ("coloane, memorie partajată", 0, "coloane"),
+    ):
+        pool.shared_min_bytes = threshold
+        started = time.perf_counter()
+        for _ in range(3):
+            if layout == "mostre":
+                await pool.analyze_window(samples)
+            else:
+                await pool.analyze_window(columns=columns)
+        print(f"Transfer {label}: {(time.perf_counter() - started) / 3 * 1000:.1f} ms/fereastră")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
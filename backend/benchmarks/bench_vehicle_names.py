@@ -0,0 +1,91 @@
+"""
+📊 BENCHMARK NORMALIZARE MARCĂ/MODEL
+Corpus mare de intrări „murdare” (alias-uri, majuscule, diacritice, greșeli de
+tastare, marca în câmpul model, sufixe de motorizare): rata de recunoaștere și
+debitul cu index rece (fără cache) și cald (cu cache LRU).
+
+Rulare: python benchmarks/bench_vehicle_names.py [nr_intrări]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vehicle_names import MAKES, MODELS, get_index, normalize_vehicle  # noqa: E402
+
+SUFFIXES = ["", " 1.6 tdi", " 2.0", " diesel", " facelift", " 1.5 dci"]
+
+
+def typo(rng: random.Random, word: str) -> str:
+    """O greșeală: literă lipsă, dublată sau două litere inversate"""
+    if len(word) < 6:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:i] + word[i + 1:]
+    if kind == 1:
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def messy_corpus(size: int, seed: int = 11):
+    """(car_type, model, an, marcă așteptată, model așteptat)"""
+    rng = random.Random(seed)
+    makes = [make for make in MODELS if MODELS[make]]
+    corpus = []
+    for _ in range(size):
+        make = rng.choice(makes)
+        model = rng.choice(list(MODELS[make]))
+        make_alias = rng.choice([make, MAKES[make][0], *MAKES[make][1]])
+        model_alias = rng.choice([model, *MODELS[make][model][0]])
+        if rng.random() < 0.2:
+            make_alias = typo(rng, make_alias)
+        if rng.random() < 0.2:
+            model_alias = typo(rng, model_alias)
+        make_alias = rng.choice([make_alias, make_alias.upper(), make_alias.title()])
+        model_alias += rng.choice(SUFFIXES)
+
+        layout = rng.random()
+        if layout < 0.15:
+            car_type, model_field = f"{make_alias} {model_alias}", "Unknown"
+        elif layout < 0.25:
+            car_type, model_field = "standard", f"{make_alias} {model_alias}"
+        else:
+            car_type, model_field = make_alias, model_alias
+        corpus.append((car_type, model_field, rng.randint(1998, 2024), make, model))
+    return corpus
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    corpus = messy_corpus(size)
+
+    started = time.perf_counter()
+    index = get_index()
+    print(f"Construire index: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    unique = list({(c, m, y) for c, m, y, _, _ in corpus})
+    started = time.perf_counter()
+    for car_type, model, year in unique:
+        index.normalize(car_type, model, year)
+    cold = time.perf_counter() - started
+    print(f"Fără cache: {len(unique)} intrări unice, {len(unique) / cold:,.0f}/s ({cold / len(unique) * 1e6:.1f} µs/intrare)")
+
+    normalize_vehicle.cache_clear()
+    started = time.perf_counter()
+    make_hits = model_hits = 0
+    for car_type, model, year, expected_make, expected_model in corpus:
+        name = normalize_vehicle(car_type, model, year)
+        make_hits += name.make == expected_make
+        model_hits += name.model == expected_model
+    warm = time.perf_counter() - started
+    print(f"Cu cache: {size} intrări, {size / warm:,.0f}/s ({normalize_vehicle.cache_info()})")
+    print(f"Recunoaștere marcă: {make_hits / size:.1%}, model: {model_hits / size:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+📊 BENCHMARK PROTOCOL /ws/obd2: JSON vs BINAR
+Compară octeții pe mesaj și costul CPU de encode/decode.
+
+Rulare: python benchmarks/bench_ws_protocol.py [nr_mostre]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from obd2_protocol import LiveFrameDecoder, LiveFrameEncoder  # noqa: E402
+
+
+def generate_samples(count: int, hz: float = 10.0, seed: int = 42):
+    """Generează mostre cu același format ca get_live_data()"""
+    rng = random.Random(seed)
+    start = datetime.now()
+    samples = []
+    for i in range(count):
+        samples.append({
+            "engine_on": True,
+            "rpm": rng.randint(700, 3500),
+            "speed": rng.randint(0, 120),
+            "coolant_temp": rng.randint(75, 105),
+            "throttle_position": rng.randint(10, 90),
+            "maf": round(rng.uniform(2.5, 15.5), 1),
+            "engine_load": rng.randint(20, 95),
+            "fuel_pressure": rng.randint(350, 450),
+            "intake_temp": rng.randint(15, 45),
+            "timing_advance": rng.randint(5, 25),
+            "oxygen_sensor_voltage": round(rng.uniform(0.1, 0.9), 2),
+            "battery_voltage": round(rng.uniform(12.5, 14.5), 1),
+            "fuel_level": rng.randint(10, 100),
+            "ambient_temp": rng.randint(5, 35),
+            "barometric_pressure": rng.randint(95, 105),
+            "timestamp": (start + timedelta(seconds=i / hz)).isoformat(),
+        })
+    return samples
+
+
+def json_envelope(sample):
+    """Mesajul JSON trimis azi de server pentru get_live_data"""
+    return json.dumps({
+        "type": "live_data",
+        "data": sample,
+        "timestamp": sample["timestamp"],
+    }).encode("utf-8")
+
+
+def bench_json(samples, deflate: bool):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    decompressor = zlib.decompressobj(-15)
+    total_bytes = 0
+
+    start = time.perf_counter()
+    frames = []
+    for sample in samples:
+        frame = json_envelope(sample)
+        if deflate:
+            frame = compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            frame = frame[:-4]
+        frames.append(frame)
+        total_bytes += len(frame)
+    encode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for frame in frames:
+        if deflate:
+            frame = decompressor.decompress(frame + b"\x00\x00\xff\xff")
+        json.loads(frame)
+    decode_s = time.perf_counter() - start
+    return total_bytes, encode_s, decode_s
+
+
+def bench_binary(samples, deflate: bool):
+    encoder = LiveFrameEncoder(deflate=deflate)
+    decoder = LiveFrameDecoder(encoder.schema_message())
+    schema_bytes = len(json.dumps(encoder.schema_message()).encode("utf-8"))
+    total_bytes = schema_bytes
+
+    start = time.perf_counter()
+    frames = [encoder.encode(sample) for sample in samples]
+    encode_s = time.perf_counter() - start
+    total_bytes += sum(len(frame) for frame in frames)
+
+    start = time.perf_counter()
+    for frame in frames:
+        decoder.decode(frame)
+    decode_s = time.perf_counter() - start
+    return total_bytes, encode_s, decode_s
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    samples = generate_samples(count)
+
+    results = [
+        ("json", bench_json(samples, deflate=False)),
+        ("json+deflate", bench_json(samples, deflate=True)),
+        ("binary", bench_binary(samples, deflate=False)),
+        ("binary+deflate", bench_binary(samples, deflate=True)),
+    ]
+
+    baseline_bytes = results[0][1][0]
+    print(f"Mostre: {count}")
+    print(f"{'mod':<16}{'B/msg':>10}{'vs json':>10}{'enc µs':>10}{'dec µs':>10}")
+    for name, (total_bytes, encode_s, decode_s) in results:
+        print(
+            f"{name:<16}"
+            f"{total_bytes / count:>10.1f}"
+            f"{total_bytes / baseline_bytes:>9.1%} "
+            f"{encode_s / count * 1e6:>10.2f}"
+            f"{decode_s / count * 1e6:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+🚦 GENERATOR DE ÎNCĂRCARE: FLOTĂ SIMULATĂ -> SERVER LOCAL
+Fiecare vehicul simulat trimite periodic POST /api/v1/diagnostic cu datele
+OBD2 redate din scenarii, iar o parte din vehicule țin deschis /ws/obd2.
+
+Rulare: python benchmarks/load_fleet.py --url http://localhost:8000 \
+            --vehicles 1000 --ws 200 --duration 30 --rate 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from obd2_scenarios import SCENARIOS, SimulatedFleet  # noqa: E402
+
+
+async def diagnostic_worker(client, url, player, vehicle, rate, deadline, latencies, errors):
+    scenario = player.cycle.name
+    interval = 1.0 / rate
+    # Pornire decalată ca cererile să nu plece toate simultan
+    await asyncio.sleep((vehicle % 100) / 100 * interval)
+    while time.monotonic() < deadline:
+        payload = {
+            "car_type": "Dacia",
+            "model": "Logan",
+            "year": 2015,
+            "mileage": 150000,
+            "simptome": [scenario],
+            "coduri_dtc": [],
+            "obd2_connected": True,
+            "obd2_data": player.next_sample().to_dict(),
+            "user_id": f"load-{vehicle}",
+        }
+        start = time.perf_counter()
+        try:
+            response = await client.post(f"{url}/api/v1/diagnostic", json=payload)
+            if response.status_code == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors.append(response.status_code)
+        except Exception as e:
+            errors.append(type(e).__name__)
+        await asyncio.sleep(interval)
+
+
+async def websocket_worker(url, deadline, hz, counter, errors):
+    import websockets
+
+    ws_url = url.replace("http", "ws", 1) + "/ws/obd2"
+    try:
+        async with websockets.connect(ws_url) as ws:
+            while time.monotonic() < deadline:
+                await ws.send("get_live_data")
+                await ws.recv()
+                counter[0] += 1
+                await asyncio.sleep(1.0 / hz)
+    except Exception as e:
+        errors.append(type(e).__name__)
+
+
+async def run(args):
+    import httpx
+
+    fleet = SimulatedFleet(args.vehicles, scenarios=args.scenarios, hz=args.hz, seed=args.seed)
+    deadline = time.monotonic() + args.duration
+    latencies, errors, ws_errors, ws_messages = [], [], [], [0]
+
+    limits = httpx.Limits(max_connections=args.connections)
+    async with httpx.AsyncClient(timeout=60.0, limits=limits) as client:
+        tasks = [
+            diagnostic_worker(client, args.url, player, i, args.rate, deadline, latencies, errors)
+            for i, player in enumerate(fleet.players)
+        ]
+        tasks += [
+            websocket_worker(args.url, deadline, args.hz, ws_messages, ws_errors)
+            for _ in range(args.ws)
+        ]
+        await asyncio.gather(*tasks)
+
+    print(f"Vehicule: {args.vehicles}, WebSocket: {args.ws}, durată: {args.duration}s")
+    print(f"Diagnostice OK: {len(latencies)} ({len(latencies) / args.duration:.1f}/s), erori: {len(errors)}")
+    if latencies:
+        latencies.sort()
+        p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]  # noqa: E731
+        print(f"Latență ms: median {statistics.median(latencies):.1f}, p95 {p(0.95):.1f}, p99 {p(0.99):.1f}")
+    print(f"Mesaje WebSocket: {ws_messages[0]} ({ws_messages[0] / args.duration:.1f}/s), erori: {len(ws_errors)}")
+    if errors or ws_errors:
+        print(f"Exemple erori: {json.dumps((errors + ws_errors)[:10])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de încărcare cu flotă OBD2 simulată")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--vehicles", type=int, default=1000)
+    parser.add_argument("--ws", type=int, default=100, help="Conexiuni /ws/obd2 deschise")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--rate", type=float, default=0.2, help="Diagnostice/s per vehicul")
+    parser.add_argument("--hz", type=float, default=10.0, help="Frecvență mostre WebSocket")
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", nargs="*", choices=list(SCENARIOS))
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
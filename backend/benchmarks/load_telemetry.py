@@ -0,0 +1,156 @@
+"""
+🛰️ GENERATOR DE ÎNCĂRCARE: GATEWAY-URI -> POST /api/v1/telemetry/ingest
+Fiecare gateway simulat încarcă în buclă loturi de mostre (NDJSON sau binar
+OBDB, comprimate gzip/zstd sau necomprimate). Raportează mostrele confirmate
+(202) pe secundă și, din /api/v1/metrics, mostrele efectiv analizate.
+Cu --local se măsoară doar în proces: decomprimare + tăiere în blocuri
+(partea din event loop) și analiza unui bloc (partea din workeri).
+
+Rulare: python benchmarks/load_telemetry.py --url http://localhost:8000 \
+            --gateways 32 --samples 20000 --format binary --encoding gzip --duration 30
+        python benchmarks/load_telemetry.py --local --samples 200000
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from obd2_protocol import BATCH_CONTENT_TYPE, encode_batch  # noqa: E402
+from obd2_scenarios import SCENARIOS, SimulatedFleet  # noqa: E402
+from telemetry_ingest import (  # noqa: E402
+    FORMAT_BINARY, FORMAT_NDJSON, StreamDecoder, analyze_block_task, create_framer, zstandard
+)
+
+
+def build_body(player, count: int, fmt: str) -> bytes:
+    """Un lot de count mostre consecutive (10 Hz) în formatul cerut"""
+    started = time.time() - count / 10
+    samples = [player.next_sample(started + i / 10) for i in range(count)]
+    if fmt == FORMAT_BINARY:
+        return encode_batch(samples)
+    return "\n".join(json.dumps(sample.to_dict()) for sample in samples).encode()
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, 6)
+    if encoding == "zstd":
+        if zstandard is None:
+            sys.exit("zstd cere pachetul zstandard (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return body
+
+
+def build_bodies(args):
+    fleet = SimulatedFleet(args.gateways, scenarios=args.scenarios, seed=args.seed)
+    bodies = [compress(build_body(player, args.samples, args.format), args.encoding) for player in fleet.players]
+    raw = len(build_body(fleet.players[0], args.samples, args.format))
+    print(f"Lot: {args.samples} mostre {args.format}/{args.encoding}: {len(bodies[0]):,} B "
+          f"({len(bodies[0]) / args.samples:.1f} B/mostră, necomprimat {raw / args.samples:.1f} B/mostră)")
+    return bodies
+
+
+def run_local(args):
+    body = build_bodies(args)[0]
+    block_bytes = args.block_kb * 1024
+
+    started = time.perf_counter()
+    decoder = StreamDecoder(None if args.encoding == "identity" else args.encoding, 1 << 40)
+    framer = create_framer(args.format, block_bytes)
+    blocks = []
+    for i in range(0, len(body), 65536):
+        blocks.extend(framer.feed(decoder.feed(body[i:i + 65536])))
+    blocks.extend(framer.finish())
+    framing = time.perf_counter() - started
+    print(f"event loop (decomprimare + blocuri): {args.samples / framing:>12,.0f} mostre/s ({len(blocks)} blocuri)")
+
+    for sketch in (False, True):
+        started = time.perf_counter()
+        for block, _ in blocks:
+            analyze_block_task(args.format, block, 10, sketch)
+        elapsed = time.perf_counter() - started
+        label = "worker (parsare + reguli" + (" + schițe)" if sketch else ")")
+        print(f"{label:<36} {args.samples / elapsed:>12,.0f} mostre/s per nucleu")
+
+
+async def gateway_worker(client, url, vehicle, body, headers, deadline, acked, errors):
+    params = {"vehicle_id": f"gw-{vehicle}", "car_type": "Dacia", "model": "Logan"}
+    while time.monotonic() < deadline:
+        try:
+            response = await client.post(f"{url}/api/v1/telemetry/ingest", params=params, content=body, headers=headers)
+            if response.status_code == 202:
+                acked[0] += response.json()["samples"]
+            else:
+                errors.append(response.status_code)
+                if response.status_code == 503:
+                    await asyncio.sleep(float(response.headers.get("retry-after", "1")))
+        except Exception as e:
+            errors.append(type(e).__name__)
+
+
+async def processed_samples(client, url) -> int:
+    response = await client.get(f"{url}/api/v1/metrics")
+    return response.json()["telemetry"]["pipeline"]["processed_samples"]
+
+
+async def run(args):
+    import httpx
+
+    bodies = build_bodies(args)
+    headers = {"content-type": BATCH_CONTENT_TYPE if args.format == FORMAT_BINARY else "application/x-ndjson"}
+    if args.encoding != "identity":
+        headers["content-encoding"] = args.encoding
+    acked, errors = [0], []
+
+    limits = httpx.Limits(max_connections=args.gateways + 1)
+    async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+        processed_before = await processed_samples(client, args.url)
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            gateway_worker(client, args.url, i, body, headers, deadline, acked, errors)
+            for i, body in enumerate(bodies)
+        ))
+        elapsed = time.monotonic() - started
+        processed = await processed_samples(client, args.url) - processed_before
+        # Coada se golește după ultimul răspuns 202
+        while processed < acked[0] and time.monotonic() - started < elapsed + 60:
+            await asyncio.sleep(0.5)
+            processed = await processed_samples(client, args.url) - processed_before
+        drained = time.monotonic() - started
+
+    print(f"Gateway-uri: {args.gateways}, durată: {elapsed:.1f}s")
+    print(f"Mostre confirmate: {acked[0]:,} ({acked[0] / elapsed:,.0f}/s), erori: {len(errors)}")
+    print(f"Mostre analizate: {processed:,} ({processed / drained:,.0f}/s, coada golită în {drained:.1f}s)")
+    if errors:
+        print(f"Exemple erori: {json.dumps(errors[:10])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de încărcare pentru ingestia de telemetrie în masă")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--gateways", type=int, default=32)
+    parser.add_argument("--samples", type=int, default=20000, help="Mostre per lot încărcat")
+    parser.add_argument("--format", choices=[FORMAT_NDJSON, FORMAT_BINARY], default=FORMAT_BINARY)
+    parser.add_argument("--encoding", choices=["gzip", "zstd", "identity"], default="gzip")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--block-kb", type=int, default=256, help="Doar --local: mărimea unui bloc")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", nargs="*", choices=list(SCENARIOS))
+    parser.add_argument("--local", action="store_true", help="Fără server: throughput în proces")
+    args = parser.parse_args()
+    if args.local:
+        args.gateways = 1
+        run_local(args)
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
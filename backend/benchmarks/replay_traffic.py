@@ -0,0 +1,250 @@
+"""
+🔁 REPLAY DE TRAFIC CAPTURAT -> SERVER LOCAL
+Citește capturile (CAPTURE_ENABLED=true, fișiere .ndjson.gz) și retrimite
+cererile HTTP și cronologia mesajelor /ws/obd2 cu decalajele originale
+(sau accelerate cu --speed). Raportează distribuția latențelor per rută și o
+poate compara cu un raport anterior (--compare) pentru regresii între build-uri.
+
+Serverul țintă se pornește cu motoarele AI simulate și limite ridicate:
+    AI_MOCK=true AI_MOCK_LATENCY_MS=800 RATE_LIMIT_DIAGNOSTIC_PER_MIN=100000 \\
+    RATE_LIMIT_DIAGNOSTIC_BURST=100000 RATE_LIMIT_API_BURST=100000 uvicorn main:app
+
+Rulare: python benchmarks/replay_traffic.py captures/ --speed 4 --output build_b.json \\
+            --compare build_a.json
+"""
+
+import argparse
+import asyncio
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+# Mesaje /ws/obd2 la care serverul răspunde imediat (latența se măsoară până la răspuns)
+WS_REPLIES = ("get_live_data", "get_dtc", "command:", "subscribe_job:", "ping")
+
+
+def load_capture(paths):
+    """Înregistrările din fișiere/directoare de captură, în ordinea cronologică"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.ndjson.gz"))))
+        else:
+            files.append(path)
+    records = []
+    for path in files:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Ultima linie a unei capturi întrerupte poate fi trunchiată
+                    continue
+    records.sort(key=lambda r: r["t"])
+    return records
+
+
+def ws_label(message: str) -> str:
+    for prefix in WS_REPLIES:
+        if message.startswith(prefix):
+            return "WS " + prefix.rstrip(":")
+    return "WS other"
+
+
+def percentile(values, q):
+    """Percentila q (0..1) prin rang apropiat, pe valori sortate"""
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Results:
+    """Latențe și statusuri per rută"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.captured = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_mismatch = defaultdict(int)
+        self.lag = []
+
+    def summary(self):
+        routes = {}
+        for label in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies.get(label, []))
+            captured = sorted(self.captured.get(label, []))
+            routes[label] = {
+                "count": len(values),
+                "errors": self.errors.get(label, 0),
+                "status_mismatch": self.status_mismatch.get(label, 0),
+                "p50_ms": round(percentile(values, 0.5), 2) if values else None,
+                "p90_ms": round(percentile(values, 0.9), 2) if values else None,
+                "p99_ms": round(percentile(values, 0.99), 2) if values else None,
+                "mean_ms": round(sum(values) / len(values), 2) if values else None,
+                "captured_p50_ms": round(percentile(captured, 0.5), 2) if captured else None,
+            }
+        lag = sorted(self.lag)
+        return {
+            "routes": routes,
+            # Întârzierea față de programul de replay (clientul nu a ținut ritmul)
+            "schedule_lag_p99_ms": round(percentile(lag, 0.99), 2) if lag else None,
+        }
+
+
+async def sleep_until(started, offset, speed, results):
+    if speed > 0:
+        delay = started + offset / speed - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            results.lag.append(-delay * 1000)
+
+
+async def replay_http(client, url, record, started, t0, args, results):
+    await sleep_until(started, record["t"] - t0, args.speed, results)
+    label = f"{record['method']} {record['path']}"
+    query = record.get("query") or ""
+    if args.extra_query:
+        query = f"{query}&{args.extra_query}" if query else args.extra_query
+    target = f"{url}{record['path']}" + (f"?{query}" if query else "")
+    async with args.semaphore:
+        begin = time.perf_counter()
+        try:
+            response = await client.request(
+                record["method"],
+                target,
+                headers=record.get("headers") or {},
+                content=record.get("body", "").encode("utf-8") or None,
+            )
+            results.latencies[label].append((time.perf_counter() - begin) * 1000)
+            results.captured[label].append(record.get("duration_ms", 0.0))
+            if response.status_code != record.get("status"):
+                results.status_mismatch[label] += 1
+        except Exception:
+            results.errors[label] += 1
+
+
+async def replay_ws_session(url, events, started, t0, args, results):
+    """O conexiune /ws/obd2: conectare la momentul capturat, apoi mesajele în ordine"""
+    import websockets
+
+    connect = events[0]
+    await sleep_until(started, connect["t"] - t0, args.speed, results)
+    subprotocols = [connect["subprotocol"]] if connect.get("subprotocol") else None
+    try:
+        async with websockets.connect(url.replace("http", "ws", 1) + "/ws/obd2", subprotocols=subprotocols) as ws:
+            if subprotocols:
+                # Schema PID trimisă la conectare
+                await ws.recv()
+            for event in events[1:]:
+                if event["event"] != "message":
+                    break
+                await sleep_until(started, event["t"] - t0, args.speed, results)
+                message = event.get("data", "")
+                label = ws_label(message)
+                begin = time.perf_counter()
+                await ws.send(message)
+                if label != "WS other":
+                    await asyncio.wait_for(ws.recv(), timeout=30)
+                    results.latencies[label].append((time.perf_counter() - begin) * 1000)
+    except Exception:
+        results.errors["WS /ws/obd2"] += 1
+
+
+async def run(args):
+    import httpx
+
+    records = load_capture(args.captures)
+    if not records:
+        print("Nicio înregistrare în captură")
+        return None
+    http_records = [r for r in records if r["type"] == "http"]
+    sessions = defaultdict(list)
+    for record in records:
+        if record["type"] == "ws":
+            sessions[record["conn"]].append(record)
+    sessions = [events for events in sessions.values() if events[0]["event"] == "connect"]
+
+    t0 = records[0]["t"]
+    span = records[-1]["t"] - t0
+    print(f"Captură: {len(http_records)} cereri HTTP, {len(sessions)} sesiuni WebSocket, {span:.1f}s")
+    print(f"Viteză: {'maximă' if args.speed <= 0 else f'{args.speed}x'} -> {args.url}")
+
+    results = Results()
+    args.semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    started = time.monotonic()
+    async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+        tasks = [replay_http(client, args.url, r, started, t0, args, results) for r in http_records]
+        tasks += [replay_ws_session(args.url, events, started, t0, args, results) for events in sessions]
+        await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - started
+
+    report = {
+        "url": args.url,
+        "captures": args.captures,
+        "speed": args.speed,
+        "elapsed_s": round(elapsed, 2),
+        **results.summary(),
+    }
+    print(f"Durată replay: {elapsed:.1f}s")
+    print(f"{'Rută':<32} {'n':>6} {'err':>5} {'p50':>9} {'p90':>9} {'p99':>9} {'captură p50':>12}")
+    for label, route in report["routes"].items():
+        fmt = lambda v: f"{v:9.1f}" if v is not None else f"{'-':>9}"  # noqa: E731
+        captured = f"{route['captured_p50_ms']:12.1f}" if route["captured_p50_ms"] is not None else f"{'-':>12}"
+        print(f"{label:<32} {route['count']:>6} {route['errors']:>5} "
+              f"{fmt(route['p50_ms'])} {fmt(route['p90_ms'])} {fmt(route['p99_ms'])} {captured}")
+    return report
+
+
+def compare(report, baseline, threshold):
+    """Diferențele p50/p99 față de raportul de referință; True dacă există regresii"""
+    regressions = False
+    print(f"\nComparație cu {baseline.get('url')} (prag {threshold:.0%}):")
+    for label, route in report["routes"].items():
+        base = baseline.get("routes", {}).get(label)
+        if not base or not route["count"] or not base.get("count"):
+            continue
+        parts = []
+        flagged = False
+        for key in ("p50_ms", "p99_ms"):
+            change = (route[key] - base[key]) / base[key] if base[key] else 0.0
+            parts.append(f"{key[:3]} {base[key]:.1f} -> {route[key]:.1f} ms ({change:+.1%})")
+            flagged = flagged or change > threshold
+        regressions = regressions or flagged
+        print(f"{'⚠️ ' if flagged else '   '}{label:<32} " + ", ".join(parts))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay de trafic capturat pentru teste de regresie")
+    parser.add_argument("captures", nargs="+", help="Fișiere .ndjson.gz sau directoare de captură")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="Multiplicator de viteză (0 = cât de repede se poate)")
+    parser.add_argument("--concurrency", type=int, default=200, help="Cereri HTTP simultane maxime")
+    parser.add_argument("--extra-query", default="", help="Parametri adăugați fiecărei cereri (ex. reuse=false)")
+    parser.add_argument("--output", help="Raportul JSON al acestui build")
+    parser.add_argument("--compare", help="Raport JSON de referință (build anterior)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Creștere relativă considerată regresie")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if report is None:
+        sys.exit(1)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
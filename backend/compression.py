@@ -0,0 +1,350 @@
+"""
+🗜️ COMPRIMAREA RĂSPUNSURILOR HTTP (gzip / brotli / zstd)
+Codarea se negociază din Accept-Encoding (q-values, apoi preferința serverului).
+Răspunsurile întregi se comprimă doar peste un prag de mărime (cele mari în
+thread, ca să nu blocheze event loop-ul); răspunsurile în streaming (NDJSON)
+se comprimă bucată cu bucată, cu flush după fiecare, ca clientul să primească
+liniile imediat. brotli și zstd sunt opționale (pachetele brotli / zstandard).
+"""
+
+import asyncio
+import logging
+import os
+import time
+import zlib
+from typing import Optional, Any, Dict, List, Tuple
+
+try:
+    import brotli
+except ImportError:  # fără pachet, clienții primesc zstd sau gzip
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# La q egal: zstd și brotli comprimă mai bine decât gzip la un cost CPU comparabil
+DEFAULT_PREFERENCE = ("zstd", "br", "gzip")
+
+AVAILABLE_ENCODINGS = tuple(
+    name for name, module in (("zstd", zstandard), ("br", brotli), ("gzip", zlib)) if module
+)
+
+# Doar text/JSON; binarele (loturi OBDB, imagini) sunt deja compacte sau comprimate
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "application/xml")
+
+
+# ============================================================================
+# ENCODERE INCREMENTALE
+# ============================================================================
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._z.compress(data)
+
+    def flush(self) -> bytes:
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._z.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        self._c = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """"gzip, br;q=0.9, *;q=0" -> {"gzip": 1.0, "br": 0.9, "*": 0.0}"""
+    weights = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    return weights
+
+
+class ResponseCompressor:
+    """Negociere + encodere configurate + statistici per codare"""
+
+    def __init__(
+        self,
+        min_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        preference: Tuple[str, ...] = DEFAULT_PREFERENCE,
+        thread_bytes: int = 256 * 1024,
+    ):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.zstd_level = zstd_level
+        self.thread_bytes = thread_bytes
+        self.encodings: List[str] = [name for name in preference if name in AVAILABLE_ENCODINGS]
+        self._stats = {
+            name: {"responses": 0, "streamed": 0, "bytes_in": 0, "bytes_out": 0, "cpu_ms": 0.0}
+            for name in self.encodings
+        }
+        self.skipped_small = 0
+        self.skipped_type = 0
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Codarea cu q maxim acceptată de client; None = răspuns necomprimat"""
+        if not accept_encoding:
+            return None
+        weights = parse_accept_encoding(accept_encoding)
+        wildcard = weights.get("*", 0.0)
+        best, best_q = None, 0.0
+        for name in self.encodings:
+            q = weights.get(name, wildcard)
+            if q > best_q:
+                best, best_q = name, q
+        return best
+
+    def encoder(self, encoding: str):
+        if encoding == "zstd":
+            return _ZstdEncoder(self.zstd_level)
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    def compress(self, encoding: str, data: bytes) -> bytes:
+        """Un răspuns întreg"""
+        started = time.perf_counter()
+        encoder = self.encoder(encoding)
+        compressed = encoder.compress(data) + encoder.finish()
+        self.record(encoding, len(data), len(compressed), time.perf_counter() - started)
+        return compressed
+
+    async def compress_async(self, encoding: str, data: bytes) -> bytes:
+        """Corpurile mari se comprimă în thread (zlib/brotli/zstd eliberează GIL-ul)"""
+        if len(data) >= self.thread_bytes:
+            return await asyncio.to_thread(self.compress, encoding, data)
+        return self.compress(encoding, data)
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, seconds: float, streamed: bool = False):
+        stats = self._stats[encoding]
+        stats["bytes_in"] += bytes_in
+        stats["bytes_out"] += bytes_out
+        stats["cpu_ms"] += seconds * 1000
+        if not streamed:
+            stats["responses"] += 1
+
+    def record_stream(self, encoding: str):
+        self._stats[encoding]["responses"] += 1
+        self._stats[encoding]["streamed"] += 1
+
+    def is_compressible(self, content_type: str) -> bool:
+        content_type = content_type.lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "encodings": self.encodings,
+            "min_size": self.min_size,
+            "levels": {"gzip": self.gzip_level, "br": self.brotli_quality, "zstd": self.zstd_level},
+            "by_encoding": {
+                name: {
+                    **stats,
+                    "cpu_ms": round(stats["cpu_ms"], 1),
+                    "ratio": round(stats["bytes_out"] / stats["bytes_in"], 3) if stats["bytes_in"] else None,
+                }
+                for name, stats in self._stats.items()
+            },
+            "skipped_small": self.skipped_small,
+            "skipped_type": self.skipped_type,
+        }
+
+
+# ============================================================================
+# MIDDLEWARE ASGI
+# ============================================================================
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+class _CompressingSend:
+    """Reține http.response.start până la primul corp, apoi decide: necomprimat, întreg sau streaming"""
+
+    def __init__(self, compressor: ResponseCompressor, encoding: str, send):
+        self.compressor = compressor
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Dict[str, Any]] = None
+        self._mode: Optional[str] = None
+        self._encoder = None
+
+    def _headers(self, compressed: bool, content_length: Optional[int] = None) -> List[Tuple[bytes, bytes]]:
+        headers = []
+        vary = None
+        for key, value in self._start["headers"]:
+            lower = key.lower()
+            if lower == b"vary":
+                vary = value
+            elif compressed and lower == b"content-length":
+                continue
+            elif compressed and lower == b"etag" and not value.startswith(b"W/"):
+                # Alt conținut pe fir: ETag-ul puternic devine slab
+                headers.append((key, b"W/" + value))
+            else:
+                headers.append((key, value))
+        if vary is None:
+            headers.append((b"vary", b"Accept-Encoding"))
+        elif b"accept-encoding" not in vary.lower():
+            headers.append((b"vary", vary + b", Accept-Encoding"))
+        else:
+            headers.append((b"vary", vary))
+        if compressed:
+            headers.append((b"content-encoding", self.encoding.encode()))
+            if content_length is not None:
+                headers.append((b"content-length", str(content_length).encode()))
+        return headers
+
+    async def _pass_through(self, message: Dict[str, Any], vary: bool):
+        self._mode = "identity"
+        start = self._start
+        if vary:
+            start = {**start, "headers": self._headers(compressed=False)}
+        await self._send(start)
+        await self._send(message)
+
+    async def __call__(self, message: Dict[str, Any]):
+        kind = message["type"]
+        if kind == "http.response.start":
+            self._start = message
+            return
+        if kind != "http.response.body" or self._mode == "identity":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._mode == "stream":
+            started = time.perf_counter()
+            data = self._encoder.compress(body) if body else b""
+            data += self._encoder.flush() if more_body else self._encoder.finish()
+            self.compressor.record(self.encoding, len(body), len(data), time.perf_counter() - started, streamed=True)
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        # Primul corp: decizia pentru tot răspunsul
+        headers = self._start["headers"]
+        status = self._start["status"]
+        content_type = _header(headers, b"content-type") or ""
+        if status < 200 or status in (204, 304) or _header(headers, b"content-encoding"):
+            await self._pass_through(message, vary=False)
+            return
+        if not self.compressor.is_compressible(content_type):
+            self.compressor.skipped_type += 1
+            await self._pass_through(message, vary=False)
+            return
+
+        if not more_body:
+            if len(body) < self.compressor.min_size:
+                self.compressor.skipped_small += 1
+                await self._pass_through(message, vary=True)
+                return
+            compressed = await self.compressor.compress_async(self.encoding, body)
+            self._mode = "whole"
+            await self._send({
+                **self._start,
+                "headers": self._headers(compressed=True, content_length=len(compressed)),
+            })
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+            return
+
+        declared = _header(headers, b"content-length")
+        if declared and declared.isdigit() and int(declared) < self.compressor.min_size:
+            self.compressor.skipped_small += 1
+            await self._pass_through(message, vary=True)
+            return
+
+        self._mode = "stream"
+        self._encoder = self.compressor.encoder(self.encoding)
+        self.compressor.record_stream(self.encoding)
+        await self._send({**self._start, "headers": self._headers(compressed=True)})
+        await self(message)
+
+
+class CompressionMiddleware:
+    """Middleware ASGI pur (nu bufferizează răspunsurile în streaming); WebSocket-urile trec neatinse"""
+
+    def __init__(self, app, compressor: ResponseCompressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.compressor.negotiate(_header(scope["headers"], b"accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(self.compressor, encoding, send))
+
+
+def create_response_compressor() -> Optional[ResponseCompressor]:
+    """Din variabilele de mediu; None dacă COMPRESSION_ENABLED=false"""
+    if os.getenv("COMPRESSION_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    preference = tuple(
+        name.strip() for name in os.getenv("COMPRESSION_ENCODINGS", ",".join(DEFAULT_PREFERENCE)).split(",")
+        if name.strip()
+    )
+    compressor = ResponseCompressor(
+        min_size=int(os.getenv("COMPRESSION_MIN_BYTES", "1024")),
+        gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+        brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+        zstd_level=int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+        preference=preference,
+        thread_bytes=int(os.getenv("COMPRESSION_THREAD_KB", "256")) * 1024,
+    )
+    if not compressor.encodings:
+        return None
+    logger.info(f"🗜️ Comprimare răspunsuri: {', '.join(compressor.encodings)} (peste {compressor.min_size} B)")
+    return compressor
@@ -0,0 +1,199 @@
+"""
+🧠 MOTOR DE DIAGNOSTIC LOCAL PE CPU (IN-PROCESS)
+Clasificator antrenat pe istoricul diagnosticelor AI: fiecare problemă
+diagnosticată anterior devine o etichetă cu un centroid rar (aceleași trăsături
+ca indexul de similaritate: DTC-uri, simptome, probleme OBD2). Predicția este un
+produs scalar rar prin index inversat; prețul vine din motorul de prețuri
+(marcă, vârstă, kilometraj ale vehiculului cerut), nu din etichete.
+Cererile concurente sunt grupate în loturi rulate într-un singur thread.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Optional, Any, Callable, Deque, Dict, List, Tuple
+
+from diagnostic_index import _normalize_text, vectorize
+
+logger = logging.getLogger(__name__)
+
+MAX_LABEL_CHARS = 80
+
+
+def label_key(problem: str) -> str:
+    """Forma canonică a unei probleme (etichetă de clasă)"""
+    return " ".join(_normalize_text(problem).split())[:MAX_LABEL_CHARS]
+
+
+class _Label:
+    __slots__ = ("text", "weights", "norm_sq", "support", "solutions")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.weights: Dict[int, float] = {}
+        self.norm_sq = 0.0
+        self.support = 0
+        self.solutions: Counter = Counter()
+
+
+class DiagnosticClassifier:
+    """Centroizi per problemă cu index inversat trăsătură -> etichete
+
+    pricer(car_data, obd2_analysis) -> total; fără el predicția are total_price 0
+    """
+
+    def __init__(
+        self,
+        min_support: int = 2,
+        min_score: float = 0.35,
+        max_problems: int = 3,
+        pricer: Optional[Callable[[Dict[str, Any], Optional[Dict[str, Any]]], float]] = None
+    ):
+        self.min_support = min_support
+        self.min_score = min_score
+        self.max_problems = max_problems
+        self.pricer = pricer
+        self._labels: Dict[str, _Label] = {}
+        self._postings: Dict[int, Dict[str, float]] = defaultdict(dict)
+        self._lock = threading.Lock()
+        self.examples = 0
+
+    def learn(self, car_data: Dict[str, Any], response: Dict[str, Any], obd2_analysis: Dict[str, Any] = None) -> bool:
+        """Adaugă incremental un diagnostic (centroizii nenormalizați se pot actualiza)"""
+        vector = vectorize(car_data, obd2_analysis)
+        problems = {label_key(p): str(p) for p in response.get("problems", []) if label_key(p)}
+        if not vector or not problems:
+            return False
+
+        solutions = [str(s) for s in response.get("solutions", [])][:3]
+        with self._lock:
+            for key, original in problems.items():
+                label = self._labels.get(key)
+                if label is None:
+                    label = self._labels[key] = _Label(original)
+                # |c + x|² = |c|² + 2·c·x + |x|²
+                dot = sum(label.weights.get(fid, 0.0) * value for fid, value in vector.items())
+                label.norm_sq += 2 * dot + 1.0
+                for fid, value in vector.items():
+                    weight = label.weights.get(fid, 0.0) + value
+                    label.weights[fid] = weight
+                    self._postings[fid][key] = weight
+                label.support += 1
+                label.solutions.update(solutions)
+            self.examples += 1
+        return True
+
+    def _scores(self, vector: Dict[int, float]) -> List[Tuple[float, str]]:
+        dots: Dict[str, float] = defaultdict(float)
+        for fid, value in vector.items():
+            for key, weight in self._postings.get(fid, {}).items():
+                dots[key] += value * weight
+        scored = []
+        for key, dot in dots.items():
+            label = self._labels[key]
+            if label.support >= self.min_support and label.norm_sq > 0:
+                scored.append((dot / math.sqrt(label.norm_sq), key))
+        scored.sort(reverse=True)
+        return scored
+
+    def predict(self, car_data: Dict[str, Any], obd2_analysis: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Diagnostic în formatul motoarelor AI, sau None dacă nicio etichetă nu e sigură"""
+        vector = vectorize(car_data, obd2_analysis)
+        if not vector:
+            return None
+        with self._lock:
+            top = [(score, key) for score, key in self._scores(vector)[:self.max_problems] if score >= self.min_score]
+            if not top:
+                return None
+            labels = [self._labels[key] for _, key in top]
+
+            solutions: Counter = Counter()
+            for label in labels:
+                solutions.update(label.solutions)
+
+        # Prețurile etichetelor amestecă mărci și vârste diferite: devizul e al vehiculului cerut
+        price = self.pricer(car_data, obd2_analysis) if self.pricer else 0.0
+        best_score = top[0][0]
+        return {
+            "diagnostic": labels[0].text,
+            "problems": [label.text for label in labels],
+            "solutions": [solution for solution, _ in solutions.most_common(4)],
+            "total_price": round(price, 2),
+            # Scor cosinus + suport: o etichetă văzută de 2 ori nu e la fel de sigură ca una văzută de 50
+            "ai_confidence": round(min(0.95, best_score * (1 - 1 / (1 + labels[0].support))), 3),
+            "label_scores": [round(score, 4) for score, _ in top],
+        }
+
+    def predict_batch(self, items: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]) -> List[Optional[Dict[str, Any]]]:
+        return [self.predict(car_data, obd2_analysis) for car_data, obd2_analysis in items]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "examples": self.examples,
+            "labels": len(self._labels),
+            "usable_labels": sum(1 for label in self._labels.values() if label.support >= self.min_support),
+            "features": len(self._postings),
+        }
+
+
+class BatchingPredictor:
+    """Grupează cererile concurente (până la max_batch / max_wait) într-un singur apel pe thread"""
+
+    def __init__(self, classifier: DiagnosticClassifier, max_batch: int = 32, max_wait_ms: float = 2.0):
+        self.classifier = classifier
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[tuple, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.requests = 0
+        self._latencies: Deque[float] = deque(maxlen=500)
+
+    async def predict(self, car_data: Dict[str, Any], obd2_analysis: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        started = time.perf_counter()
+        self._pending.append(((car_data, obd2_analysis), future))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        result = await future
+        self._latencies.append((time.perf_counter() - started) * 1000)
+        return result
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self.batches += 1
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[tuple, asyncio.Future]]):
+        try:
+            results = await asyncio.to_thread(self.classifier.predict_batch, [item for item, _ in batch])
+        except Exception as e:
+            logger.error(f"Eroare inferență CPU: {e}")
+            results = [None] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        return {
+            **self.classifier.stats(),
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else None,
+            "latency_p50_ms": round(latencies[len(latencies) // 2], 3) if latencies else None,
+            "latency_p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3) if latencies else None,
+        }
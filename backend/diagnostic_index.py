@@ -0,0 +1,199 @@
+"""
+🔎 INDEX DE SIMILARITATE PENTRU DIAGNOSTICE ANTERIOARE
+Vectori rari cu n-grame hash-uite (simptome) + coduri DTC, căutare aproximativă
+prin LSH cu hiperplane aleatoare (SimHash). Cererile aproape identice pot primi
+un diagnostic anterior fără un nou apel AI, sau îl primesc ca exemplu în prompt.
+"""
+
+import math
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from vehicle_names import normalize_car_data
+
+FEATURE_BITS = 18
+FEATURE_MASK = (1 << FEATURE_BITS) - 1
+
+# Ponderi pe tipuri de trăsături
+WEIGHT_WORD = 1.0
+WEIGHT_CHAR_NGRAM = 0.4
+WEIGHT_DTC = 3.0
+WEIGHT_DTC_GROUP = 1.0
+WEIGHT_OBD2 = 1.0
+
+YEAR_TOLERANCE = 4  # ani diferență acceptați între vehicule „similare”
+
+
+class SimilarDiagnostic(NamedTuple):
+    score: float
+    entry_id: str
+    response: Dict[str, Any]
+    car_data: Dict[str, Any]
+
+
+def _normalize_text(text: str) -> str:
+    """Litere mici, fără diacritice și punctuație"""
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return "".join(c if c.isalnum() else " " for c in text)
+
+
+def _feature_id(feature: str) -> int:
+    # crc32 e stabil între procese (hash() din Python nu este)
+    return zlib.crc32(feature.encode("utf-8")) & FEATURE_MASK
+
+
+def partition_key(car_data: Dict[str, Any]) -> str:
+    """Doar vehiculele cu aceeași marcă/model (canonice: „VW” = „Volkswagen”) sunt comparate"""
+    return normalize_car_data(car_data).key
+
+
+def vehicle_identified(car_data: Dict[str, Any]) -> bool:
+    """Marca și modelul recunoscute; altfel partiția („unknown|unknown”) amestecă vehicule diferite"""
+    name = normalize_car_data(car_data)
+    return bool(name.make and name.model)
+
+
+def vectorize(car_data: Dict[str, Any], obd2_analysis: Dict[str, Any] = None) -> Dict[int, float]:
+    """Vector rar L2-normalizat: cuvinte + trigrame din simptome, DTC-uri, probleme OBD2"""
+    weights: Dict[int, float] = defaultdict(float)
+
+    for symptom in car_data.get("simptome", []) or []:
+        for word in _normalize_text(symptom).split():
+            weights[_feature_id(f"w:{word}")] += WEIGHT_WORD
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                weights[_feature_id(f"c:{padded[i:i + 3]}")] += WEIGHT_CHAR_NGRAM
+
+    for code in car_data.get("coduri_dtc", []) or []:
+        code = str(code).strip().upper()
+        weights[_feature_id(f"dtc:{code}")] += WEIGHT_DTC
+        weights[_feature_id(f"dtcg:{code[:3]}")] += WEIGHT_DTC_GROUP
+
+    for problem in (obd2_analysis or {}).get("problems", []):
+        weights[_feature_id(f"obd:{_normalize_text(problem)}")] += WEIGHT_OBD2
+
+    # tf sublinear + normalizare L2
+    vector = {fid: 1.0 + math.log(w) if w >= 1 else w for fid, w in weights.items()}
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    if not norm:
+        return {}
+    return {fid: v / norm for fid, v in vector.items()}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(fid, 0.0) for fid, v in a.items())
+
+
+class DiagnosticIndex:
+    """Index LSH (SimHash, mai multe tabele) cu evacuare FIFO la capacitate maximă"""
+
+    def __init__(self, max_entries: int = 50000, bits: int = 12, tables: int = 6):
+        self.max_entries = max_entries
+        self.bits = bits
+        self.tables = tables
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._buckets: Dict[tuple, set] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.hits = 0
+
+    def _signatures(self, vector: Dict[int, float]) -> List[int]:
+        """Câte o semnătură de `bits` biți pentru fiecare tabelă LSH"""
+        signatures = []
+        for table in range(self.tables):
+            sums = [0.0] * self.bits
+            for fid, value in vector.items():
+                # Hiperplan pseudo-aleator, determinist: biții unui hash al (trăsătură, tabelă)
+                h = zlib.crc32(f"{table}:{fid}".encode())
+                for bit in range(self.bits):
+                    sums[bit] += value if (h >> bit) & 1 else -value
+            signature = 0
+            for bit, total in enumerate(sums):
+                if total > 0:
+                    signature |= 1 << bit
+            signatures.append(signature)
+        return signatures
+
+    def add(
+        self,
+        entry_id: str,
+        car_data: Dict[str, Any],
+        response: Dict[str, Any],
+        obd2_analysis: Dict[str, Any] = None,
+    ) -> bool:
+        vector = vectorize(car_data, obd2_analysis)
+        if not vector:
+            return False
+
+        partition = partition_key(car_data)
+        signatures = self._signatures(vector)
+        with self._lock:
+            if entry_id in self._entries:
+                return False
+            self._entries[entry_id] = (partition, vector, signatures, car_data, response)
+            for table, signature in enumerate(signatures):
+                self._buckets[(partition, table, signature)].add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                old_id, (old_partition, _, old_signatures, _, _) = self._entries.popitem(last=False)
+                for table, signature in enumerate(old_signatures):
+                    bucket = self._buckets.get((old_partition, table, signature))
+                    if bucket is not None:
+                        bucket.discard(old_id)
+                        if not bucket:
+                            del self._buckets[(old_partition, table, signature)]
+        return True
+
+    def query(
+        self,
+        car_data: Dict[str, Any],
+        obd2_analysis: Dict[str, Any] = None,
+        k: int = 3,
+        min_score: float = 0.0,
+    ) -> List[SimilarDiagnostic]:
+        """Cele mai similare k diagnostice (același model, an apropiat)"""
+        self.queries += 1
+        vector = vectorize(car_data, obd2_analysis)
+        if not vector:
+            return []
+
+        partition = partition_key(car_data)
+        year = car_data.get("year", 2023)
+        signatures = self._signatures(vector)
+
+        with self._lock:
+            candidates = set()
+            for table, signature in enumerate(signatures):
+                candidates.update(self._buckets.get((partition, table, signature), ()))
+            scored: List[Tuple[float, str]] = []
+            for entry_id in candidates:
+                _, other_vector, _, other_car, _ = self._entries[entry_id]
+                if abs(other_car.get("year", 2023) - year) > YEAR_TOLERANCE:
+                    continue
+                score = cosine(vector, other_vector)
+                if score >= min_score:
+                    scored.append((score, entry_id))
+            scored.sort(reverse=True)
+            results = [
+                SimilarDiagnostic(round(score, 4), entry_id, self._entries[entry_id][4], self._entries[entry_id][3])
+                for score, entry_id in scored[:k]
+            ]
+
+        if results:
+            self.hits += 1
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "buckets": len(self._buckets),
+            "queries": self.queries,
+            "hits": self.hits,
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,125 @@
+"""
+🧭 RUTARE PE NIVELURI DE COMPLEXITATE
+Scorul de complexitate vine din analiza OBD2 (probleme critice, număr de
+probleme/avertizări) și din bogăția cererii (DTC-uri, simptome, kilometraj).
+Cazurile triviale primesc direct diagnosticul inteligent local, cele medii motorul CPU
+in-process sau un model mic/local, iar doar cele complexe modelul mare de la distanță.
+"""
+
+import os
+import threading
+from collections import defaultdict, deque
+from typing import Optional, Any, Deque, Dict, List, NamedTuple, Tuple
+
+TIER_TRIVIAL = "trivial"
+TIER_MEDIUM = "medium"
+TIER_COMPLEX = "complex"
+
+# Ponderile scorului de complexitate
+WEIGHT_DTC = 1.0
+WEIGHT_CRITICAL = 3.0
+WEIGHT_SYMPTOM = 0.75
+WEIGHT_OBD2_PROBLEM = 1.0
+WEIGHT_OBD2_WARNING = 0.5
+WEIGHT_HIGH_MILEAGE = 0.5
+HIGH_MILEAGE_KM = 200000
+
+LATENCY_WINDOW = 500
+
+
+class RoutingDecision(NamedTuple):
+    tier: str
+    score: float
+    engines: List[Tuple[str, Optional[str]]]  # (motor, model) în ordinea încercărilor
+    breakdown: Dict[str, float]
+
+
+def complexity_score(car_data: Dict[str, Any], obd2_analysis: Dict[str, Any] = None) -> Tuple[float, Dict[str, float]]:
+    """Scorul de complexitate și contribuția fiecărei componente"""
+    symptoms = [s for s in car_data.get("simptome", []) or [] if str(s).strip()]
+    breakdown = {
+        "dtc": WEIGHT_DTC * len(car_data.get("coduri_dtc", []) or []),
+        "symptoms": WEIGHT_SYMPTOM * min(len(symptoms), 8),
+        "high_mileage": WEIGHT_HIGH_MILEAGE if float(car_data.get("mileage") or 0) >= HIGH_MILEAGE_KM else 0.0,
+    }
+    if obd2_analysis:
+        summary = obd2_analysis.get("summary", {})
+        breakdown["critical"] = WEIGHT_CRITICAL if summary.get("critical_issues") else 0.0
+        breakdown["obd2_problems"] = WEIGHT_OBD2_PROBLEM * summary.get("total_problems", 0)
+        breakdown["obd2_warnings"] = WEIGHT_OBD2_WARNING * summary.get("total_warnings", 0)
+    return round(sum(breakdown.values()), 2), breakdown
+
+
+class ComplexityRouter:
+    """Alege nivelul și lanțul de motoare/modele; ține latențele per nivel"""
+
+    def __init__(
+        self,
+        trivial_max: float,
+        complex_min: float,
+        tier_engines: Dict[str, List[Tuple[str, Optional[str]]]],
+    ):
+        self.trivial_max = trivial_max
+        self.complex_min = complex_min
+        self.tier_engines = tier_engines
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._engines: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def route(self, car_data: Dict[str, Any], obd2_analysis: Dict[str, Any] = None) -> RoutingDecision:
+        score, breakdown = complexity_score(car_data, obd2_analysis)
+        if score <= self.trivial_max:
+            tier = TIER_TRIVIAL
+        elif score >= self.complex_min:
+            tier = TIER_COMPLEX
+        else:
+            tier = TIER_MEDIUM
+        return RoutingDecision(tier, score, self.tier_engines.get(tier, []), breakdown)
+
+    def record(self, tier: str, engine: str, latency_ms: float):
+        with self._lock:
+            self._counts[tier] += 1
+            self._engines[tier][engine] += 1
+            self._latencies[tier].append(latency_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tiers = {}
+            for tier in (TIER_TRIVIAL, TIER_MEDIUM, TIER_COMPLEX):
+                latencies = sorted(self._latencies[tier])
+                tiers[tier] = {
+                    "requests": self._counts[tier],
+                    "engines": dict(self._engines[tier]),
+                    "engine_plan": [f"{engine}:{model or 'default'}" for engine, model in self.tier_engines.get(tier, [])],
+                    "latency_p50_ms": round(latencies[len(latencies) // 2], 2) if latencies else None,
+                    "latency_p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2) if latencies else None,
+                }
+            return {
+                "trivial_max": self.trivial_max,
+                "complex_min": self.complex_min,
+                "tiers": tiers,
+            }
+
+
+def create_router() -> Optional[ComplexityRouter]:
+    """Router din variabilele de mediu (ROUTER_ENABLED=false păstrează lanțul unic)"""
+    if os.getenv("ROUTER_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    openai_model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    small_openai = os.getenv("OPENAI_SMALL_MODEL", openai_model)
+    large_openai = os.getenv("OPENAI_LARGE_MODEL", openai_model)
+    small_gemini = os.getenv("GEMINI_SMALL_MODEL", "gemini-pro")
+    large_gemini = os.getenv("GEMINI_LARGE_MODEL", "gemini-pro")
+    local_model = os.getenv("OLLAMA_MODEL", "mistral")
+
+    return ComplexityRouter(
+        trivial_max=float(os.getenv("ROUTER_TRIVIAL_MAX", "0.5")),
+        complex_min=float(os.getenv("ROUTER_COMPLEX_MIN", "4.0")),
+        tier_engines={
+            TIER_TRIVIAL: [],
+            TIER_MEDIUM: [("cpu_model", None), ("local", local_model), ("openai", small_openai), ("gemini", small_gemini)],
+            TIER_COMPLEX: [("openai", large_openai), ("gemini", large_gemini), ("local", local_model), ("cpu_model", None)],
+        },
+    )
@@ -0,0 +1,698 @@
+"""
+📈 AGREGATE DE FLOTĂ ONLINE (SCHIȚE PROBABILISTICE)
+Fiecare diagnostic și fiecare mostră de telemetrie actualizează, pe săptămâni:
+count-min pentru frecvența codurilor DTC pe marcă / model / an, schițe de
+quantile (DDSketch) per semnal și model și HyperLogLog pentru vehicule
+distincte. Memoria e mărginită indiferent de trafic; schițele se unesc (merge)
+între workeri și instanțe și se salvează periodic pe disc.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+from operator import attrgetter
+from typing import Optional, Any, Dict, Iterable, List, Tuple
+
+from obd2_sample import LiveSample
+from vehicle_names import normalize_vehicle
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Semnalele pentru care se țin quantile per model
+FLEET_SIGNALS = [
+    "rpm", "speed", "coolant_temp", "engine_load", "fuel_pressure",
+    "intake_temp", "oxygen_sensor_voltage", "battery_voltage",
+]
+
+ALL = "*"
+
+_fleet_values = attrgetter(*FLEET_SIGNALS)
+
+
+def _hash64(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+# ============================================================================
+# SCHIȚE
+# ============================================================================
+
+class CountMinSketch:
+    """Frecvențe aproximative (niciodată subestimate) în width x depth contoare"""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = array("I", bytes(4 * width * depth))
+        self.total = 0
+
+    def _cells(self, key: str) -> List[int]:
+        # Dublă dispersie: depth poziții din două jumătăți ale aceluiași hash
+        h = _hash64(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key: str, count: int = 1) -> int:
+        """Actualizare conservatoare (crește doar contoarele minime); întoarce estimarea nouă"""
+        cells = self._cells(key)
+        table = self.table
+        estimate = min(table[cell] for cell in cells) + count
+        for cell in cells:
+            if table[cell] < estimate:
+                table[cell] = estimate
+        self.total += count
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        table = self.table
+        return min(table[cell] for cell in self._cells(key))
+
+    def merge(self, other: "CountMinSketch"):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Schițe count-min cu dimensiuni diferite")
+        table = self.table
+        for i, value in enumerate(other.table):
+            if value:
+                table[i] = min(0xFFFFFFFF, table[i] + value)
+        self.total += other.total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"width": self.width, "depth": self.depth, "total": self.total, "table": _b64(self.table.tobytes())}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CountMinSketch":
+        sketch = cls(data["width"], data["depth"])
+        sketch.table = array("I", base64.b64decode(data["table"]))
+        sketch.total = data.get("total", 0)
+        return sketch
+
+
+class QuantileSketch:
+    """DDSketch: quantile cu eroare relativă alpha, buckete logaritmice (număr mărginit)"""
+
+    MIN_VALUE = 1e-9
+
+    def __init__(self, alpha: float = 0.01, max_buckets: int = 512):
+        self.alpha = alpha
+        self.max_buckets = max_buckets
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float):
+        if value != value or value in (math.inf, -math.inf):
+            return
+        if value > self.MIN_VALUE:
+            store = self.positive
+            key = self._key(value)
+        elif value < -self.MIN_VALUE:
+            store = self.negative
+            key = self._key(-value)
+        else:
+            self.zero += 1
+            store = None
+        if store is not None:
+            store[key] = store.get(key, 0) + 1
+            if len(store) > self.max_buckets:
+                self._collapse(store)
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def add_many(self, values: List[float]):
+        """Ca add() pentru fiecare valoare, dar cu cheile calculate și numărate în bloc"""
+        values = [value for value in values if value == value and value not in (math.inf, -math.inf)]
+        if not values:
+            return
+        log, ceil, scale, floor = math.log, math.ceil, 1 / self._log_gamma, self.MIN_VALUE
+        for store, keys in (
+            (self.positive, Counter(ceil(log(value) * scale) for value in values if value > floor)),
+            (self.negative, Counter(ceil(log(-value) * scale) for value in values if value < -floor)),
+        ):
+            for key, count in keys.items():
+                store[key] = store.get(key, 0) + count
+            if len(store) > self.max_buckets:
+                self._collapse(store)
+        self.zero += sum(1 for value in values if -floor <= value <= floor)
+        self.count += len(values)
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+
+    def _collapse(self, store: Dict[int, int]):
+        """Peste max_buckets se unesc bucketele cele mai apropiate de zero (precizia se pierde acolo)"""
+        keys = sorted(store)
+        while len(keys) > self.max_buckets:
+            lowest = keys.pop(0)
+            store[keys[0]] += store.pop(lowest)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        value = None
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                value = -self._value(key)
+                break
+        if value is None:
+            seen += self.zero
+            if seen > rank:
+                value = 0.0
+        if value is None:
+            for key in sorted(self.positive):
+                seen += self.positive[key]
+                if seen > rank:
+                    value = self._value(key)
+                    break
+        if value is None:
+            value = self.max
+        return min(self.max, max(self.min, value))
+
+    def merge(self, other: "QuantileSketch"):
+        if other.alpha != self.alpha:
+            raise ValueError("Schițe de quantile cu precizii diferite")
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+            if len(mine) > self.max_buckets:
+                self._collapse(mine)
+        self.zero += other.zero
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "alpha": self.alpha,
+            "positive": {str(key): count for key, count in self.positive.items()},
+            "negative": {str(key): count for key, count in self.negative.items()},
+            "zero": self.zero,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_buckets: int = 512) -> "QuantileSketch":
+        sketch = cls(data["alpha"], max_buckets)
+        sketch.positive = {int(key): count for key, count in data.get("positive", {}).items()}
+        sketch.negative = {int(key): count for key, count in data.get("negative", {}).items()}
+        sketch.zero = data.get("zero", 0)
+        sketch.count = data.get("count", 0)
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+
+class HyperLogLog:
+    """Număr aproximativ de elemente distincte în 2^p registre de un octet"""
+
+    def __init__(self, p: int = 12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(self.m)
+
+    def add(self, key: str):
+        h = _hash64(key)
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        m = self.m
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Cardinalitate mică: numărarea liniară a registrelor goale e mai precisă
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog"):
+        if other.p != self.p:
+            raise ValueError("HyperLogLog cu precizii diferite")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"p": self.p, "registers": _b64(bytes(self.registers))}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HyperLogLog":
+        sketch = cls(data["p"])
+        sketch.registers = bytearray(base64.b64decode(data["registers"]))
+        return sketch
+
+
+class SignalSketches:
+    """Quantile per semnal pentru o serie de mostre (construite și în workeri, apoi unite)
+
+    Valorile se adună pe coloane și intră în schițe în bloc, la to_dict()
+    """
+
+    def __init__(self, alpha: float = 0.01):
+        self.alpha = alpha
+        self.columns: Dict[str, List[float]] = {signal: [] for signal in FLEET_SIGNALS}
+        # Mostrele LiveSample (schemă completă) se țin ca tupluri și se transpun la final
+        self._rows: List[Tuple[float, ...]] = []
+
+    def add(self, sample: Any):
+        if type(sample) is LiveSample:
+            self._rows.append(_fleet_values(sample))
+            return
+        get = sample.get
+        for signal, column in self.columns.items():
+            value = get(signal)
+            if isinstance(value, (int, float)):
+                column.append(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self._rows:
+            for column, values in zip(self.columns.values(), zip(*self._rows)):
+                column.extend(values)
+            self._rows = []
+        result = {}
+        for signal, column in self.columns.items():
+            if column:
+                sketch = QuantileSketch(self.alpha)
+                sketch.add_many(column)
+                result[signal] = sketch.to_dict()
+        return result
+
+
+# ============================================================================
+# AGREGATE PE SĂPTĂMÂNI
+# ============================================================================
+
+def week_of(timestamp: Optional[float] = None) -> str:
+    """Săptămâna ISO (ex. 2026-W42)"""
+    year, week, _ = datetime.fromtimestamp(timestamp if timestamp is not None else time.time()).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def segments_for(make: str, model: str, year: Optional[int]) -> List[str]:
+    """Nivelurile de agregare ale unui vehicul: toată flota, marcă, model, model+an"""
+    segments = [ALL, make, f"{make}|{model}"]
+    if year:
+        segments.append(f"{make}|{model}|{year}")
+    return segments
+
+
+class _Week:
+    """Schițele unei săptămâni"""
+
+    def __init__(self, cms_width: int, cms_depth: int, hll_p: int):
+        self.dtc = CountMinSketch(cms_width, cms_depth)
+        # segment -> {cod: estimare}: candidații pentru „cele mai frecvente”, mărginiți per segment
+        self.top: Dict[str, Dict[str, int]] = {}
+        # (marcă|model, semnal) -> quantile
+        self.signals: Dict[Tuple[str, str], QuantileSketch] = {}
+        self.vehicles = HyperLogLog(hll_p)
+        self.model_vehicles: Dict[str, HyperLogLog] = {}
+        self.diagnostics = 0
+        self.samples = 0
+
+
+class FleetStats:
+    """Agregate de flotă cu memorie mărginită, actualizate la fiecare diagnostic / mostră"""
+
+    def __init__(
+        self,
+        weeks: int = 12,
+        max_segments: int = 5000,
+        top_k: int = 20,
+        alpha: float = 0.01,
+        cms_width: int = 2048,
+        cms_depth: int = 4,
+        hll_p: int = 12,
+        model_hll_p: int = 8,
+    ):
+        self.max_weeks = weeks
+        self.max_segments = max_segments
+        self.top_k = top_k
+        self.alpha = alpha
+        self.cms_width = cms_width
+        self.cms_depth = cms_depth
+        self.hll_p = hll_p
+        self.model_hll_p = model_hll_p
+        self._weeks: Dict[str, _Week] = {}
+        self._lock = threading.Lock()
+        self.dirty = False
+        self.dropped_segments = 0
+        self.saved_at: Optional[float] = None
+
+    def _week(self, week: str) -> _Week:
+        current = self._weeks.get(week)
+        if current is None:
+            current = self._weeks[week] = _Week(self.cms_width, self.cms_depth, self.hll_p)
+            for old in sorted(self._weeks)[:-self.max_weeks]:
+                del self._weeks[old]
+        return current
+
+    def _has_room(self, table: Dict[Any, Any], key: Any) -> bool:
+        if key in table or len(table) < self.max_segments:
+            return True
+        self.dropped_segments += 1
+        return False
+
+    def _offer(self, week: _Week, segment: str, code: str, estimate: int):
+        """Păstrează codul printre candidații segmentului dacă e între cei mai frecvenți"""
+        if not self._has_room(week.top, segment):
+            return
+        candidates = week.top.setdefault(segment, {})
+        candidates[code] = estimate
+        if len(candidates) > 2 * self.top_k:
+            keep = sorted(candidates.items(), key=lambda item: item[1], reverse=True)[:self.top_k]
+            week.top[segment] = dict(keep)
+
+    @staticmethod
+    def vehicle(car_type: Any, model: Any = None, year: Any = None) -> Tuple[str, str, Optional[int]]:
+        """(marcă, model, an) canonice, ca la istoric"""
+        name = normalize_vehicle(car_type, model)
+        make = name.make or name.make_text or "unknown"
+        model_name = name.model or name.model_text or "unknown"
+        try:
+            year = int(year) if year else None
+        except (TypeError, ValueError):
+            year = None
+        return make, model_name, year
+
+    @staticmethod
+    def vehicle_id(car_data: Dict[str, Any], make: str, model: str, year: Optional[int]) -> Optional[str]:
+        """Identitatea vehiculului pentru HyperLogLog: VIN, altfel utilizator + vehicul, altfel sesiune"""
+        vin = str(car_data.get("vin") or "").strip().upper()
+        if vin:
+            return f"vin:{vin}"
+        if car_data.get("user_id"):
+            return f"user:{car_data['user_id']}|{make}|{model}|{year}"
+        if car_data.get("session_id"):
+            return f"session:{car_data['session_id']}"
+        return None
+
+    def record_diagnostic(self, car_data: Dict[str, Any], timestamp: Optional[float] = None):
+        """DTC-uri, vehicul distinct și (dacă există) mostra OBD2 a unei cereri de diagnostic"""
+        make, model, year = self.vehicle(car_data.get("car_type"), car_data.get("model"), car_data.get("year"))
+        segments = segments_for(make, model, year)
+        vehicle_id = self.vehicle_id(car_data, make, model, year)
+        with self._lock:
+            week = self._week(week_of(timestamp))
+            week.diagnostics += 1
+            for code in set(car_data.get("coduri_dtc") or []):
+                for segment in segments:
+                    self._offer(week, segment, code, week.dtc.add(f"{segment}|{code}"))
+            if vehicle_id:
+                self._add_vehicle(week, f"{make}|{model}", vehicle_id)
+            sample = car_data.get("obd2_data")
+            if car_data.get("obd2_connected") and isinstance(sample, dict) and "error" not in sample:
+                self._add_samples(week, f"{make}|{model}", [sample])
+            self.dirty = True
+
+    def record_samples(
+        self,
+        car_type: Any,
+        model: Any,
+        samples: Iterable[Any],
+        vehicle_id: Optional[str] = None,
+        timestamp: Optional[float] = None,
+    ):
+        """Mostre de telemetrie (LiveSample sau dicționare) pentru un model"""
+        make, model, _ = self.vehicle(car_type, model)
+        with self._lock:
+            week = self._week(week_of(timestamp))
+            self._add_samples(week, f"{make}|{model}", samples)
+            if vehicle_id:
+                self._add_vehicle(week, f"{make}|{model}", vehicle_id)
+            self.dirty = True
+
+    def merge_signal_sketches(
+        self,
+        car_type: Any,
+        model: Any,
+        sketches: Dict[str, Dict[str, Any]],
+        samples: int = 0,
+        vehicle_id: Optional[str] = None,
+        timestamp: Optional[float] = None,
+    ):
+        """Unește schițele construite într-un worker (SignalSketches.to_dict())"""
+        make, model, _ = self.vehicle(car_type, model)
+        model_key = f"{make}|{model}"
+        with self._lock:
+            week = self._week(week_of(timestamp))
+            week.samples += samples
+            for signal, data in sketches.items():
+                sketch = QuantileSketch.from_dict(data)
+                for key in ((model_key, signal), (ALL, signal)):
+                    target = self._signal(week, key)
+                    if target is not None:
+                        target.merge(sketch)
+            if vehicle_id:
+                self._add_vehicle(week, model_key, vehicle_id)
+            self.dirty = True
+
+    def _signal(self, week: _Week, key: Tuple[str, str]) -> Optional[QuantileSketch]:
+        sketch = week.signals.get(key)
+        if sketch is None and self._has_room(week.signals, key):
+            sketch = week.signals[key] = QuantileSketch(self.alpha)
+        return sketch
+
+    def _add_samples(self, week: _Week, model_key: str, samples: Iterable[Any]):
+        for sample in samples:
+            week.samples += 1
+            get = sample.get
+            for signal in FLEET_SIGNALS:
+                value = get(signal)
+                if not isinstance(value, (int, float)):
+                    continue
+                for key in ((model_key, signal), (ALL, signal)):
+                    sketch = self._signal(week, key)
+                    if sketch is not None:
+                        sketch.add(float(value))
+
+    def _add_vehicle(self, week: _Week, model_key: str, vehicle_id: str):
+        week.vehicles.add(vehicle_id)
+        if self._has_room(week.model_vehicles, model_key):
+            sketch = week.model_vehicles.get(model_key)
+            if sketch is None:
+                sketch = week.model_vehicles[model_key] = HyperLogLog(self.model_hll_p)
+            sketch.add(vehicle_id)
+
+    # ------------------------------------------------------------------
+    # Interogare
+    # ------------------------------------------------------------------
+
+    def _recent(self, weeks: int) -> List[_Week]:
+        now = datetime.now()
+        wanted = {week_of((now - timedelta(weeks=i)).timestamp()) for i in range(max(1, weeks))}
+        return [week for name, week in self._weeks.items() if name in wanted]
+
+    def query(
+        self,
+        car_type: Optional[str] = None,
+        model: Optional[str] = None,
+        year: Optional[int] = None,
+        weeks: int = 1,
+        signals: Optional[List[str]] = None,
+        quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99),
+        top: int = 10,
+    ) -> Dict[str, Any]:
+        """Cele mai frecvente DTC, quantile per semnal (per model dacă nu e dat modelul), vehicule distincte"""
+        segment, model_key = ALL, None
+        if car_type:
+            make, model_name, year = self.vehicle(car_type, model, year)
+            segment = make
+            if model:
+                model_key = f"{make}|{model_name}"
+                segment = f"{model_key}|{year}" if year else model_key
+
+        signals = [signal for signal in (signals or FLEET_SIGNALS) if signal in FLEET_SIGNALS]
+        with self._lock:
+            selected = self._recent(weeks)
+
+            codes = set()
+            for week in selected:
+                codes.update(week.top.get(segment, {}))
+            counts = {code: sum(week.dtc.estimate(f"{segment}|{code}") for week in selected) for code in codes}
+            top_dtc = [
+                {"code": code, "count": count}
+                for code, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top]
+            ]
+
+            def merged(key: Tuple[str, str]) -> Optional[QuantileSketch]:
+                result = None
+                for week in selected:
+                    sketch = week.signals.get(key)
+                    if sketch is not None:
+                        if result is None:
+                            result = QuantileSketch(self.alpha)
+                        result.merge(sketch)
+                return result
+
+            def describe(sketch: Optional[QuantileSketch]) -> Optional[Dict[str, Any]]:
+                if sketch is None:
+                    return None
+                values = {f"p{round(q * 100, 1):g}": sketch.quantile(q) for q in quantiles}
+                return {"count": sketch.count, "min": sketch.min, "max": sketch.max, **{
+                    name: round(value, 3) for name, value in values.items()
+                }}
+
+            if model_key or not car_type:
+                scope = model_key or ALL
+                signal_stats = {signal: describe(merged((scope, signal))) for signal in signals}
+            else:
+                signal_stats = {}
+            by_model: Dict[str, Dict[str, Any]] = {}
+            if not model_key:
+                # Fără model: quantile pe fiecare model (al mărcii, dacă e dată)
+                models = {
+                    key for week in selected for key, signal in week.signals
+                    if key != ALL and (not car_type or key.startswith(f"{segment}|"))
+                }
+                for key in sorted(models):
+                    by_model[key] = {signal: describe(merged((key, signal))) for signal in signals}
+                    by_model[key] = {signal: stats for signal, stats in by_model[key].items() if stats}
+
+            vehicles = None
+            for week in selected:
+                source = week.model_vehicles.get(model_key) if model_key else week.vehicles
+                if source is not None:
+                    if vehicles is None:
+                        vehicles = HyperLogLog(source.p)
+                    vehicles.merge(source)
+
+            return {
+                "segment": segment,
+                "weeks": sorted(name for name, week in self._weeks.items() if week in selected),
+                "diagnostics": sum(week.diagnostics for week in selected),
+                "samples": sum(week.samples for week in selected),
+                "top_dtc": top_dtc,
+                "signals": signal_stats,
+                "by_model": by_model,
+                "distinct_vehicles": vehicles.count() if vehicles else 0,
+                "approximate": True,
+            }
+
+    # ------------------------------------------------------------------
+    # Snapshot-uri (se pot uni între instanțe)
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self.dirty = False
+            return {
+                "version": SNAPSHOT_VERSION,
+                "saved_at": time.time(),
+                "alpha": self.alpha,
+                "weeks": {
+                    name: {
+                        "dtc": week.dtc.to_dict(),
+                        "top": week.top,
+                        "signals": {f"{key}#{signal}": sketch.to_dict() for (key, signal), sketch in week.signals.items()},
+                        "vehicles": week.vehicles.to_dict(),
+                        "model_vehicles": {key: sketch.to_dict() for key, sketch in week.model_vehicles.items()},
+                        "diagnostics": week.diagnostics,
+                        "samples": week.samples,
+                    }
+                    for name, week in self._weeks.items()
+                },
+            }
+
+    def merge_snapshot(self, snapshot: Dict[str, Any]):
+        """Unește un snapshot (propriu, de la repornire, sau al altei instanțe)"""
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Versiune snapshot necunoscută: {snapshot.get('version')}")
+        with self._lock:
+            for week_name, data in snapshot.get("weeks", {}).items():
+                week = self._week(week_name)
+                if week_name not in self._weeks:
+                    continue  # mai veche decât fereastra păstrată
+                week.dtc.merge(CountMinSketch.from_dict(data["dtc"]))
+                for segment, candidates in data.get("top", {}).items():
+                    for code in candidates:
+                        self._offer(week, segment, code, week.dtc.estimate(f"{segment}|{code}"))
+                for name_signal, sketch in data.get("signals", {}).items():
+                    key, _, signal = name_signal.rpartition("#")
+                    target = self._signal(week, (key, signal))
+                    if target is not None:
+                        target.merge(QuantileSketch.from_dict(sketch))
+                week.vehicles.merge(HyperLogLog.from_dict(data["vehicles"]))
+                for key, sketch in data.get("model_vehicles", {}).items():
+                    if self._has_room(week.model_vehicles, key):
+                        incoming = HyperLogLog.from_dict(sketch)
+                        week.model_vehicles.setdefault(key, HyperLogLog(incoming.p)).merge(incoming)
+                week.diagnostics += data.get("diagnostics", 0)
+                week.samples += data.get("samples", 0)
+
+    def save(self, path: str):
+        """Scriere atomică (fișier temporar + rename)"""
+        snapshot = self.snapshot()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        self.saved_at = time.time()
+
+    def load(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        with open(path, encoding="utf-8") as f:
+            self.merge_snapshot(json.load(f))
+        self.dirty = False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "weeks": sorted(self._weeks),
+                "segments": sum(len(week.top) for week in self._weeks.values()),
+                "signal_sketches": sum(len(week.signals) for week in self._weeks.values()),
+                "dropped_segments": self.dropped_segments,
+                "saved_at": self.saved_at,
+            }
+
+
+def create_fleet_stats() -> Optional[FleetStats]:
+    """Agregate din variabilele de mediu; None dacă FLEET_STATS_ENABLED=false"""
+    if os.getenv("FLEET_STATS_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    return FleetStats(
+        weeks=int(os.getenv("FLEET_STATS_WEEKS", "12")),
+        max_segments=int(os.getenv("FLEET_STATS_MAX_SEGMENTS", "5000")),
+        top_k=int(os.getenv("FLEET_STATS_TOP_K", "20")),
+        alpha=float(os.getenv("FLEET_STATS_QUANTILE_ALPHA", "0.01")),
+    )
@@ -0,0 +1,352 @@
+"""
+🗄️ ISTORIC DIAGNOSTICE (SQLite WAL)
+Fiecare cerere/răspuns de diagnostic se salvează printr-o coadă de scriere
+procesată de un thread dedicat (scrieri în loturi, fără a bloca event loop-ul).
+Citirile folosesc conexiuni per thread și indecși pe user, vehicul, DTC și timp.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional, Any, Dict, List
+
+from vehicle_names import normalize_car_data
+
+logger = logging.getLogger(__name__)
+
+MILEAGE_BUCKET_KM = 5000  # sub acest prag kilometrajul nu schimbă „material” diagnosticul
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS diagnostics (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    user_id TEXT,
+    session_id TEXT,
+    vehicle_key TEXT NOT NULL,
+    car_type TEXT,
+    model TEXT,
+    year INTEGER,
+    mileage REAL,
+    fingerprint TEXT NOT NULL,
+    ai_engine TEXT,
+    request_json TEXT NOT NULL,
+    response_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS diagnostic_dtc (
+    diagnostic_id TEXT NOT NULL REFERENCES diagnostics(id) ON DELETE CASCADE,
+    code TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_diag_user_time ON diagnostics(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_diag_session_time ON diagnostics(session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_diag_vehicle_time ON diagnostics(vehicle_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_diag_fingerprint ON diagnostics(fingerprint, created_at);
+CREATE INDEX IF NOT EXISTS idx_diag_time ON diagnostics(created_at);
+CREATE INDEX IF NOT EXISTS idx_dtc_code ON diagnostic_dtc(code, diagnostic_id);
+"""
+
+
+def vehicle_key(car_data: Dict[str, Any]) -> str:
+    """Cheia vehiculului: VIN dacă există, altfel marcă|model canonice|an"""
+    vin = str(car_data.get("vin") or "").strip().upper()
+    if vin:
+        return f"vin:{vin}"
+    return f"{normalize_car_data(car_data).key}|{car_data.get('year', 2023)}"
+
+
+def input_fingerprint(car_data: Dict[str, Any], obd2_analysis: Dict[str, Any] = None) -> str:
+    """Amprenta intrărilor relevante pentru diagnostic
+
+    Ignoră timestamp-ul, ordinea simptomelor/codurilor și variațiile mici
+    de kilometraj; include problemele OBD2 detectate, nu valorile live.
+    """
+    material = {
+        "vehicle": vehicle_key(car_data),
+        "mileage_bucket": int(float(car_data.get("mileage") or 0) // MILEAGE_BUCKET_KM),
+        "symptoms": sorted({str(s).strip().lower() for s in car_data.get("simptome", [])}),
+        "dtc": sorted({str(c).strip().upper() for c in car_data.get("coduri_dtc", [])}),
+        "obd2": sorted(
+            (obd2_analysis or {}).get("problems", []) + (obd2_analysis or {}).get("warnings", [])
+        ),
+    }
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class DiagnosticHistoryStore:
+    """Persistență diagnostice cu scriere asincronă prin coadă"""
+
+    def __init__(self, path: str, queue_size: int = 10000, batch_size: int = 100):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        self._writer: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Conexiune de citire per thread (WAL permite citiri concurente)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # Scriere (thread dedicat)
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._writer and self._writer.is_alive():
+            return
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+        logger.info(f"🗄️ Istoric diagnostice activ: {self.path}")
+
+    def stop(self, timeout: float = 5.0):
+        """Golește coada și oprește thread-ul de scriere"""
+        if self._writer and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout)
+
+    def record(
+        self,
+        car_data: Dict[str, Any],
+        response: Dict[str, Any],
+        fingerprint: str,
+        diagnostic_id: Optional[str] = None,
+    ) -> str:
+        """Pune diagnosticul în coada de scriere (nu blochează)"""
+        diagnostic_id = diagnostic_id or uuid.uuid4().hex
+        row = (
+            diagnostic_id,
+            time.time(),
+            car_data.get("user_id"),
+            car_data.get("session_id"),
+            vehicle_key(car_data),
+            car_data.get("car_type"),
+            car_data.get("model"),
+            car_data.get("year"),
+            car_data.get("mileage"),
+            fingerprint,
+            response.get("ai_engine_used"),
+            json.dumps(car_data, ensure_ascii=False, default=str),
+            json.dumps(response, ensure_ascii=False, default=str),
+        )
+        codes = sorted({str(c).upper() for c in car_data.get("coduri_dtc", [])})
+        try:
+            self._queue.put_nowait((row, codes))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Coada istoricului este plină - diagnostic nesalvat")
+        return diagnostic_id
+
+    def _write_loop(self):
+        conn = self._connect()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # Adună tot ce s-a acumulat, într-o singură tranzacție
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                running = False
+                batch = [item for item in batch if item is not None]
+            if not batch:
+                continue
+
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO diagnostics VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                        [row for row, _ in batch],
+                    )
+                    conn.executemany(
+                        "INSERT INTO diagnostic_dtc (diagnostic_id, code) VALUES (?, ?)",
+                        [(row[0], code) for row, codes in batch for code in codes],
+                    )
+                self.written += len(batch)
+            except sqlite3.Error as e:
+                logger.error(f"Eroare scriere istoric: {e}")
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # Citire
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "diagnostic_id": row["id"],
+            "created_at": row["created_at"],
+            "user_id": row["user_id"],
+            "session_id": row["session_id"],
+            "vehicle_key": row["vehicle_key"],
+            "mileage": row["mileage"],
+            "ai_engine": row["ai_engine"],
+            "request": json.loads(row["request_json"]),
+            "response": json.loads(row["response_json"]),
+        }
+
+    @staticmethod
+    def _public_row(row: sqlite3.Row) -> Dict[str, Any]:
+        """Fără identificatorii utilizatorului și fără corpul cererii (istoric partajat pe vehicul)"""
+        request = json.loads(row["request_json"])
+        return {
+            "diagnostic_id": row["id"],
+            "created_at": row["created_at"],
+            "vehicle_key": row["vehicle_key"],
+            "mileage": row["mileage"],
+            "ai_engine": row["ai_engine"],
+            "symptoms": request.get("simptome", []),
+            "dtc_codes": request.get("coduri_dtc", []),
+            "response": json.loads(row["response_json"]),
+        }
+
+    @staticmethod
+    def _owner_filter(user_id: Optional[str], session_id: Optional[str], alias: str = "") -> tuple:
+        """(condiție SQL, parametri) pentru rândurile aceluiași user sau aceleiași sesiuni"""
+        clauses, params = [], []
+        if user_id:
+            clauses.append(f"{alias}user_id = ?")
+            params.append(user_id)
+        if session_id:
+            clauses.append(f"{alias}session_id = ?")
+            params.append(session_id)
+        return f"({' OR '.join(clauses)})", params
+
+    def find_reusable(
+        self,
+        fingerprint: str,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        max_age_seconds: float = 7 * 24 * 3600,
+        exclude_engines: List[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Cel mai recent diagnostic cu aceeași amprentă, al aceluiași user sau al aceleiași sesiuni
+
+        Fără user_id/session_id nu se refolosește nimic (altfel s-ar servi
+        diagnosticul altui utilizator); motoarele din exclude_engines (fallback
+        local) nu se refolosesc, ca un AI revenit să fie întrebat din nou.
+        """
+        if not (user_id or session_id):
+            return None
+        owner, owner_params = self._owner_filter(user_id, session_id)
+        sql = f"SELECT * FROM diagnostics WHERE fingerprint = ? AND created_at >= ? AND {owner}"
+        params: List[Any] = [fingerprint, time.time() - max_age_seconds, *owner_params]
+        if exclude_engines:
+            sql += f" AND ai_engine NOT IN ({','.join('?' * len(exclude_engines))})"
+            params.extend(exclude_engines)
+        sql += " ORDER BY created_at DESC LIMIT 1"
+        row = self._reader().execute(sql, params).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def vehicle_history(
+        self,
+        key: str,
+        dtc: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 50,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Istoricul unui vehicul, cel mai recent primul (opțional filtrat după DTC)
+
+        Fără VIN, cheia (marcă|model|an) e comună multor utilizatori: rezultatele
+        se limitează la user_id/session_id, iar fără ele lista e goală. Rândurile
+        nu conțin identificatorii utilizatorilor și nici cererea originală.
+        """
+        sql = "SELECT d.* FROM diagnostics d"
+        params: List[Any] = []
+        if dtc:
+            sql += " JOIN diagnostic_dtc c ON c.diagnostic_id = d.id AND c.code = ?"
+            params.append(dtc.upper())
+        sql += " WHERE d.vehicle_key = ?"
+        params.append(key)
+        if user_id or session_id:
+            owner, owner_params = self._owner_filter(user_id, session_id, "d.")
+            sql += f" AND {owner}"
+            params.extend(owner_params)
+        elif not key.startswith("vin:"):
+            return []
+        if since is not None:
+            sql += " AND d.created_at >= ?"
+            params.append(since)
+        sql += " ORDER BY d.created_at DESC LIMIT ?"
+        params.append(limit)
+        return [self._public_row(row) for row in self._reader().execute(sql, params)]
+
+    def recent(self, limit: int = 1000, exclude_engines: List[str] = None) -> List[Dict[str, Any]]:
+        """Cele mai recente diagnostice (pentru reconstruirea indecșilor în memorie)"""
+        sql = "SELECT * FROM diagnostics"
+        params: List[Any] = []
+        if exclude_engines:
+            sql += f" WHERE ai_engine NOT IN ({','.join('?' * len(exclude_engines))})"
+            params.extend(exclude_engines)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        return [self._row_to_dict(row) for row in self._reader().execute(sql, params)]
+
+    def get(
+        self,
+        diagnostic_id: str,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Rândul complet doar pentru proprietar (user_id sau session_id); altfel forma publică"""
+        row = self._reader().execute(
+            "SELECT * FROM diagnostics WHERE id = ?", (diagnostic_id,)
+        ).fetchone()
+        if not row:
+            return None
+        owner = (user_id and row["user_id"] == user_id) or (session_id and row["session_id"] == session_id)
+        if owner:
+            return self._row_to_dict(row)
+        # Cine are doar id-ul (ex. reused_from) nu află nici VIN-ul din cheia vehiculului
+        entry = self._public_row(row)
+        del entry["vehicle_key"]
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+def create_history_store() -> Optional[DiagnosticHistoryStore]:
+    """Creează store-ul din variabilele de mediu (HISTORY_ENABLED=false îl dezactivează)"""
+    if os.getenv("HISTORY_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    path = os.getenv(
+        "HISTORY_DB_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "diagnostic_history.db"),
+    )
+    try:
+        return DiagnosticHistoryStore(path)
+    except sqlite3.Error as e:
+        logger.error(f"Istoricul diagnosticelor nu poate fi deschis ({path}): {e}")
+        return None
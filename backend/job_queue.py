@@ -0,0 +1,244 @@
+"""
+📬 COADĂ DE JOBURI PENTRU DIAGNOSTICE AI LENTE
+Cererea primește imediat un id de job; un pool limitat de workeri asyncio
+procesează joburile pe priorități, cu round-robin între utilizatori (un user
+cu multe cereri nu îi blochează pe ceilalți). Când coada e plină, cererile
+noi sunt refuzate (admission control) în loc să aștepte la nesfârșit.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Optional, Any, Awaitable, Callable, Deque, Dict, List
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Coada (sau cota utilizatorului) este plină"""
+
+    def __init__(self, message: str, retry_after: int, per_user: bool = False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.per_user = per_user
+
+
+class DiagnosticJob:
+    """Un diagnostic în așteptare / în lucru / terminat"""
+
+    def __init__(self, payload: Any, user_id: str, priority: int):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.user_id = user_id
+        self.priority = priority
+        self.status = JOB_QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.listeners: List[Callable[["DiagnosticJob"], Awaitable[None]]] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = self.result
+        if hasattr(result, "model_dump"):
+            result = result.model_dump()
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "priority": next(name for name, value in PRIORITIES.items() if value == self.priority),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_time_ms": round(((self.started_at or time.time()) - self.created_at) * 1000, 2),
+            "result": result,
+            "error": self.error,
+        }
+
+
+class FairJobQueue:
+    """Coadă cu priorități și fairness per utilizator, procesată de N workeri"""
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[Any]],
+        workers: int = 4,
+        max_queued: int = 200,
+        max_per_user: int = 10,
+        result_ttl: float = 3600.0,
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_per_user = max_per_user
+        self.result_ttl = result_ttl
+
+        # priorități -> user -> joburi în așteptare; ordinea userilor = round-robin
+        self._levels: Dict[int, "OrderedDict[str, Deque[DiagnosticJob]]"] = {
+            level: OrderedDict() for level in sorted(PRIORITIES.values())
+        }
+        self._jobs: Dict[str, DiagnosticJob] = {}
+        self._pending_per_user: Dict[str, int] = {}
+        self._queued = 0
+        self._running = 0
+        self._available: Optional[asyncio.Semaphore] = None  # câte joburi așteaptă
+        self._tasks: List[asyncio.Task] = []
+        self._avg_job_seconds = 5.0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    # ------------------------------------------------------------------
+    # Admitere
+    # ------------------------------------------------------------------
+
+    def _retry_after(self) -> int:
+        """Estimare (secunde) până se eliberează loc în coadă"""
+        backlog = self._queued + self._running
+        return max(1, int(backlog / max(1, self.workers) * self._avg_job_seconds))
+
+    def submit(self, payload: Any, user_id: str, priority: str = "normal") -> DiagnosticJob:
+        self._ensure_started()
+        self._prune()
+
+        if self._queued >= self.max_queued:
+            self.rejected += 1
+            raise JobQueueFull("Coada de diagnostice este plină", self._retry_after())
+        if self._pending_per_user.get(user_id, 0) >= self.max_per_user:
+            self.rejected += 1
+            raise JobQueueFull(
+                f"Prea multe diagnostice în așteptare pentru {user_id}",
+                self._retry_after(),
+                per_user=True,
+            )
+
+        job = DiagnosticJob(payload, user_id, PRIORITIES.get(priority, PRIORITIES["normal"]))
+        self._jobs[job.id] = job
+        self._levels[job.priority].setdefault(user_id, deque()).append(job)
+        self._pending_per_user[user_id] = self._pending_per_user.get(user_id, 0) + 1
+        self._queued += 1
+        self._available.release()
+        return job
+
+    def get(self, job_id: str) -> Optional[DiagnosticJob]:
+        return self._jobs.get(job_id)
+
+    async def add_listener(self, job_id: str, listener: Callable[[DiagnosticJob], Awaitable[None]]) -> bool:
+        """Apelat la finalizarea jobului (imediat, dacă s-a terminat deja)"""
+        job = self._jobs.get(job_id)
+        if not job:
+            return False
+        if job.finished:
+            await listener(job)
+        else:
+            job.listeners.append(listener)
+        return True
+
+    # ------------------------------------------------------------------
+    # Workeri
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._available = asyncio.Semaphore(0)
+        # Workerii pornesc din primul submit(): fără un context gol ar moșteni
+        # variabilele de context ale acelei cereri (ex. trasarea X-Trace)
+        self._tasks = [
+            contextvars.Context().run(loop.create_task, self._worker(i)) for i in range(self.workers)
+        ]
+        logger.info(f"📬 Coadă diagnostice pornită cu {self.workers} workeri")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _next_job(self) -> Optional[DiagnosticJob]:
+        """Cea mai mare prioritate; în cadrul ei, următorul user din round-robin"""
+        for users in self._levels.values():
+            if users:
+                user_id, jobs = next(iter(users.items()))
+                job = jobs.popleft()
+                if jobs:
+                    users.move_to_end(user_id)
+                else:
+                    del users[user_id]
+                return job
+        return None
+
+    async def _worker(self, number: int):
+        while True:
+            await self._available.acquire()
+            job = self._next_job()
+            if job is None:
+                continue
+
+            self._queued -= 1
+            self._running += 1
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            try:
+                job.result = await self.handler(job.payload)
+                job.status = JOB_DONE
+                self.completed += 1
+            except Exception as e:
+                job.status = JOB_FAILED
+                job.error = str(getattr(e, "detail", e))
+                self.failed += 1
+                logger.error(f"Job diagnostic {job.id} eșuat: {job.error}")
+            finally:
+                job.finished_at = time.time()
+                self._running -= 1
+                remaining = self._pending_per_user.get(job.user_id, 1) - 1
+                if remaining > 0:
+                    self._pending_per_user[job.user_id] = remaining
+                else:
+                    self._pending_per_user.pop(job.user_id, None)
+                # Medie exponențială a duratei, pentru Retry-After
+                self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * (job.finished_at - job.started_at)
+
+            for listener in job.listeners:
+                try:
+                    await listener(job)
+                except Exception as e:
+                    logger.warning(f"Notificare job {job.id} eșuată: {e}")
+            job.listeners = []
+
+    def _prune(self):
+        """Șterge rezultatele mai vechi decât result_ttl"""
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queued": self._queued,
+            "running": self._running,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_job_seconds": round(self._avg_job_seconds, 3),
+        }
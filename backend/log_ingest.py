@@ -0,0 +1,422 @@
+"""
+📂 INGESTIE OFFLINE LOGURI OBD2 (CSV / CAPTURI ELM327)
+Pipeline de generatoare peste fișiere mapate în memorie: citire pe bucăți,
+decodare PID, reguli analyze_obd2_data pe fiecare mostră și sumar per drum.
+Memoria rămâne constantă indiferent de dimensiunea fișierului.
+
+Rulare CLI: python log_ingest.py drum1.csv drum2.log --workers 4 --top 10
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import mmap
+import os
+import re
+import sys
+from collections import Counter
+from operator import attrgetter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional, Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from obd2_analysis import analyze_obd2_data
+from obd2_protocol import decode_dtc_response, decode_pid_response
+from obd2_sample import LiveSample
+
+CHUNK_SIZE = 1024 * 1024          # 1 MiB citit din mmap la fiecare pas
+DRIVE_GAP_SECONDS = 300.0         # pauză > 5 minute = drum nou
+DEFAULT_TOP_EVENTS = 10
+
+_LINE_SPLIT = re.compile(rb"[\r\n]+")
+_HEADER_UNITS = re.compile(r"\(.*?\)|\[.*?\]")
+
+# Semnale pentru care se calculează min/max/medie în sumar
+SUMMARY_SIGNALS = [
+    "rpm", "speed", "coolant_temp", "battery_voltage",
+    "fuel_pressure", "oxygen_sensor_voltage", "engine_load",
+]
+_summary_values = attrgetter(*SUMMARY_SIGNALS)
+
+# Coloane CSV (normalizate: litere mici, fără spații/unități) -> câmp intern
+CSV_ALIASES = {
+    "rpm": "rpm", "enginerpm": "rpm",
+    "speed": "speed", "vehiclespeed": "speed", "speedobd": "speed",
+    "coolanttemp": "coolant_temp", "coolant": "coolant_temp",
+    "enginecoolanttemp": "coolant_temp", "enginecoolanttemperature": "coolant_temp",
+    "throttleposition": "throttle_position", "throttle": "throttle_position",
+    "maf": "maf", "mafairflowrate": "maf", "massairflow": "maf",
+    "engineload": "engine_load", "calculatedengineload": "engine_load", "load": "engine_load",
+    "fuelpressure": "fuel_pressure",
+    "intaketemp": "intake_temp", "intakeairtemperature": "intake_temp", "iat": "intake_temp",
+    "timingadvance": "timing_advance",
+    "oxygensensorvoltage": "oxygen_sensor_voltage", "o2voltage": "oxygen_sensor_voltage",
+    "o2b1s1": "oxygen_sensor_voltage",
+    "batteryvoltage": "battery_voltage", "voltage": "battery_voltage",
+    "controlmodulevoltage": "battery_voltage",
+    "fuellevel": "fuel_level",
+    "ambienttemp": "ambient_temp", "ambientairtemperature": "ambient_temp",
+    "barometricpressure": "barometric_pressure", "baro": "barometric_pressure",
+    "engineon": "engine_on",
+    "timestamp": "timestamp", "time": "timestamp", "datetime": "timestamp",
+    "devicetime": "timestamp",
+    "dtc": "dtc_codes", "dtccodes": "dtc_codes", "troublecodes": "dtc_codes",
+}
+
+
+# ============================================================================
+# CITIRE PE BUCĂȚI
+# ============================================================================
+
+def iter_lines(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Generează liniile nevide ale fișierului (CR, LF sau CRLF) prin mmap"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pending = b""
+            for offset in range(0, size, chunk_size):
+                lines = _LINE_SPLIT.split(pending + mm[offset:offset + chunk_size])
+                pending = lines.pop()
+                for line in lines:
+                    if line.strip():
+                        yield line
+            if pending.strip():
+                yield pending
+
+
+def detect_format(path: str) -> str:
+    """Detectează formatul logului după prima linie: 'csv' sau 'elm327'"""
+    for line in iter_lines(path, chunk_size=64 * 1024):
+        text = line.decode("utf-8", errors="replace")
+        columns = [_normalize_column(c) for c in next(csv.reader([text]))]
+        if len(columns) > 1 and any(c in CSV_ALIASES for c in columns):
+            return "csv"
+        return "elm327"
+    return "elm327"
+
+
+def _normalize_column(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", _HEADER_UNITS.sub("", name).lower())
+
+
+def _parse_timestamp(value: str) -> Optional[float]:
+    """Timestamp în secunde (epoch sau relativ); acceptă număr, ms sau ISO"""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        number = float(value)
+        return number / 1000 if number > 1e11 else number
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+def _finish_sample(sample: Dict[str, Any]) -> Dict[str, Any]:
+    if "engine_on" not in sample and "rpm" in sample:
+        sample["engine_on"] = sample["rpm"] > 0
+    return sample
+
+
+# ============================================================================
+# PARSERE (GENERATOARE DE MOSTRE)
+# ============================================================================
+
+def iter_csv_samples(lines: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """Mostre dintr-un log CSV cu antet (OBD Fusion, Torque, Car Scanner etc.)"""
+    columns: Optional[List[Optional[str]]] = None
+    for line in lines:
+        row = next(csv.reader([line.decode("utf-8", errors="replace")]), [])
+        if columns is None:
+            columns = [CSV_ALIASES.get(_normalize_column(c)) for c in row]
+            continue
+
+        sample: Dict[str, Any] = {}
+        for field, value in zip(columns, row):
+            if not field or not value.strip():
+                continue
+            if field == "timestamp":
+                sample["timestamp"] = _parse_timestamp(value)
+            elif field == "dtc_codes":
+                sample["dtc_codes"] = re.findall(r"[PCBU]\d[0-9A-F]{3}", value.upper())
+            elif field == "engine_on":
+                sample["engine_on"] = value.strip().lower() in ("1", "true", "on", "da")
+            else:
+                try:
+                    sample[field] = float(value)
+                except ValueError:
+                    continue
+        if sample:
+            yield _finish_sample(sample)
+
+
+def iter_elm327_samples(lines: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """Mostre dintr-o captură brută ELM327 (cereri + răspunsuri mode 01/03)
+
+    Un ciclu de interogare se încheie când un PID se repetă. Liniile pot avea
+    opțional un timestamp în față ('12.345 41 0C 1A F8' sau 'ts,41 0C 1A F8').
+    """
+    current: Dict[str, Any] = {}
+    pending_dtc: List[str] = []
+    timestamp: Optional[float] = None
+
+    for line in lines:
+        text = line.decode("latin-1").strip().lstrip(">").strip()
+        if "," in text:
+            head, _, tail = text.partition(",")
+            timestamp = _parse_timestamp(head) or timestamp
+            text = tail.strip()
+        else:
+            tokens = text.split(None, 1)
+            if tokens and ("." in tokens[0] or ":" in tokens[0]):
+                parsed = _parse_timestamp(tokens[0])
+                if parsed is not None:
+                    timestamp = parsed
+                    text = tokens[1] if len(tokens) > 1 else ""
+        if not text:
+            continue
+
+        upper = text.upper()
+        if upper.replace(" ", "").startswith("43"):
+            pending_dtc.extend(decode_dtc_response(upper))
+            continue
+
+        decoded = decode_pid_response(upper)
+        if decoded is None:
+            continue  # cereri, OK, NO DATA, SEARCHING...
+        name, value = decoded
+
+        if name in current:
+            if pending_dtc:
+                current["dtc_codes"], pending_dtc = pending_dtc, []
+            yield _finish_sample(current)
+            current = {}
+        if not current:
+            current["timestamp"] = timestamp
+        current[name] = value
+
+    if pending_dtc:
+        current["dtc_codes"] = pending_dtc
+    if current:
+        yield _finish_sample(current)
+
+
+# ============================================================================
+# AGREGARE PER DRUM
+# ============================================================================
+
+class DriveSummary:
+    """Agregator cu memorie constantă pentru un drum"""
+
+    def __init__(self, index: int, top_n: int = DEFAULT_TOP_EVENTS):
+        self.index = index
+        self.top_n = top_n
+        self.samples = 0
+        self.start_ts: Optional[float] = None
+        self.end_ts: Optional[float] = None
+        self.stats = {name: [0, 0.0, None, None] for name in SUMMARY_SIGNALS}  # count, sum, min, max
+        self.problem_counts: Counter = Counter()
+        self.warning_counts: Counter = Counter()
+        self.dtc_codes: set = set()
+        self.last_sample: Union[LiveSample, Dict[str, Any]] = {}
+        self._worst: List[Tuple[int, int, Dict[str, Any]]] = []
+
+    def add(self, sample: Union[LiveSample, Dict[str, Any]]):
+        live = type(sample) is LiveSample
+        if not live:
+            codes = sample.pop("dtc_codes", None)
+            if codes:
+                self.dtc_codes.update(codes)
+
+        timestamp = sample.timestamp if live else sample.get("timestamp")
+        if timestamp is not None:
+            self.start_ts = timestamp if self.start_ts is None else self.start_ts
+            self.end_ts = timestamp
+
+        if not live and all(key == "timestamp" for key in sample):
+            return  # doar coduri DTC, fără semnale live
+
+        self.samples += 1
+        self.last_sample = sample
+        values = _summary_values(sample) if live else [sample.get(name) for name in self.stats]
+        for stat, value in zip(self.stats.values(), values):
+            if value is None:
+                continue
+            stat[0] += 1
+            stat[1] += value
+            stat[2] = value if stat[2] is None else min(stat[2], value)
+            stat[3] = value if stat[3] is None else max(stat[3], value)
+
+        # Aceleași reguli ca la diagnosticul live (DTC-urile se analizează o dată per drum)
+        analysis = analyze_obd2_data(sample, [])
+        problems = analysis.get("problems", [])
+        warnings = analysis.get("warnings", [])
+        self.problem_counts.update(problems)
+        self.warning_counts.update(warnings)
+
+        score = 10 * len(problems) + 3 * len(warnings)
+        if score:
+            event = {
+                "timestamp": timestamp,
+                "score": score,
+                "problems": problems,
+                "warnings": warnings,
+                "live_data": analysis.get("live_data", {}),
+            }
+            entry = (score, -self.samples, event)
+            if len(self._worst) < self.top_n:
+                heapq.heappush(self._worst, entry)
+            elif entry > self._worst[0]:
+                heapq.heapreplace(self._worst, entry)
+
+    def to_dict(self) -> Dict[str, Any]:
+        signals = {}
+        for name, (count, total, low, high) in self.stats.items():
+            if count:
+                signals[name] = {
+                    "min": low,
+                    "max": high,
+                    "avg": round(total / count, 2),
+                }
+
+        dtc_codes = sorted(self.dtc_codes)
+        dtc_report = analyze_obd2_data(self.last_sample or {"engine_on": False}, dtc_codes)
+
+        duration = None
+        if self.start_ts is not None and self.end_ts is not None:
+            duration = round(self.end_ts - self.start_ts, 3)
+
+        return {
+            "drive": self.index,
+            "samples": self.samples,
+            "start": self.start_ts,
+            "end": self.end_ts,
+            "duration_s": duration,
+            "signals": signals,
+            "problems": dict(self.problem_counts.most_common()),
+            "warnings": dict(self.warning_counts.most_common()),
+            "dtc_codes": dtc_codes,
+            "dtc_analysis": dtc_report.get("dtc_analysis", []),
+            "critical_issues": dtc_report.get("summary", {}).get("critical_issues", False),
+            "worst_events": [event for _, _, event in sorted(self._worst, reverse=True)],
+        }
+
+
+def iter_drive_summaries(
+    path: str,
+    log_format: str = "auto",
+    top_n: int = DEFAULT_TOP_EVENTS,
+    drive_gap: float = DRIVE_GAP_SECONDS,
+) -> Iterator[Dict[str, Any]]:
+    """Procesează un log în streaming și generează câte un sumar per drum"""
+    if log_format == "auto":
+        log_format = detect_format(path)
+    if log_format == "csv":
+        samples = iter_csv_samples(iter_lines(path))
+    elif log_format == "elm327":
+        samples = iter_elm327_samples(iter_lines(path))
+    else:
+        raise ValueError(f"Format log necunoscut: {log_format}")
+
+    drive = DriveSummary(0, top_n)
+    for sample in samples:
+        timestamp = sample.get("timestamp")
+        if (
+            timestamp is not None
+            and drive.end_ts is not None
+            and timestamp - drive.end_ts > drive_gap
+        ):
+            yield drive.to_dict()
+            drive = DriveSummary(drive.index + 1, top_n)
+        drive.add(sample)
+
+    if drive.samples or drive.dtc_codes:
+        yield drive.to_dict()
+
+
+def ingest_file(
+    path: str,
+    log_format: str = "auto",
+    top_n: int = DEFAULT_TOP_EVENTS,
+    drive_gap: float = DRIVE_GAP_SECONDS,
+) -> Dict[str, Any]:
+    """Sumarul complet al unui fișier (rulează și în procese worker)"""
+    drives = list(iter_drive_summaries(path, log_format, top_n, drive_gap))
+    return {
+        "file": os.path.basename(path),
+        "size_bytes": os.path.getsize(path),
+        "drives": drives,
+        "total_samples": sum(d["samples"] for d in drives),
+    }
+
+
+# ============================================================================
+# PARALELIZARE PE FIȘIERE
+# ============================================================================
+
+_ingest_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_ingest_pool() -> ProcessPoolExecutor:
+    """Pool de procese partajat pentru endpoint-ul de ingestie"""
+    global _ingest_pool
+    if _ingest_pool is None:
+        workers = int(os.getenv("INGEST_WORKERS", "0")) or None
+        _ingest_pool = ProcessPoolExecutor(max_workers=workers)
+    return _ingest_pool
+
+
+def shutdown_ingest_pool():
+    """La oprirea serverului: workerii pool-ului partajat nu rămân orfani"""
+    global _ingest_pool
+    if _ingest_pool is not None:
+        _ingest_pool.shutdown(wait=False, cancel_futures=True)
+        _ingest_pool = None
+
+
+def ingest_files(
+    paths: List[str],
+    workers: int = 0,
+    log_format: str = "auto",
+    top_n: int = DEFAULT_TOP_EVENTS,
+    drive_gap: float = DRIVE_GAP_SECONDS,
+) -> Iterator[Dict[str, Any]]:
+    """Procesează mai multe fișiere în paralel (un proces per fișier)"""
+    if workers == 1 or len(paths) == 1:
+        for path in paths:
+            yield ingest_file(path, log_format, top_n, drive_gap)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers or None) as pool:
+        futures = [
+            pool.submit(ingest_file, path, log_format, top_n, drive_gap)
+            for path in paths
+        ]
+        for future in futures:
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestie offline loguri OBD2")
+    parser.add_argument("paths", nargs="+", help="Fișiere CSV sau capturi ELM327")
+    parser.add_argument("--workers", type=int, default=0, help="Procese worker (0 = nr. CPU)")
+    parser.add_argument("--format", default="auto", choices=["auto", "csv", "elm327"])
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_EVENTS, help="Evenimente critice per drum")
+    parser.add_argument("--drive-gap", type=float, default=DRIVE_GAP_SECONDS, help="Pauză (s) între drumuri")
+    args = parser.parse_args()
+
+    # O linie JSON per drum (NDJSON), ca să poată fi procesată mai departe în streaming
+    for report in ingest_files(args.paths, args.workers, args.format, args.top, args.drive_gap):
+        for drive in report["drives"]:
+            sys.stdout.write(json.dumps({"file": report["file"], **drive}, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+🐢 MONITOR DE ÎNTÂRZIERE A EVENT LOOP-ULUI + DESCĂRCARE DE SARCINĂ
+Un task măsoară continuu întârzierea de planificare (cât întârzie un sleep
+scurt față de momentul așteptat). Un thread de supraveghere surprinde stiva
+thread-ului event loop-ului când acesta e blocat mai mult de un prag, ca să se
+vadă ce callback sincron l-a ținut. Peste pragul de întârziere, munca cu
+prioritate mică este refuzată (503 + Retry-After) sau amânată până la revenire.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Optional, Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOW_PRIORITY_PATHS = [
+    "/api/v1/debug",
+    "/api/v1/test-minimal",
+    "/api/v1/startup-profile",
+    "/api/v1/history/vehicle",
+]
+
+
+class LoopLagMonitor:
+    """Întârzierea loop-ului (EWMA + fereastră recentă), stive la blocaje, stare de descărcare"""
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        shed_lag_ms: float = 100.0,
+        recover_ratio: float = 0.5,
+        stall_ms: float = 250.0,
+        low_priority_paths: List[str] = None,
+        retry_after: int = 2,
+        max_deferred: int = 5000,
+        drain_batch: int = 50,
+        window: int = 1200,
+    ):
+        self.interval = interval
+        self.shed_lag_ms = shed_lag_ms
+        self.recover_lag_ms = shed_lag_ms * recover_ratio
+        self.stall_ms = stall_ms
+        self.low_priority_paths = low_priority_paths or DEFAULT_LOW_PRIORITY_PATHS
+        self.retry_after = retry_after
+        self.max_deferred = max_deferred
+        self.drain_batch = drain_batch
+
+        self.samples: deque = deque(maxlen=window)
+        self.lag_ms = 0.0
+        self.ewma_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.shedding = False
+        self.shed_episodes = 0
+        self.shed_requests = 0
+        self.deferred: deque = deque()
+        self.deferred_total = 0
+        self.deferred_overflow = 0
+        self.stalls = 0
+        self.snapshots: deque = deque(maxlen=10)
+
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.perf_counter()
+
+    # ------------------------------------------------------------------
+    # Pornire / oprire
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Se apelează din event loop (evenimentul de startup)"""
+        if self._task:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        if self.stall_ms > 0:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+        logger.info(f"🐢 Monitor event loop: prag descărcare {self.shed_lag_ms:.0f} ms, blocaj {self.stall_ms:.0f} ms")
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Munca amânată nu se pierde la oprire
+        self._drain(len(self.deferred))
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._heartbeat = now
+            self._record(max(0.0, now - expected) * 1000)
+            if not self.shedding and self.deferred:
+                self._drain(self.drain_batch)
+
+    def _record(self, lag_ms: float):
+        self.lag_ms = lag_ms
+        self.samples.append(lag_ms)
+        self.ewma_ms = 0.8 * self.ewma_ms + 0.2 * lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        # Histerezis: intră peste prag, iese doar sub recover_lag_ms
+        if not self.shedding and self.ewma_ms >= self.shed_lag_ms:
+            self.shedding = True
+            self.shed_episodes += 1
+            logger.warning(f"🚨 Event loop întârziat {self.ewma_ms:.0f} ms - refuz munca cu prioritate mică")
+        elif self.shedding and self.ewma_ms < self.recover_lag_ms:
+            self.shedding = False
+            logger.info(f"✅ Event loop revenit ({self.ewma_ms:.0f} ms) - {len(self.deferred)} sarcini amânate de rulat")
+
+    # ------------------------------------------------------------------
+    # Stive la blocaje (thread separat: loop-ul blocat nu se poate observa singur)
+    # ------------------------------------------------------------------
+
+    def _watch(self):
+        reported = 0.0
+        check_every = max(0.01, self.stall_ms / 4000)
+        while not self._stop.wait(check_every):
+            heartbeat = self._heartbeat
+            blocked_ms = (time.perf_counter() - heartbeat) * 1000 - self.interval * 1000
+            if blocked_ms < self.stall_ms or heartbeat == reported:
+                continue
+            # O singură stivă per blocaj
+            reported = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame, limit=25))
+            self.stalls += 1
+            self.snapshots.append({"at": time.time(), "blocked_ms": round(blocked_ms, 1), "stack": stack})
+            logger.warning(f"🐢 Event loop blocat de peste {blocked_ms:.0f} ms, stiva curentă:\n{stack}")
+
+    # ------------------------------------------------------------------
+    # Descărcare de sarcină
+    # ------------------------------------------------------------------
+
+    def should_shed(self, path: str) -> bool:
+        """Cererea e refuzată acum (loop întârziat și rută cu prioritate mică)"""
+        if self.shedding and any(path.startswith(prefix) for prefix in self.low_priority_paths):
+            self.shed_requests += 1
+            return True
+        return False
+
+    def run_or_defer(self, func: Callable[..., Any], *args: Any) -> bool:
+        """Rulează acum sau, cât loop-ul e întârziat, după revenire; False dacă a fost amânată"""
+        if self.shedding and len(self.deferred) < self.max_deferred:
+            self.deferred.append((func, args))
+            self.deferred_total += 1
+            return False
+        if self.shedding:
+            self.deferred_overflow += 1
+        func(*args)
+        return True
+
+    def _drain(self, limit: int):
+        for _ in range(min(limit, len(self.deferred))):
+            func, args = self.deferred.popleft()
+            try:
+                func(*args)
+            except Exception as e:
+                logger.error(f"Sarcină amânată eșuată ({getattr(func, '__name__', func)}): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        samples = sorted(self.samples)
+        pick = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))], 2) if samples else 0.0  # noqa: E731
+        return {
+            "lag_ms": round(self.lag_ms, 2),
+            "ewma_ms": round(self.ewma_ms, 2),
+            "p50_ms": pick(0.5),
+            "p99_ms": pick(0.99),
+            "max_ms": round(self.max_lag_ms, 2),
+            "shedding": self.shedding,
+            "shed_lag_ms": self.shed_lag_ms,
+            "shed_episodes": self.shed_episodes,
+            "shed_requests": self.shed_requests,
+            "deferred_queued": len(self.deferred),
+            "deferred_total": self.deferred_total,
+            "deferred_overflow": self.deferred_overflow,
+            "stalls": self.stalls,
+            "last_stall": self.snapshots[-1] if self.snapshots else None,
+        }
+
+
+def create_loop_monitor() -> Optional[LoopLagMonitor]:
+    """Monitor din variabilele de mediu; None dacă LOOP_MONITOR_ENABLED=false"""
+    if os.getenv("LOOP_MONITOR_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    paths = [p.strip() for p in os.getenv("LOAD_SHED_PATHS", "").split(",") if p.strip()]
+    return LoopLagMonitor(
+        interval=float(os.getenv("LOOP_LAG_INTERVAL_MS", "50")) / 1000,
+        shed_lag_ms=float(os.getenv("LOAD_SHED_LAG_MS", "100")),
+        stall_ms=float(os.getenv("LOOP_STALL_MS", "250")),
+        low_priority_paths=paths or None,
+        retry_after=int(os.getenv("LOAD_SHED_RETRY_AFTER", "2")),
+    )
@@ -3,19 +3,57 @@
 FastAPI backend cu AI multiplu + conexiune OBD2 Bluetooth + validari imbunatätite
 """
 
-from fastapi import FastAPI, Request, HTTPException, WebSocket, WebSocketDisconnect
+# Primul import: cronometrează restul încărcării (STARTUP_PROFILE=1 pentru importuri)
+from startup_profile import LazyComponent, startup_profile
+
+from fastapi import FastAPI, Request, HTTPException, WebSocket, WebSocketDisconnect, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Any, Dict, List
 import json
 import logging
 import os
-import httpx
 import re
 import asyncio
+import hashlib
+import tempfile
+import time
+import uuid
 from datetime import datetime
 from dotenv import load_dotenv
 import random
+import secrets
+
+from ai_json import extract_json_object, extraction_stats, normalize_diagnostic
+from ai_usage import build_usage, gemini_usage, ollama_usage, openai_usage, usage_stats
+from compression import CompressionMiddleware, create_response_compressor
+from diagnostic_router import TIER_TRIVIAL, create_router
+from fleet_stats import FLEET_SIGNALS, create_fleet_stats
+from job_queue import FairJobQueue, JobQueueFull
+from log_ingest import DEFAULT_TOP_EVENTS
+from loop_monitor import create_loop_monitor
+from obd2_analysis import analyze_obd2_data
+from obd2_cache import DeviceScanner, DtcCache
+from obd2_sample import LiveSample, to_api
+from profiler import ProfilerBusy, collapsed, profiler, top_functions
+from rate_limit import ClientRateLimiter, EngineLimiter, parse_retry_after
+from telemetry_ingest import (
+    DECODE_ERRORS, FORMAT_BINARY, FORMAT_NDJSON, BodyTooLarge, StreamDecoder, TelemetryBatch,
+    TelemetryPipeline, UnsupportedEncoding, analyze_block_task, create_framer, create_telemetry_store
+)
+from tracing import TraceStore, span, start_trace
+from traffic_capture import create_recorder
+from vehicle_names import get_index as get_vehicle_name_index, normalize_car_data
+from obd2_scenarios import SCENARIOS, ScenarioPlayer, get_cycle, prewarm
+from obd2_protocol import (
+    BATCH_CONTENT_TYPE,
+    LiveFrameEncoder,
+    SUBPROTOCOL_BINARY_DEFLATE,
+    negotiate_subprotocol,
+)
+
+startup_profile.mark("imports")
 
 # Încarcă variabilele de mediu
 load_dotenv()
@@ -27,6 +65,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+startup_profile.mark("config")
+
 # Inițializează FastAPI
 app = FastAPI(
     title="Auto-Diagnostic OBD2 API",
@@ -43,6 +83,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+startup_profile.mark("app")
+
 # ============================================================================
 # MODELE PYDANTIC V2 CU VALIDĂRI ÎMBUNĂTĂȚITE
 # ============================================================================
@@ -158,6 +200,12 @@ class DiagnosticResponse(BaseModel):
     model: Optional[str] = None
     timestamp: Optional[str] = None
     obd2_analysis: Optional[Dict[str, Any]] = None
+    diagnostic_id: Optional[str] = None
+    reused_from: Optional[str] = None
+    usage: Optional[Dict[str, Any]] = None
+    routing: Optional[Dict[str, Any]] = None
+    provisional: bool = False
+    refinement: Optional[Dict[str, Any]] = None
 
 
 class OBD2ConnectionRequest(BaseModel):
@@ -174,6 +222,13 @@ class OBD2Command(BaseModel):
     description: Optional[str] = None
 
 
+class OBD2ScenarioRequest(BaseModel):
+    """Scenariu de drum pentru simulatorul OBD2"""
+    scenario: str = Field(default="city")
+    hz: float = Field(default=10.0, gt=0, le=1000)
+    seed: int = Field(default=42)
+
+
 class OBD2Device(BaseModel):
     """Dispozitiv OBD2"""
     name: str
@@ -193,6 +248,21 @@ class OBD2Simulator:
         self.connected = False
         self.current_device = None
         self.protocol = "Auto"
+        self.scenario = os.getenv("OBD2_SCENARIO", "city")
+        self.hz = float(os.getenv("OBD2_SIM_HZ", "10"))
+        self.seed = int(os.getenv("OBD2_SIM_SEED", "42"))
+        self.player: Optional[ScenarioPlayer] = None
+        # Crește la conectare/deconectare/schimbarea scenariului (invalidează ETag-urile)
+        self.generation = 0
+    
+    def set_scenario(self, scenario: str, hz: float = 10.0, seed: int = 42):
+        """Schimbă ciclul de drum redat (idle, city, highway, overheating, battery_failure)"""
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Scenariu necunoscut: {scenario}")
+        self.scenario, self.hz, self.seed = scenario, hz, seed
+        self.player = ScenarioPlayer(get_cycle(scenario, hz, seed=seed))
+        self.generation += 1
+        return {"scenario": scenario, "hz": hz, "seed": seed, "samples": self.player.cycle.length}
         
     def scan_devices(self):
         """Simulează scanarea dispozitivelor Bluetooth"""
@@ -206,6 +276,7 @@ class OBD2Simulator:
     
     def connect(self, device_address: str = None, device_name: str = None):
         """Simulează conexiunea la OBD2"""
+        self.generation += 1
         if device_address or device_name:
             self.connected = True
             self.current_device = device_address or device_name
@@ -230,6 +301,7 @@ class OBD2Simulator:
         """Simulează deconectarea de la OBD2"""
         was_connected = self.connected
         self.connected = False
+        self.generation += 1
         self.current_device = None
         return {
             "status": "disconnected",
@@ -319,176 +391,227 @@ class OBD2Simulator:
         }
     
     def get_live_data(self):
-        """Simulează date live din mașină"""
+        """Mostra live curentă (LiveSample, playback scenariu pre-generat) sau dicționar de eroare"""
         if not self.connected:
             return {"error": "Nu sunteti conectat la OBD2"}
         
-        # Generează date realiste
-        current_time = datetime.now()
-        engine_on = current_time.second % 30 > 5  # Motorul e pornit 5/6 din timp
-        
-        if engine_on:
-            rpm = random.randint(700, 3500)
-            speed = random.randint(0, 120)
-            coolant_temp = random.randint(75, 105)
-        else:
-            rpm = 0
-            speed = 0
-            coolant_temp = random.randint(20, 40)
-        
-        return {
-            "engine_on": engine_on,
-            "rpm": rpm,
-            "speed": speed,
-            "coolant_temp": coolant_temp,
-            "throttle_position": random.randint(10, 90) if engine_on else 0,
-            "maf": round(random.uniform(2.5, 15.5), 1) if engine_on else 0,
-            "engine_load": random.randint(20, 95) if engine_on else 0,
-            "fuel_pressure": random.randint(350, 450),
-            "intake_temp": random.randint(15, 45),
-            "timing_advance": random.randint(5, 25) if engine_on else 0,
-            "oxygen_sensor_voltage": round(random.uniform(0.1, 0.9), 2),
-            "battery_voltage": round(random.uniform(12.5, 14.5), 1),
-            "fuel_level": random.randint(10, 100),
-            "ambient_temp": random.randint(5, 35),
-            "barometric_pressure": random.randint(95, 105),
-            "timestamp": current_time.isoformat()
-        }
+        return self._live_player().live_sample()
+
+    def _live_player(self) -> ScenarioPlayer:
+        if self.player is None:
+            self.player = ScenarioPlayer(get_cycle(self.scenario, self.hz, seed=self.seed))
+        return self.player
+
+    def live_version(self) -> int:
+        """Indexul mostrei live curente (-1 dacă nu e conectat): se schimbă la fiecare mostră nouă"""
+        if not self.connected:
+            return -1
+        return self._live_player().current_index()
+
+    def next_sample_in(self) -> float:
+        """Secunde până la următoarea mostră live"""
+        return self._live_player().next_sample_in()
 
 
 # Inițializează simulatorul OBD2
 obd2_simulator = OBD2Simulator()
 
-# ============================================================================
-# SISTEM AI MULTIPLE CU ANALIZĂ OBD2
-# ============================================================================
+# DTC recitite doar la interval lung sau la schimbarea MIL; lista Bluetooth ținută în memorie
+dtc_cache = DtcCache(
+    refresh_interval=float(os.getenv("DTC_REFRESH_INTERVAL", "60")),
+    mil_interval=float(os.getenv("DTC_MIL_CHECK_INTERVAL", "1")),
+    max_sessions=int(os.getenv("DTC_CACHE_MAX_SESSIONS", "1024"))
+)
+device_scanner = DeviceScanner(
+    obd2_simulator.scan_devices,
+    interval=float(os.getenv("BT_SCAN_INTERVAL", "15")),
+    ttl=float(os.getenv("BT_DEVICE_TTL", "60"))
+)
 
-def analyze_obd2_data(obd2_data: Dict[str, Any], dtc_codes: List[str]) -> Dict[str, Any]:
-    """Analizează datele OBD2 pentru probleme"""
-    
-    problems = []
-    warnings = []
-    recommendations = []
-    
-    if not obd2_data or "error" in obd2_data:
-        return {
-            "obd2_connected": False,
-            "message": "Nu există date OBD2 disponibile"
-        }
-    
-    # Analiză RPM
-    rpm = obd2_data.get('rpm', 0)
-    speed = obd2_data.get('speed', 0)
-    
-    if rpm == 0 and speed > 0:
-        problems.append("Motor oprit în mers (coasting)")
-    elif rpm > 4000 and speed < 20:
-        warnings.append("RPM prea mare la viteză mică - posibil ambreiaj")
-    elif rpm < 600 and obd2_data.get('engine_on', True):
-        warnings.append("Turație joasă la relanti - posibil mură motor")
-    
-    # Analiză temperatură
-    coolant_temp = obd2_data.get('coolant_temp', 90)
-    if coolant_temp > 105:
-        problems.append("Supraîncălzire motor - risc daune majore")
-        recommendations.append("Opriți motorul imediat și verificați lichid de răcire")
-    elif coolant_temp > 100:
-        warnings.append("Temperatură motor ridicată")
-    elif coolant_temp < 70 and obd2_data.get('engine_on', True):
-        warnings.append("Motorul nu ajunge la temperatură optimă de funcționare")
-    
-    # Analiză presiune combustibil
-    fuel_pressure = obd2_data.get('fuel_pressure', 400)
-    if fuel_pressure < 300:
-        problems.append("Presiune combustibil scăzută - posibil pompă defectă")
-    elif fuel_pressure > 500:
-        warnings.append("Presiune combustibil prea mare - risc daune injectoare")
-    
-    # Analiză senzor oxigen
-    o2_voltage = obd2_data.get('oxygen_sensor_voltage', 0.5)
-    if o2_voltage < 0.1 or o2_voltage > 0.9:
-        problems.append("Senzor oxigen defect - consum crescut")
-    
-    # Analiză tensiune baterie
-    battery_voltage = obd2_data.get('battery_voltage', 13.5)
-    if battery_voltage < 12.0:
-        problems.append("Baterie descărcată - risc defecțiune")
-    elif battery_voltage > 15.0:
-        warnings.append("Tensiune baterie prea mare - posibil regulator defect")
-    
-    # Analiză nivel combustibil
-    fuel_level = obd2_data.get('fuel_level', 50)
-    if fuel_level < 15:
-        warnings.append("Nivel combustibil foarte scăzut - risc pompă combustibil")
-    
-    # Analiză coduri DTC
-    dtc_analysis = []
-    dtc_severity = {"high": [], "medium": [], "low": []}
-    
-    for code in dtc_codes:
-        if code.startswith('P0'):
-            category = "Motor"
-            severity = "high"
-        elif code.startswith('P1'):
-            category = "Combustibil/Aer"
-            severity = "medium"
-        elif code.startswith('P2'):
-            category = "Injectoare"
-            severity = "high"
-        elif code.startswith('B'):
-            category = "Caroserie"
-            severity = "medium"
-        elif code.startswith('C'):
-            category = "Șasiu"
-            severity = "medium"
-        elif code.startswith('U'):
-            category = "Comunicare"
-            severity = "high"
-        else:
-            category = "Necunoscut"
-            severity = "low"
-        
-        dtc_analysis.append({
-            "code": code,
-            "category": category,
-            "severity": severity
-        })
-        
-        if severity == "high":
-            dtc_severity["high"].append(code)
-        elif severity == "medium":
-            dtc_severity["medium"].append(code)
-        else:
-            dtc_severity["low"].append(code)
+
+def obd2_session(session_id: Optional[str] = None) -> str:
+    """Cheia de cache: dispozitivul conectat + sesiunea clientului"""
+    return f"{obd2_simulator.current_device}|{session_id or 'default'}"
+
+
+async def read_dtc_cached(session_id: Optional[str] = None):
+    """(date DTC, metadate cache) pentru sesiunea dată"""
+    return await dtc_cache.get(
+        obd2_session(session_id),
+        obd2_simulator.read_dtc,
+        lambda: obd2_simulator.send_command("0101")
+    )
+
+# Istoric diagnostice (SQLite WAL, scriere prin coadă în background)
+# Se deschide leneș, la prima cerere care îl folosește
+HISTORY_REUSE_MAX_AGE = float(os.getenv("HISTORY_REUSE_MAX_AGE_HOURS", "168")) * 3600
+
+
+def _load_history_store():
+    from history_store import create_history_store
+    store = create_history_store()
+    if store:
+        store.start()
+    return store
+
+
+diagnostic_history = LazyComponent("history_store", _load_history_store)
+
+# Index de similaritate peste diagnosticele AI anterioare (evită apeluri LLM repetate)
+SIMILARITY_ENABLED = os.getenv("SIMILARITY_ENABLED", "true").lower() not in ("0", "false", "no")
+SIMILARITY_ANSWER_THRESHOLD = float(os.getenv("SIMILARITY_ANSWER_THRESHOLD", "0.92"))
+SIMILARITY_CONTEXT_THRESHOLD = float(os.getenv("SIMILARITY_CONTEXT_THRESHOLD", "0.6"))
+# Răspunsurile acestor motoare nu intră în index (sunt ieftine sau deja refolosite)
+NON_INDEXED_ENGINES = ["smart_diagnostic", "similarity_index", "cpu_model"]
+
+
+def _load_similarity_index():
+    from diagnostic_index import DiagnosticIndex
+    index = DiagnosticIndex(max_entries=int(os.getenv("SIMILARITY_MAX_ENTRIES", "50000")))
     
-    # Adaugă probleme bazate pe severitate coduri DTC
-    if dtc_severity["high"]:
-        problems.append(f"Coduri eroare critice: {', '.join(dtc_severity['high'][:3])}")
-    if dtc_severity["medium"]:
-        warnings.append(f"Coduri eroare medii: {', '.join(dtc_severity['medium'][:3])}")
+    # Reconstruiește indexul din istoric (cele mai recente diagnostice AI)
+    store = diagnostic_history.get()
+    if store:
+        for entry in reversed(store.recent(index.max_entries, exclude_engines=NON_INDEXED_ENGINES)):
+            index.add(
+                entry["diagnostic_id"],
+                entry["request"],
+                entry["response"],
+                entry["response"].get("obd2_analysis")
+            )
+    logger.info(f"🔎 Index similaritate încărcat: {index.stats()['entries']} diagnostice")
+    return index
+
+
+similarity_index = LazyComponent("similarity_index", _load_similarity_index)
+
+# Motor local in-process (clasificator pe istoric), fără daemon extern
+CPU_MODEL_ENABLED = os.getenv("CPU_MODEL_ENABLED", "true").lower() not in ("0", "false", "no")
+CPU_MODEL_MIN_CONFIDENCE = float(os.getenv("CPU_MODEL_MIN_CONFIDENCE", "0.55"))
+
+
+def _load_cpu_engine():
+    from cpu_engine import BatchingPredictor, DiagnosticClassifier
+    classifier = DiagnosticClassifier(
+        min_support=int(os.getenv("CPU_MODEL_MIN_SUPPORT", "2")),
+        # Rulează în thread-ul lotului: devizul vehiculului cerut, nu prețul etichetelor
+        pricer=lambda car_data, obd2_analysis: pricing_engine.get().quote(car_data, obd2_analysis)["total"]
+    )
     
-    return {
-        "obd2_connected": True,
-        "live_data": {
-            "rpm": rpm,
-            "speed": speed,
-            "coolant_temp": coolant_temp,
-            "battery_voltage": battery_voltage,
-            "fuel_pressure": fuel_pressure
-        },
-        "problems": problems[:5],  # Maxim 5 probleme
-        "warnings": warnings[:5],  # Maxim 5 avertizări
-        "recommendations": recommendations[:3],  # Maxim 3 recomandări
-        "dtc_analysis": dtc_analysis,
-        "summary": {
-            "total_problems": len(problems),
-            "total_warnings": len(warnings),
-            "critical_issues": len(dtc_severity["high"]) > 0
-        }
-    }
+    # Antrenare pe diagnosticele AI din istoric
+    store = diagnostic_history.get()
+    if store:
+        for entry in store.recent(int(os.getenv("CPU_MODEL_TRAIN_LIMIT", "20000")), exclude_engines=NON_INDEXED_ENGINES):
+            classifier.learn(entry["request"], entry["response"], entry["response"].get("obd2_analysis"))
+    logger.info(f"🧠 Motor CPU antrenat: {classifier.stats()}")
+    return BatchingPredictor(
+        classifier,
+        max_batch=int(os.getenv("CPU_MODEL_MAX_BATCH", "32")),
+        max_wait_ms=float(os.getenv("CPU_MODEL_MAX_WAIT_MS", "2"))
+    )
+
 
+cpu_engine = LazyComponent("cpu_engine", _load_cpu_engine)
 
-def create_enhanced_prompt(car_data: Dict[str, Any], obd2_analysis: Dict[str, Any] = None) -> str:
+def _load_pricing_engine():
+    from pricing import create_pricing_engine
+    engine = create_pricing_engine()
+    logger.info(f"💰 Tabel prețuri compilat: {engine.stats()}")
+    return engine
+
+
+pricing_engine = LazyComponent("pricing_engine", _load_pricing_engine)
+
+
+def _load_process_pool():
+    from process_pool import create_process_pool
+    return create_process_pool()
+
+
+# Workeri pre-porniți pentru munca CPU (loturi, ingestie, ferestre de mostre)
+process_pool = LazyComponent("process_pool", _load_process_pool)
+PROCESS_POOL_MIN_BATCH = int(os.getenv("PROCESS_POOL_MIN_BATCH", "500"))
+
+# Nivel de complexitate -> motor/model (trivial = fără AI, mediu = model mic, complex = model mare)
+diagnostic_router = create_router()
+
+# Agregate de flotă (DTC frecvente, quantile per model, vehicule distincte), salvate periodic
+fleet_stats = create_fleet_stats()
+FLEET_STATS_PATH = os.getenv(
+    "FLEET_STATS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fleet_stats.json")
+)
+FLEET_STATS_SNAPSHOT_SECONDS = float(os.getenv("FLEET_STATS_SNAPSHOT_SECONDS", "300"))
+
+# Implicit pentru /api/v1/diagnostic: răspuns provizoriu imediat + rafinare AI în fundal
+DIAGNOSTIC_SPECULATIVE = os.getenv("DIAGNOSTIC_SPECULATIVE", "false").lower() in ("1", "true", "yes")
+
+
+@app.on_event("startup")
+async def mark_startup_ready():
+    startup_profile.mark("ready")
+    # Ciclurile simulatorului se generează în fundal, fără a întârzia pornirea
+    if os.getenv("OBD2_SIM_PREWARM", "true").lower() not in ("0", "false", "no"):
+        asyncio.get_running_loop().run_in_executor(
+            None, prewarm, None, obd2_simulator.hz, obd2_simulator.seed
+        )
+    # Indexul de nume și tabelul de prețuri se compilează după pornire, nu la primul diagnostic
+    asyncio.get_running_loop().run_in_executor(None, get_vehicle_name_index)
+    asyncio.get_running_loop().run_in_executor(None, pricing_engine.get)
+    if os.getenv("PROCESS_POOL_PREWARM", "true").lower() not in ("0", "false", "no"):
+        asyncio.get_running_loop().run_in_executor(None, process_pool.get)
+
+
+async def snapshot_fleet_stats():
+    """Salvează periodic agregatele de flotă (doar dacă s-au schimbat)"""
+    while True:
+        await asyncio.sleep(FLEET_STATS_SNAPSHOT_SECONDS)
+        if fleet_stats.dirty:
+            try:
+                await asyncio.to_thread(fleet_stats.save, FLEET_STATS_PATH)
+            except Exception as e:
+                logger.error(f"Snapshot agregate flotă eșuat: {e}")
+
+
+@app.on_event("startup")
+async def start_fleet_stats():
+    if fleet_stats:
+        try:
+            if await asyncio.to_thread(fleet_stats.load, FLEET_STATS_PATH):
+                logger.info(f"📈 Agregate de flotă încărcate: {fleet_stats.stats()['weeks']}")
+        except Exception as e:
+            logger.error(f"Snapshot agregate flotă ignorat ({FLEET_STATS_PATH}): {e}")
+        app.state.fleet_snapshot_task = asyncio.get_running_loop().create_task(snapshot_fleet_stats())
+
+
+@app.on_event("shutdown")
+async def stop_fleet_stats():
+    if fleet_stats:
+        task = getattr(app.state, "fleet_snapshot_task", None)
+        if task:
+            task.cancel()
+        if fleet_stats.dirty:
+            await asyncio.to_thread(fleet_stats.save, FLEET_STATS_PATH)
+
+
+@app.on_event("shutdown")
+async def stop_history_writer():
+    store = diagnostic_history.peek()
+    if store:
+        store.stop()
+    pool = process_pool.peek()
+    if pool:
+        pool.shutdown()
+
+# ============================================================================
+# SISTEM AI MULTIPLE CU ANALIZĂ OBD2
+# ============================================================================
+
+def create_enhanced_prompt(
+    car_data: Dict[str, Any],
+    obd2_analysis: Dict[str, Any] = None,
+    similar_cases: List[Dict[str, Any]] = None
+) -> str:
     """Creează prompt pentru AI bazat pe toate datele"""
     
     car_type = car_data.get('car_type', 'standard')
@@ -497,13 +620,14 @@ def create_enhanced_prompt(car_data: Dict[str, Any], obd2_analysis: Dict[str, An
     mileage = car_data.get('mileage', 0.0)
     symptoms = car_data.get('simptome', [])
     dtc_codes = car_data.get('coduri_dtc', [])
+    vehicle_name = normalize_car_data(car_data)
     
     prompt = f"""
 # EXPERT AUTO-DIAGNOSTIC ROMÂNIA 2025
 Ești mecanician expert cu 20+ ani experiență în România.
 
 ## DATE MAȘINĂ CLIENT:
-- MARCA/MODEL: {car_type} {model}
+- MARCA/MODEL: {car_type} {model}{f" (identificat: {vehicle_name.display})" if vehicle_name.make else ""}
 - AN FABRICAȚIE: {year}
 - KILOMETRAJ: {mileage} km
 - SIMPTOME RAPORTATE: {', '.join(symptoms) if symptoms else 'NICIUNUL'}
@@ -525,6 +649,22 @@ Ești mecanician expert cu 20+ ani experiență în România.
         if obd2_analysis.get('warnings'):
             prompt += f"- AVERTIZĂRI: {', '.join(obd2_analysis['warnings'])}\n"
 
+    # Diagnostice anterioare similare, ca exemple (few-shot)
+    if similar_cases:
+        prompt += "\n## CAZURI SIMILARE DIAGNOSTICATE ANTERIOR:\n"
+        for case in similar_cases:
+            case_input = case["car_data"]
+            case_output = {
+                field: case["response"].get(field)
+                for field in ("diagnostic", "problems", "solutions", "total_price", "ai_confidence")
+            }
+            prompt += (
+                f"- Simptome: {', '.join(case_input.get('simptome', [])) or 'NICIUNUL'}; "
+                f"Coduri: {', '.join(case_input.get('coduri_dtc', [])) or 'NICIUNUL'} "
+                f"(similaritate {case['score']:.2f})\n"
+                f"  Răspuns: {json.dumps(case_output, ensure_ascii=False)}\n"
+            )
+
     prompt += f"""
 ## CERINȚE DIAGNOSTIC:
 1. Analizează toate datele disponibile (mașină + OBD2)
@@ -552,39 +692,153 @@ Ești mecanician expert cu 20+ ani experiență în România.
     return prompt
 
 
-async def get_ai_response_with_fallback(prompt: str) -> Optional[Dict[str, Any]]:
-    """Obține răspuns de la AI cu multiple fallback-uri"""
+# Apeluri simultane maxime per furnizor AI (excesul trece la motorul următor)
+engine_limiter = EngineLimiter(
+    {
+        "openai": int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+        "gemini": int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+        "local": int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2")),
+        "cpu_model": int(os.getenv("CPU_MODEL_MAX_CONCURRENCY", "64")),
+    },
+    queue_timeout=float(os.getenv("AI_ENGINE_QUEUE_TIMEOUT", "0.5"))
+)
+
+
+# Ollama pe localhost:11434 e încercat implicit (OLLAMA_MODEL, altfel "mistral")
+OLLAMA_ENABLED = os.getenv("OLLAMA_ENABLED", "true").lower() not in ("0", "false", "no")
+
+DEFAULT_ENGINE_PLAN = [("openai", None), ("gemini", None), ("local", None), ("cpu_model", None)]
+
+
+def engine_available(engine_name: str) -> bool:
+    """Motorul poate răspunde: cheie API, Ollama activ, clasificator CPU activ sau mod simulat"""
+    if engine_name == "cpu_model":
+        return CPU_MODEL_ENABLED
+    if AI_MOCK_ENABLED:
+        return True
+    if engine_name == "openai":
+        return bool(os.getenv("OPENAI_API_KEY"))
+    if engine_name == "gemini":
+        return bool(os.getenv("GEMINI_API_KEY"))
+    if engine_name == "local":
+        return OLLAMA_ENABLED
+    return False
+
+
+async def get_ai_response_with_fallback(
+    prompt: str,
+    engine_plan: Optional[List[tuple]] = None,
+    car_data: Optional[Dict[str, Any]] = None,
+    obd2_analysis: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Obține răspuns de la AI cu multiple fallback-uri
     
-    ai_engines = [
-        ("openai", call_openai_gpt),
-        ("gemini", call_google_gemini),
-        ("local", call_local_llm),
-    ]
+    engine_plan: (motor, model) în ordinea încercărilor; implicit lanțul clasic.
+    Motorul "cpu_model" lucrează pe car_data, nu pe prompt.
+    """
+    
+    async def call_cpu(prompt: str, model: Optional[str] = None):
+        return await call_cpu_model(car_data or {}, obd2_analysis)
+    
+    ai_engines = {
+        "openai": call_openai_gpt,
+        "gemini": call_google_gemini,
+        "local": call_local_llm,
+        "cpu_model": call_cpu,
+    }
     
-    for engine_name, engine_func in ai_engines:
+    if AI_MOCK_ENABLED:
+        # Replay/teste de performanță: motoare externe simulate, fără rețea
+        for name in ("openai", "gemini", "local"):
+            ai_engines[name] = lambda prompt, model=None, name=name: call_mock_ai(
+                name, prompt, model, car_data, obd2_analysis
+            )
+    
+    for engine_name, model in engine_plan or DEFAULT_ENGINE_PLAN:
+        if not engine_available(engine_name) or (engine_name == "cpu_model" and not car_data):
+            continue
+        engine_func = ai_engines[engine_name]
+        # Motor saturat sau în cooldown după 429 -> direct la următorul
+        with span(f"queue.{engine_name}") as queue_span:
+            acquired = await engine_limiter.acquire(engine_name)
+            queue_span.set(acquired=acquired)
+        if not acquired:
+            logger.info(f"⏭️  Motor {engine_name} ocupat/limitat - trec la următorul")
+            continue
         try:
-            logger.info(f"Încerc motorul AI: {engine_name}")
-            result = await engine_func(prompt)
-            if result and validate_ai_response(result):
+            logger.info(f"Încerc motorul AI: {engine_name} ({model or 'model implicit'})")
+            with span(f"engine.{engine_name}", model=model) as engine_span:
+                result = await engine_func(prompt, model)
+                valid = bool(result) and validate_ai_response(result)
+                engine_span.set(valid=valid, tokens=((result or {}).get("usage") or {}).get("total_tokens"))
+            # Tokenii se plătesc și pentru răspunsurile invalide
+            usage_stats.record(engine_name, (result or {}).get("usage"), valid)
+            if valid:
                 result["ai_engine"] = engine_name
                 logger.info(f"✅ Motor {engine_name} a răspuns cu succes")
                 return result
         except Exception as e:
             logger.warning(f"Motor {engine_name} a eșuat: {e}")
             continue
+        finally:
+            engine_limiter.release(engine_name)
     
     # Dacă toate AI-urile eșuează, returnează None
     logger.warning("Toate motoarele AI au eșuat")
     return None
 
 
-async def call_openai_gpt(prompt: str) -> Optional[Dict[str, Any]]:
+async def _with_usage(content: str, usage: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-ul extras/reparat din răspuns plus consumul; fără JSON rămâne doar consumul
+
+    Pe event loop: răspunsurile sunt limitate la ~2 KB (num_predict / max_tokens), iar
+    repararea costă cât un drum dus-întors până la process_pool (~0.25 ms)
+    """
+    parsed = extract_json_object(content)
+    if parsed is None:
+        logger.warning(f"Răspuns {usage['engine']} fără JSON valid ({usage['total_tokens']} tokeni)")
+        parsed = {}
+    else:
+        parsed = normalize_diagnostic(parsed, {"ai_confidence": 0.6})
+    parsed["usage"] = usage
+    return parsed
+
+
+# Motoare AI simulate (replay de trafic): latență deterministă, răspuns = diagnosticul inteligent
+AI_MOCK_ENABLED = os.getenv("AI_MOCK", "false").lower() in ("1", "true", "yes")
+AI_MOCK_LATENCY_MS = float(os.getenv("AI_MOCK_LATENCY_MS", "800"))
+
+
+async def call_mock_ai(
+    engine: str,
+    prompt: str,
+    model: Optional[str],
+    car_data: Optional[Dict[str, Any]],
+    obd2_analysis: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Apel AI simulat: aceeași cerere -> aceeași latență (0.5x-1.5x din AI_MOCK_LATENCY_MS)"""
+    digest = hashlib.blake2b(f"{engine}|{model}|{prompt}".encode("utf-8"), digest_size=4).digest()
+    latency_ms = AI_MOCK_LATENCY_MS * (0.5 + int.from_bytes(digest, "big") / 0xFFFFFFFF)
+    await asyncio.sleep(latency_ms / 1000)
+    result = generate_smart_diagnostic(car_data or {}, obd2_analysis)
+    result["ai_confidence"] = 0.85
+    result["usage"] = build_usage(
+        engine, f"mock:{model or 'default'}", len(prompt) // 4, 250, latency_ms, prompt_chars=len(prompt)
+    )
+    return result
+
+
+async def call_openai_gpt(prompt: str, model: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """Apel OpenAI GPT"""
+    import httpx
+    
     try:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             return None
         
+        model = model or os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+        started = time.perf_counter()
         async with httpx.AsyncClient(timeout=10.0) as client:
             response = await client.post(
                 "https://api.openai.com/v1/chat/completions",
@@ -593,7 +847,7 @@ async def call_openai_gpt(prompt: str) -> Optional[Dict[str, Any]]:
                     "Content-Type": "application/json"
                 },
                 json={
-                    "model": os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
+                    "model": model,
                     "messages": [
                         {
                             "role": "system", 
@@ -607,26 +861,34 @@ async def call_openai_gpt(prompt: str) -> Optional[Dict[str, Any]]:
                 }
             )
             
+            if response.status_code == 429:
+                engine_limiter.cooldown("openai", parse_retry_after(response.headers.get("retry-after")))
+            
             if response.status_code == 200:
                 result = response.json()
+                usage = openai_usage(result, model, (time.perf_counter() - started) * 1000, len(prompt))
                 content = result["choices"][0]["message"]["content"]
-                return json.loads(content)
+                return await _with_usage(content, usage)
     except Exception as e:
         logger.error(f"OpenAI error: {e}")
     
     return None
 
 
-async def call_google_gemini(prompt: str) -> Optional[Dict[str, Any]]:
+async def call_google_gemini(prompt: str, model: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """Apel Google Gemini"""
+    import httpx
+    
     try:
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             return None
         
+        model = model or "gemini-pro"
+        started = time.perf_counter()
         async with httpx.AsyncClient(timeout=10.0) as client:
             response = await client.post(
-                f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={api_key}",
+                f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}",
                 json={
                     "contents": [{
                         "parts": [{"text": prompt}]
@@ -638,29 +900,32 @@ async def call_google_gemini(prompt: str) -> Optional[Dict[str, Any]]:
                 }
             )
             
+            if response.status_code == 429:
+                engine_limiter.cooldown("gemini", parse_retry_after(response.headers.get("retry-after")))
+            
             if response.status_code == 200:
                 result = response.json()
+                usage = gemini_usage(result, model, (time.perf_counter() - started) * 1000, len(prompt))
                 text = result["candidates"][0]["content"]["parts"][0]["text"]
-                
-                # Extrage JSON din răspuns
-                import re
-                json_match = re.search(r'\{.*\}', text, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
+                return await _with_usage(text, usage)
     except Exception as e:
         logger.error(f"Gemini error: {e}")
     
     return None
 
 
-async def call_local_llm(prompt: str) -> Optional[Dict[str, Any]]:
+async def call_local_llm(prompt: str, model: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """Apel local LLM (Ollama)"""
+    import httpx
+    
     try:
+        model = model or os.getenv("OLLAMA_MODEL", "mistral")
+        started = time.perf_counter()
         async with httpx.AsyncClient(timeout=15.0) as client:
             response = await client.post(
                 "http://localhost:11434/api/generate",
                 json={
-                    "model": os.getenv("OLLAMA_MODEL", "mistral"),
+                    "model": model,
                     "prompt": prompt,
                     "format": "json",
                     "stream": False,
@@ -673,13 +938,29 @@ async def call_local_llm(prompt: str) -> Optional[Dict[str, Any]]:
             
             if response.status_code == 200:
                 result = response.json()
-                return json.loads(result["response"])
+                usage = ollama_usage(result, model, (time.perf_counter() - started) * 1000, len(prompt))
+                return await _with_usage(result["response"], usage)
     except Exception as e:
         logger.error(f"Local LLM error: {e}")
     
     return None
 
 
+async def call_cpu_model(car_data: Dict[str, Any], obd2_analysis: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+    """Clasificatorul local (loturi pe thread); None sub pragul de încredere"""
+    try:
+        started = time.perf_counter()
+        predictor = await asyncio.to_thread(cpu_engine.get)
+        result = await predictor.predict(car_data, obd2_analysis)
+        if result and result["ai_confidence"] >= CPU_MODEL_MIN_CONFIDENCE:
+            result["usage"] = build_usage("cpu_model", "centroid", 0, 0, (time.perf_counter() - started) * 1000)
+            return result
+    except Exception as e:
+        logger.error(f"CPU model error: {e}")
+    
+    return None
+
+
 def validate_ai_response(response: Dict[str, Any]) -> bool:
     """Validează răspunsul AI"""
     required_fields = ["diagnostic", "problems", "solutions", "total_price", "ai_confidence"]
@@ -717,88 +998,14 @@ def generate_smart_diagnostic(car_data: Dict[str, Any], obd2_analysis: Dict[str,
     symptoms = car_data.get('simptome', [])
     dtc_codes = car_data.get('coduri_dtc', [])
     
-    # CALCULEAZĂ PREȚUL DE BAZĂ
-    base_price = 250  # Preț minim diagnostic
-    
-    # Ajustări după tip mașină
-    if 'tesla' in car_type or 'electric' in car_type:
-        car_category = "electric"
-        base_price *= 2.5
-        main_system = "Sistem electric și baterie"
-    elif 'bmw' in car_type or 'mercedes' in car_type or 'audi' in car_type or 'porsche' in car_type:
-        car_category = "premium"
-        base_price *= 2.2
-        main_system = "Sistem electronic și performanță"
-    elif 'dacia' in car_type or 'skoda' in car_type or 'renault' in car_type:
-        car_category = "economic"
-        base_price *= 0.8
-        main_system = "Sistem mecanic și fiabilitate"
-    elif 'toyota' in car_type or 'honda' in car_type:
-        car_category = "japonez"
-        base_price *= 1.2
-        main_system = "Sistem hibrid și fiabilitate"
-    else:
-        car_category = "standard"
-        base_price *= 1.0
-        main_system = "Sistem general"
-    
-    # Ajustări după vârstă
-    car_age = 2025 - year
-    if car_age > 20:
-        age_multiplier = 1.8
-        age_issue = "Mașină foarte veche - uzură avansată"
-    elif car_age > 15:
-        age_multiplier = 1.5
-        age_issue = "Mașină veche - uzură semnificativă"
-    elif car_age > 10:
-        age_multiplier = 1.3
-        age_issue = "Mașină mijlocie - uzură normală"
-    elif car_age > 5:
-        age_multiplier = 1.1
-        age_issue = "Mașină relativ nouă - uzură minimă"
-    else:
-        age_multiplier = 1.0
-        age_issue = "Mașină nouă - probleme de garanție"
-    
-    # Ajustări după kilometraj
-    if mileage > 300000:
-        mileage_multiplier = 2.0
-        mileage_issue = "Kilometraj foarte mare - revizie completă necesară"
-    elif mileage > 200000:
-        mileage_multiplier = 1.6
-        mileage_issue = "Kilometraj mare - verificare amplă"
-    elif mileage > 150000:
-        mileage_multiplier = 1.4
-        mileage_issue = "Kilometraj ridicat - verificare recomandată"
-    elif mileage > 100000:
-        mileage_multiplier = 1.2
-        mileage_issue = "Kilometraj mediu - verificare periodică"
-    elif mileage > 50000:
-        mileage_multiplier = 1.1
-        mileage_issue = "Kilometraj moderat - întreținere preventivă"
-    else:
-        mileage_multiplier = 1.0
-        mileage_issue = "Kilometraj mic - verificare de bază"
-    
-    # Adaugă cost pentru simptome
-    symptom_cost = len(symptoms) * 80
-    
-    # Adaugă cost pentru coduri eroare
-    error_cost = len(dtc_codes) * 150
-    
-    # Adaugă cost pentru probleme OBD2
-    obd2_cost = 0
-    if obd2_analysis and obd2_analysis.get('obd2_connected'):
-        obd2_problems = len(obd2_analysis.get('problems', []))
-        obd2_warnings = len(obd2_analysis.get('warnings', []))
-        obd2_cost = (obd2_problems * 200) + (obd2_warnings * 50)
-    
-    # Calculează prețul final
-    final_price = base_price * age_multiplier * mileage_multiplier
-    final_price += symptom_cost + error_cost + obd2_cost
-    
-    # Rotunjire la 50 RON
-    final_price = round(final_price / 50) * 50
+    # CALCULEAZĂ PREȚUL (tabel de prețuri: categorie marcă, model, vârstă, km, DTC, regiune)
+    quote = pricing_engine.get().quote(car_data, obd2_analysis)
+    car_category = quote["category"]
+    main_system = quote["main_system"]
+    car_age = quote["car_age"]
+    age_issue = quote["age_issue"]
+    mileage_issue = quote["mileage_issue"]
+    final_price = quote["total"]
     
     # GENEREAZĂ PROBLEME ȘI SOLUȚII
     problems = []
@@ -871,14 +1078,35 @@ def generate_smart_diagnostic(car_data: Dict[str, Any], obd2_analysis: Dict[str,
 # MIDDLEWARE PENTRU LOGGING
 # ============================================================================
 
+# Captură opțională de trafic (CAPTURE_ENABLED=true) pentru replay: traffic_replay.py
+traffic_recorder = create_recorder()
+
+
+@app.on_event("shutdown")
+async def stop_traffic_recorder():
+    if traffic_recorder:
+        traffic_recorder.stop()
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Middleware pentru logging request-uri"""
     start_time = datetime.now()
     
-    # Loghează request-ul
-    body = await request.body()
-    request_body = body.decode('utf-8') if body else ""
+    # Cererile eșantionate pentru captură își păstrează body-ul integral
+    capture = traffic_recorder is not None and traffic_recorder.should_capture(request.url.path)
+    capture_offset = traffic_recorder.offset() if capture else 0.0
+    
+    # Loghează request-ul (doar body-uri mici; upload-urile mari rămân în streaming)
+    body = b""
+    request_body = ""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and (
+        int(content_length) < 1000
+        or (capture and int(content_length) <= traffic_recorder.max_body_bytes)
+    ):
+        body = await request.body()
+        request_body = body.decode('utf-8', errors='replace') if body else ""
     
     logger.info(f"📥 REQUEST: {request.method} {request.url}")
     logger.info(f"📦 Client: {request.client}")
@@ -893,9 +1121,144 @@ async def log_requests(request: Request, call_next):
     process_time = (datetime.now() - start_time).total_seconds()
     logger.info(f"⏱️  Processing time: {process_time:.3f}s - Status: {response.status_code}")
     
+    if capture:
+        traffic_recorder.record_http(
+            capture_offset,
+            request.method,
+            request.url.path,
+            request.url.query,
+            dict(request.headers),
+            body,
+            response.status_code,
+            process_time * 1000
+        )
+    
+    return response
+
+
+# Limite per client: stricte pentru diagnostic (apeluri AI), largi pentru restul API-ului.
+# Cheia principală e IP-ul; user_id-ul declarat e doar o găleată secundară.
+RATE_LIMIT_IP_FACTOR = float(os.getenv("RATE_LIMIT_IP_FACTOR", "3"))
+diagnostic_rate_limiter = ClientRateLimiter(
+    per_minute=float(os.getenv("RATE_LIMIT_DIAGNOSTIC_PER_MIN", "20")),
+    burst=float(os.getenv("RATE_LIMIT_DIAGNOSTIC_BURST", "10")),
+    ip_factor=RATE_LIMIT_IP_FACTOR
+)
+api_rate_limiter = ClientRateLimiter(
+    per_minute=float(os.getenv("RATE_LIMIT_API_PER_MIN", "600")),
+    burst=float(os.getenv("RATE_LIMIT_API_BURST", "100")),
+    ip_factor=RATE_LIMIT_IP_FACTOR
+)
+# POST-urile care pornesc un diagnostic (GET /api/v1/diagnostic/jobs/{id} e doar polling)
+DIAGNOSTIC_RATE_LIMITED_PATHS = ("/api/v1/diagnostic", "/api/v1/diagnostic/jobs")
+
+
+@app.middleware("http")
+async def rate_limit_requests(request: Request, call_next):
+    """Token bucket per IP + per IP|user_id (header X-User-Id / query)"""
+    path = request.url.path
+    if not path.startswith("/api/") or path == "/api/v1/health":
+        return await call_next(request)
+    
+    client_ip = request.client.host if request.client else "anonymous"
+    user_id = request.headers.get("x-user-id") or request.query_params.get("user_id")
+    strict = request.method == "POST" and path.rstrip("/") in DIAGNOSTIC_RATE_LIMITED_PATHS
+    limiter = diagnostic_rate_limiter if strict else api_rate_limiter
+    allowed, retry_after, remaining = limiter.check(client_ip, user_id)
+    
+    if not allowed:
+        logger.warning(f"🚦 Throttled: {client_ip} ({user_id or '-'}) {request.method} {path}")
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Prea multe cereri - încercați mai târziu"},
+            headers={
+                "Retry-After": str(max(1, int(retry_after + 0.999))),
+                "X-RateLimit-Remaining": "0"
+            }
+        )
+    
+    response = await call_next(request)
+    response.headers["X-RateLimit-Remaining"] = str(remaining)
+    return response
+
+
+# Întârzierea event loop-ului; peste prag, rutele cu prioritate mică primesc 503
+loop_monitor = create_loop_monitor()
+
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    if loop_monitor:
+        loop_monitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    if loop_monitor:
+        await loop_monitor.stop()
+
+
+@app.middleware("http")
+async def shed_low_priority(request: Request, call_next):
+    """503 + Retry-After pentru munca cu prioritate mică cât timp event loop-ul e întârziat"""
+    if loop_monitor and loop_monitor.should_shed(request.url.path):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server supraîncărcat - încercați mai târziu"},
+            headers={"Retry-After": str(loop_monitor.retry_after)}
+        )
+    return await call_next(request)
+
+
+# Trasare per cerere: header X-Trace -> durata fiecărei etape în Server-Timing
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() not in ("0", "false", "no")
+TRACE_REQUIRE_ADMIN = os.getenv("TRACE_REQUIRE_ADMIN", "false").lower() in ("1", "true", "yes")
+trace_store = TraceStore(int(os.getenv("TRACE_STORE_SIZE", "200")))
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Span-uri pe etape pentru cererile cu headerul X-Trace (fără cost pentru restul)"""
+    if not (TRACE_ENABLED and request.headers.get("x-trace")):
+        return await call_next(request)
+    if TRACE_REQUIRE_ADMIN and not is_admin(request):
+        return await call_next(request)
+    
+    trace = start_trace(f"{request.method} {request.url.path}")
+    response = await call_next(request)
+    trace.finish()
+    trace_store.add(trace)
+    response.headers["Server-Timing"] = trace.server_timing()
+    response.headers["X-Trace-Id"] = trace.id
+    if trace.duration_ms and trace.duration_ms > 1000:
+        logger.info(f"🐌 Cerere trasată lentă {trace.id}: {trace.name} {trace.duration_ms:.0f} ms")
     return response
 
 
+# Comprimare negociată din Accept-Encoding; adăugat ultimul = middleware-ul exterior,
+# deci logarea, trasarea și captura de trafic văd corpul necomprimat
+response_compressor = create_response_compressor()
+if response_compressor:
+    app.add_middleware(CompressionMiddleware, compressor=response_compressor)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_CHUNK_ITEMS = int(os.getenv("NDJSON_CHUNK_ITEMS", "500"))
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(items: List[Any]) -> StreamingResponse:
+    """Un obiect JSON per linie, trimis în bucăți (comprimarea face flush după fiecare)"""
+    def chunks():
+        for start in range(0, len(items), NDJSON_CHUNK_ITEMS):
+            yield "".join(
+                json.dumps(item, ensure_ascii=False) + "\n" for item in items[start:start + NDJSON_CHUNK_ITEMS]
+            )
+    return StreamingResponse(chunks(), media_type=NDJSON_MEDIA_TYPE)
+
+
 # ============================================================================
 # WEBSOCKET PENTRU OBD2 LIVE DATA
 # ============================================================================
@@ -903,54 +1266,83 @@ async def log_requests(request: Request, call_next):
 class ConnectionManager:
     """Manager pentru conexiuni WebSocket"""
     
-    def __init__(self):
+    def __init__(self, idle_after: float = 30.0):
         self.active_connections: List[WebSocket] = []
+        # Ultimul mesaj primit per conexiune (socket-urile inactive pierd broadcast-ul la suprasarcină)
+        self.last_seen: Dict[int, float] = {}
+        self.idle_after = idle_after
     
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
+    async def connect(self, websocket: WebSocket, subprotocol: Optional[str] = None):
+        await websocket.accept(subprotocol=subprotocol)
         self.active_connections.append(websocket)
+        self.touch(websocket)
+    
+    def touch(self, websocket: WebSocket):
+        self.last_seen[id(websocket)] = time.monotonic()
     
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        self.last_seen.pop(id(websocket), None)
     
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
     
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
+        skip_idle = loop_monitor is not None and loop_monitor.shedding
+        idle_before = time.monotonic() - self.idle_after
+        for connection in list(self.active_connections):
+            if skip_idle and self.last_seen.get(id(connection), 0.0) < idle_before:
+                continue
             try:
                 await connection.send_text(message)
             except:
                 self.disconnect(connection)
 
-manager = ConnectionManager()
+manager = ConnectionManager(idle_after=float(os.getenv("WS_IDLE_SECONDS", "30")))
 
 
 @app.websocket("/ws/obd2")
 async def websocket_obd2_endpoint(websocket: WebSocket):
     """WebSocket pentru date OBD2 live"""
-    await manager.connect(websocket)
+    # Subprotocol binar opțional (obd2-bin.v1 / obd2-bin-deflate.v1), implicit JSON
+    subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols", []))
+    await manager.connect(websocket, subprotocol)
+    capture_id = traffic_recorder.new_ws_connection("/ws/obd2", subprotocol) if traffic_recorder else None
+    
+    encoder = None
+    if subprotocol:
+        encoder = LiveFrameEncoder(deflate=subprotocol == SUBPROTOCOL_BINARY_DEFLATE)
+        # Schema PID se trimite o singură dată, apoi doar frame-uri binare
+        await websocket.send_json(encoder.schema_message())
+    
     try:
         while True:
             # Așteaptă comenzi de la client
             data = await websocket.receive_text()
+            manager.touch(websocket)
+            if capture_id:
+                traffic_recorder.record_ws(capture_id, "message", data)
             
             if data == "get_live_data":
                 # Trimite date live simulate
                 live_data = obd2_simulator.get_live_data()
-                await websocket.send_json({
-                    "type": "live_data",
-                    "data": live_data,
-                    "timestamp": datetime.now().isoformat()
-                })
+                if encoder and isinstance(live_data, LiveSample):
+                    await websocket.send_bytes(encoder.encode(live_data))
+                else:
+                    await websocket.send_json({
+                        "type": "live_data",
+                        "data": to_api(live_data),
+                        "timestamp": datetime.now().isoformat()
+                    })
             
             elif data == "get_dtc":
-                # Trimite coduri DTC
-                dtc_data = obd2_simulator.read_dtc()
+                # Trimite coduri DTC (din cache, recitite doar la interval sau schimbare MIL)
+                dtc_data, dtc_meta = await read_dtc_cached()
                 await websocket.send_json({
                     "type": "dtc_codes",
                     "data": dtc_data,
+                    "cache": dtc_meta,
                     "timestamp": datetime.now().isoformat()
                 })
             
@@ -964,6 +1356,25 @@ async def websocket_obd2_endpoint(websocket: WebSocket):
                     "timestamp": datetime.now().isoformat()
                 })
             
+            elif data.startswith("subscribe_job:"):
+                # Rezultatul unui job de diagnostic va fi trimis pe acest socket
+                job_id = data.replace("subscribe_job:", "").strip()
+                
+                async def push_job_result(job, websocket=websocket):
+                    await websocket.send_json({
+                        "type": "diagnostic_job",
+                        "data": job.to_dict(),
+                        "timestamp": datetime.now().isoformat()
+                    })
+                
+                subscribed = await diagnostic_jobs.add_listener(job_id, push_job_result)
+                if not subscribed:
+                    await websocket.send_json({
+                        "type": "error",
+                        "data": {"error": f"Job inexistent: {job_id}"},
+                        "timestamp": datetime.now().isoformat()
+                    })
+            
             elif data == "ping":
                 # Keep-alive
                 await websocket.send_json({
@@ -978,6 +1389,9 @@ async def websocket_obd2_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         manager.disconnect(websocket)
+    finally:
+        if capture_id:
+            traffic_recorder.record_ws(capture_id, "disconnect")
 
 
 # ============================================================================
@@ -1000,10 +1414,18 @@ async def root():
         "endpoints": {
             "health": "/api/v1/health",
             "diagnostic": "/api/v1/diagnostic (POST)",
+            "diagnostic_jobs": "/api/v1/diagnostic/jobs (POST, asincron)",
             "obd2_scan": "/api/v1/obd2/scan (GET)",
             "obd2_connect": "/api/v1/obd2/connect (POST)",
-            "obd2_data": "/api/v1/obd2/data (GET)",
-            "websocket": "/ws/obd2 (WebSocket)"
+            "obd2_data": "/api/v1/obd2/data (GET, If-None-Match / ?wait= long-poll)",
+            "obd2_ingest": "/api/v1/obd2/ingest (POST, log CSV/ELM327)",
+            "obd2_window": "/api/v1/obd2/analyze-window (POST, fereastră de mostre)",
+            "telemetry_ingest": "/api/v1/telemetry/ingest (POST, NDJSON/binar, gzip/zstd)",
+            "fleet_stats": "/api/v1/fleet/stats (GET, DTC frecvente / quantile per model)",
+            "history": "/api/v1/history/vehicle (GET)",
+            "pricing_batch": "/api/v1/pricing/batch (POST, flotă)",
+            "metrics": "/api/v1/metrics (GET)",
+            "websocket": "/ws/obd2 (WebSocket, JSON sau subprotocol obd2-bin.v1)"
         },
         "timestamp": datetime.now().isoformat()
     }
@@ -1012,6 +1434,8 @@ async def root():
 @app.get("/api/v1/health")
 async def health_check():
     """Health check cu status sistem"""
+    import httpx
+    
     # Verifică disponibilitatea AI-urilor
     ai_status = {
         "openai": os.getenv("OPENAI_API_KEY") is not None,
@@ -1035,14 +1459,58 @@ async def health_check():
         "ai_engines": ai_status,
         "obd2_simulator": "active",
         "smart_fallback": "enabled",
-        "websocket": "available"
+        "websocket": "available",
+        "history": _history_status(),
+        "diagnostic_jobs": diagnostic_jobs.stats()
     }
 
 
+def _history_status():
+    if not diagnostic_history.loaded:
+        return "lazy (neîncărcat)"
+    store = diagnostic_history.peek()
+    return store.stats() if store else "disabled"
+
+
+def remember_diagnostic(
+    store,
+    car_data: Dict[str, Any],
+    response_data: Dict[str, Any],
+    fingerprint: str,
+    obd2_analysis: Optional[Dict[str, Any]] = None
+):
+    """Salvează diagnosticul în istoric și îl face disponibil pentru cererile viitoare"""
+    # Salvare asincronă în istoric (nu blochează răspunsul)
+    if store:
+        store.record(car_data, response_data, fingerprint, response_data["diagnostic_id"])
+    
+    # Diagnosticele AI noi devin candidați pentru cererile similare viitoare
+    index = similarity_index.peek()
+    if index and response_data["ai_engine_used"] not in NON_INDEXED_ENGINES:
+        index.add(response_data["diagnostic_id"], car_data, response_data, obd2_analysis)
+    
+    # ... și exemple de antrenare pentru motorul CPU
+    predictor = cpu_engine.peek()
+    if predictor and response_data["ai_engine_used"] not in NON_INDEXED_ENGINES:
+        predictor.classifier.learn(car_data, response_data, obd2_analysis)
+    
+    # Agregatele de flotă (DTC, quantile per model, vehicule distincte)
+    if fleet_stats:
+        fleet_stats.record_diagnostic(car_data)
+
+
 @app.post("/api/v1/diagnostic")
-async def process_diagnostic(request_data: DiagnosticRequest):
+async def process_diagnostic(
+    request_data: DiagnosticRequest,
+    request: Request = None,
+    reuse: bool = True,
+    speculative: bool = DIAGNOSTIC_SPECULATIVE
+):
     """
     Endpoint principal pentru diagnostic auto
+    
+    speculative=true: răspunde imediat cu diagnosticul inteligent (provizoriu),
+    iar diagnosticul AI vine ulterior prin jobul din câmpul `refinement`
     """
     start_time = datetime.now()
     
@@ -1055,22 +1523,111 @@ async def process_diagnostic(request_data: DiagnosticRequest):
         # Analizează date OBD2 dacă sunt disponibile
         obd2_analysis = None
         if car_data.get('obd2_connected') and car_data.get('obd2_data'):
-            obd2_analysis = analyze_obd2_data(car_data['obd2_data'], car_data['coduri_dtc'])
+            with span("obd2_analysis"):
+                obd2_analysis = analyze_obd2_data(car_data['obd2_data'], car_data['coduri_dtc'])
+        
+        # Refolosește diagnosticul anterior dacă intrările nu s-au schimbat material
+        from history_store import input_fingerprint
+        fingerprint = input_fingerprint(car_data, obd2_analysis)
+        store = await asyncio.to_thread(diagnostic_history.get)
+        if reuse and store:
+            with span("history_lookup") as lookup_span:
+                previous = await asyncio.to_thread(
+                    store.find_reusable,
+                    fingerprint,
+                    car_data.get('user_id'),
+                    car_data.get('session_id'),
+                    HISTORY_REUSE_MAX_AGE,
+                    NON_INDEXED_ENGINES
+                )
+                lookup_span.set(hit=bool(previous))
+            if previous:
+                processing_time_ms = round((datetime.now() - start_time).total_seconds() * 1000, 2)
+                response = DiagnosticResponse(**{
+                    **previous["response"],
+                    "processing_time": f"{processing_time_ms}ms",
+                    "timestamp": datetime.now().isoformat(),
+                    "obd2_analysis": obd2_analysis,
+                    "reused_from": previous["diagnostic_id"],
+                    "usage": None,
+                })
+                logger.info(f"♻️  Diagnostic refolosit din istoric: {previous['diagnostic_id']}")
+                if fleet_stats:
+                    if loop_monitor:
+                        loop_monitor.run_or_defer(fleet_stats.record_diagnostic, car_data)
+                    else:
+                        fleet_stats.record_diagnostic(car_data)
+                return response
         
         # Obține diagnostic de la AI sau fallback
-        if any([os.getenv("OPENAI_API_KEY"), os.getenv("GEMINI_API_KEY")]):
-            # Încearcă AI-urile reale
-            prompt = create_enhanced_prompt(car_data, obd2_analysis)
-            ai_result = await get_ai_response_with_fallback(prompt)
+        reused_from = None
+        refinement_job = None
+        with span("routing") as routing_span:
+            routing = diagnostic_router.route(car_data, obd2_analysis) if diagnostic_router else None
+            routing_span.set(tier=routing.tier if routing else None)
+        if routing and routing.tier == TIER_TRIVIAL:
+            # Caz trivial: diagnosticul inteligent local e suficient
+            logger.info(f"🧭 Caz trivial (scor {routing.score}) - fără apel AI")
+            with span("smart_diagnostic"):
+                diagnostic_result = generate_smart_diagnostic(car_data, obd2_analysis)
+        elif any(engine_available(name) for name, _ in (routing.engines if routing else DEFAULT_ENGINE_PLAN)):
+            # Caută diagnostice anterioare aproape identice (alt user, formulare diferită)
+            similar = []
+            if SIMILARITY_ENABLED:
+                with span("similarity") as similarity_span:
+                    index = await asyncio.to_thread(similarity_index.get)
+                    similar = index.query(car_data, obd2_analysis, k=3, min_score=SIMILARITY_CONTEXT_THRESHOLD)
+                    similarity_span.set(matches=len(similar))
             
-            if ai_result and validate_ai_response(ai_result):
-                diagnostic_result = ai_result
+            # Vehicul neidentificat: cazurile similare rămân doar exemple în prompt
+            from diagnostic_index import vehicle_identified
+            if similar and similar[0].score >= SIMILARITY_ANSWER_THRESHOLD and vehicle_identified(car_data):
+                best = similar[0]
+                # Din cazul similar se refolosesc doar problemele și soluțiile; devizul e al vehiculului curent
+                quote = (await asyncio.to_thread(pricing_engine.get)).quote(car_data, obd2_analysis)
+                diagnostic_result = {
+                    **best.response,
+                    "total_price": quote["total"],
+                    "ai_engine": "similarity_index",
+                    "usage": None
+                }
+                reused_from = best.entry_id
+                logger.info(f"🔎 Răspuns din diagnostic similar {best.entry_id} (scor {best.score})")
             else:
+                if speculative:
+                    refinement_job = submit_refinement_job(request_data, request)
+                
+                if refinement_job:
+                    # Răspuns imediat; rafinarea AI rulează în coada de joburi
+                    with span("smart_diagnostic"):
+                        diagnostic_result = generate_smart_diagnostic(car_data, obd2_analysis)
+                else:
+                    # Încearcă AI-urile reale, cu cazurile similare ca exemple
+                    with span("prompt"):
+                        prompt = create_enhanced_prompt(
+                            car_data,
+                            obd2_analysis,
+                            [{"score": m.score, "car_data": m.car_data, "response": m.response} for m in similar]
+                        )
+                    if routing:
+                        logger.info(f"🧭 Nivel {routing.tier} (scor {routing.score})")
+                    with span("ai_fallback"):
+                        ai_result = await get_ai_response_with_fallback(
+                            prompt,
+                            routing.engines if routing else None,
+                            car_data,
+                            obd2_analysis
+                        )
+                    diagnostic_result = ai_result if ai_result and validate_ai_response(ai_result) else None
+            
+            if not diagnostic_result:
                 # Fallback la diagnostic inteligent
-                diagnostic_result = generate_smart_diagnostic(car_data, obd2_analysis)
+                with span("smart_diagnostic"):
+                    diagnostic_result = generate_smart_diagnostic(car_data, obd2_analysis)
         else:
             # Direct la diagnostic inteligent
-            diagnostic_result = generate_smart_diagnostic(car_data, obd2_analysis)
+            with span("smart_diagnostic"):
+                diagnostic_result = generate_smart_diagnostic(car_data, obd2_analysis)
         
         # Calculează timpul de procesare
         processing_time_ms = round((datetime.now() - start_time).total_seconds() * 1000, 2)
@@ -1087,9 +1644,36 @@ async def process_diagnostic(request_data: DiagnosticRequest):
             car_type=request_data.car_type,
             model=request_data.model,
             timestamp=datetime.now().isoformat(),
-            obd2_analysis=obd2_analysis
+            obd2_analysis=obd2_analysis,
+            diagnostic_id=uuid.uuid4().hex,
+            reused_from=reused_from,
+            usage=diagnostic_result.get("usage"),
+            routing={"tier": routing.tier, "score": routing.score, "breakdown": routing.breakdown} if routing else None,
+            provisional=refinement_job is not None,
+            refinement={
+                "job_id": refinement_job.id,
+                "result_url": f"/api/v1/diagnostic/jobs/{refinement_job.id}",
+                "websocket": f"/ws/obd2 -> subscribe_job:{refinement_job.id}"
+            } if refinement_job else None
         )
         
+        if refinement_job:
+            # Provizoriul nu intră în istoric/statistici: altfel rafinarea l-ar refolosi
+            logger.info(f"⚡ Diagnostic provizoriu trimis, rafinare AI în jobul {refinement_job.id}")
+            return response
+        
+        if routing:
+            diagnostic_router.record(routing.tier, response.ai_engine_used, processing_time_ms)
+        
+        # Istoric, index de similaritate, exemple CPU: amânate cât timp event loop-ul e întârziat
+        with span("remember"):
+            if loop_monitor:
+                loop_monitor.run_or_defer(
+                    remember_diagnostic, store, car_data, response.model_dump(), fingerprint, obd2_analysis
+                )
+            else:
+                remember_diagnostic(store, car_data, response.model_dump(), fingerprint, obd2_analysis)
+        
         logger.info(f"✅ Diagnostic generat cu {response.ai_engine_used}")
         logger.info(f"💰 Preț estimat: {response.total_price} RON")
         logger.info(f"🎯 Încredere AI: {response.ai_confidence}")
@@ -1104,19 +1688,218 @@ async def process_diagnostic(request_data: DiagnosticRequest):
         )
 
 
+# ============================================================================
+# JOBURI ASINCRONE DE DIAGNOSTIC
+# ============================================================================
+
+async def run_diagnostic_job(request_data: DiagnosticRequest):
+    """Executat de workerii cozii: același flux ca /api/v1/diagnostic"""
+    return await process_diagnostic(request_data, speculative=False)
+
+
+def job_owner(request_data: DiagnosticRequest, request: Optional[Request]) -> str:
+    """Cota din coadă: user_id-ul declarat, altfel IP-ul clientului (anonimii nu împart o singură cotă)"""
+    if request_data.user_id:
+        return request_data.user_id
+    return request.client.host if request is not None and request.client else "anonymous"
+
+
+def submit_refinement_job(request_data: DiagnosticRequest, request: Optional[Request] = None):
+    """Jobul de rafinare AI pentru un răspuns speculativ; None dacă coada e plină"""
+    try:
+        return diagnostic_jobs.submit(request_data, job_owner(request_data, request), "normal")
+    except JobQueueFull as e:
+        logger.warning(f"Rafinare AI refuzată ({e}) - diagnostic sincron")
+        return None
+
+
+diagnostic_jobs = FairJobQueue(
+    run_diagnostic_job,
+    workers=int(os.getenv("DIAGNOSTIC_JOB_WORKERS", "4")),
+    max_queued=int(os.getenv("DIAGNOSTIC_JOB_MAX_QUEUED", "200")),
+    max_per_user=int(os.getenv("DIAGNOSTIC_JOB_MAX_PER_USER", "10")),
+)
+
+
+@app.on_event("shutdown")
+async def stop_diagnostic_jobs():
+    await diagnostic_jobs.stop()
+
+
+@app.post("/api/v1/diagnostic/jobs", status_code=202)
+async def submit_diagnostic_job(
+    request_data: DiagnosticRequest,
+    request: Request,
+    priority: str = Query(default="normal", pattern="^(high|normal|low)$")
+):
+    """Pune un diagnostic în coadă și întoarce imediat id-ul jobului
+
+    priority=high e rezervat administratorilor (X-Admin-Token); ceilalți pot cere doar normal/low
+    """
+    user_id = job_owner(request_data, request)
+    if priority == "high" and not is_admin(request):
+        priority = "normal"
+    try:
+        job = diagnostic_jobs.submit(request_data, user_id, priority)
+    except JobQueueFull as e:
+        logger.warning(f"🚫 Job respins ({user_id}): {e}")
+        raise HTTPException(
+            status_code=429 if e.per_user else 503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    return {
+        "status": "accepted",
+        "job_id": job.id,
+        "priority": priority,
+        "poll_url": f"/api/v1/diagnostic/jobs/{job.id}",
+        "websocket": f"/ws/obd2 -> subscribe_job:{job.id}",
+        "queue": diagnostic_jobs.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/v1/diagnostic/jobs/{job_id}")
+async def get_diagnostic_job(job_id: str):
+    """Starea și rezultatul unui job de diagnostic (polling)"""
+    job = diagnostic_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job inexistent sau expirat")
+    return job.to_dict()
+
+
+# ============================================================================
+# PREȚURI
+# ============================================================================
+
+PRICING_BATCH_MAX = int(os.getenv("PRICING_BATCH_MAX", "10000"))
+
+
+@app.post("/api/v1/pricing/batch")
+async def price_fleet(fleet: List[DiagnosticRequest], request: Request):
+    """
+    Deviz estimativ pentru o flotă (aceleași câmpuri și validări ca cererea de diagnostic).
+    Cu Accept: application/x-ndjson, devizele vin câte unul pe linie, în streaming.
+    """
+    if len(fleet) > PRICING_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"Maxim {PRICING_BATCH_MAX} vehicule per lot")
+    # Kilometraj "150000 km", an etc. normalizate ca la /api/v1/diagnostic
+    vehicles = [vehicle.model_dump() for vehicle in fleet]
+    try:
+        pool = process_pool.peek()
+        if pool and len(vehicles) >= PROCESS_POOL_MIN_BATCH:
+            # Flotele mari se împart pe toți workerii
+            from process_pool import quote_batch_task
+            quotes = await pool.map_chunks(quote_batch_task, vehicles)
+        else:
+            engine = await asyncio.to_thread(pricing_engine.get)
+            quotes = await asyncio.to_thread(engine.quote_batch, vehicles)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Vehicul invalid: {e}")
+    if wants_ndjson(request):
+        return ndjson_response(quotes)
+    return {
+        "status": "success",
+        "count": len(quotes),
+        "total": sum(q["total"] for q in quotes),
+        "quotes": quotes,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/v1/pricing")
+async def get_pricing_status():
+    """Versiunea și dimensiunea tabelului de prețuri activ"""
+    engine = await asyncio.to_thread(pricing_engine.get)
+    return {**engine.stats(), "timestamp": datetime.now().isoformat()}
+
+
+@app.post("/api/v1/pricing/reload")
+async def reload_pricing():
+    """Reîncarcă imediat tabelul (altfel se reîncarcă singur la modificarea fișierului)"""
+    engine = await asyncio.to_thread(pricing_engine.get)
+    reloaded = await asyncio.to_thread(engine.maybe_reload)
+    return {
+        "status": "reloaded" if reloaded else "unchanged",
+        **engine.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+# ============================================================================
+# ISTORIC DIAGNOSTICE
+# ============================================================================
+
+@app.get("/api/v1/history/vehicle")
+async def get_vehicle_history(
+    car_type: str = "standard",
+    model: str = "Unknown",
+    year: int = 2023,
+    vin: Optional[str] = None,
+    dtc: Optional[str] = None,
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=200)
+):
+    """
+    Istoricul diagnosticelor pentru un vehicul (opțional filtrat după cod DTC).
+    Fără VIN, doar diagnosticele proprii (user_id sau session_id obligatoriu).
+    """
+    from history_store import vehicle_key
+    
+    if not (vin and vin.strip()) and not (user_id or session_id):
+        raise HTTPException(
+            status_code=400,
+            detail="Fără VIN, istoricul cere user_id sau session_id"
+        )
+    
+    store = await asyncio.to_thread(diagnostic_history.get)
+    if not store:
+        raise HTTPException(status_code=503, detail="Istoricul diagnosticelor este dezactivat")
+    
+    key = vehicle_key({"car_type": car_type, "model": model, "year": year, "vin": vin})
+    items = await asyncio.to_thread(store.vehicle_history, key, dtc, None, limit, user_id, session_id)
+    return {
+        "status": "success",
+        "vehicle_key": key,
+        "count": len(items),
+        "history": items,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/v1/history/{diagnostic_id}")
+async def get_history_entry(
+    diagnostic_id: str,
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None
+):
+    """Un diagnostic salvat, după id; cererea și identificatorii doar pentru proprietar"""
+    store = await asyncio.to_thread(diagnostic_history.get)
+    if not store:
+        raise HTTPException(status_code=503, detail="Istoricul diagnosticelor este dezactivat")
+    
+    entry = await asyncio.to_thread(store.get, diagnostic_id, user_id, session_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Diagnostic inexistent")
+    return entry
+
+
 # ============================================================================
 # ENDPOINT-URI OBD2
 # ============================================================================
 
 @app.get("/api/v1/obd2/scan")
-async def scan_obd2_devices():
-    """Scanează dispozitive OBD2 Bluetooth disponibile"""
+async def scan_obd2_devices(refresh: bool = False):
+    """Dispozitive OBD2 Bluetooth (listă menținută în fundal; refresh=true forțează o scanare)"""
     try:
-        devices = obd2_simulator.scan_devices()
+        devices = await device_scanner.devices(force=refresh)
         return {
             "status": "success",
             "devices": devices,
             "count": len(devices),
+            "scanner": device_scanner.stats(),
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -1129,6 +1912,7 @@ async def connect_obd2(request: OBD2ConnectionRequest):
     """Conectează la un dispozitiv OBD2"""
     try:
         result = obd2_simulator.connect(request.device_address, request.device_name)
+        dtc_cache.invalidate()
         return {
             "status": "success",
             "connection": result,
@@ -1144,6 +1928,7 @@ async def disconnect_obd2():
     """Deconectează de la OBD2"""
     try:
         result = obd2_simulator.disconnect()
+        dtc_cache.invalidate()
         return {
             "status": "success",
             "disconnection": result,
@@ -1154,22 +1939,103 @@ async def disconnect_obd2():
         raise HTTPException(status_code=500, detail=f"Eroare deconectare: {str(e)}")
 
 
+@app.get("/api/v1/obd2/scenarios")
+async def list_obd2_scenarios():
+    """Scenariile disponibile pentru simulatorul OBD2"""
+    return {
+        "status": "success",
+        "scenarios": list(SCENARIOS),
+        "active": obd2_simulator.scenario,
+        "hz": obd2_simulator.hz,
+        "seed": obd2_simulator.seed,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.post("/api/v1/obd2/scenario")
+async def set_obd2_scenario(request: OBD2ScenarioRequest):
+    """Selectează scenariul redat de simulator"""
+    try:
+        result = await asyncio.to_thread(
+            obd2_simulator.set_scenario, request.scenario, request.hz, request.seed
+        )
+        return {
+            "status": "success",
+            "simulator": result,
+            "timestamp": datetime.now().isoformat()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Long-poll: cât poate ține serverul o cerere ?wait= deschisă
+OBD2_LONG_POLL_MAX = float(os.getenv("OBD2_LONG_POLL_MAX", "30"))
+
+
+def obd2_etag(live_version: int, dtc_version: int) -> str:
+    """ETag slab: generația conexiunii + indexul mostrei live + versiunea DTC"""
+    return f'W/"{obd2_simulator.generation}.{live_version}.{dtc_version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match: listă separată prin virgulă sau *"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Comparație slabă: W/"x" și "x" sunt echivalente
+    return "*" in tags or etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
 @app.get("/api/v1/obd2/data")
-async def get_obd2_data():
-    """Obține date live de la OBD2"""
+async def get_obd2_data(
+    request: Request,
+    response: Response,
+    session_id: Optional[str] = None,
+    wait: float = Query(0, ge=0, description="Long-poll: secunde de așteptat o mostră nouă dacă ETag-ul coincide")
+):
+    """Obține date live de la OBD2 (If-None-Match -> 304; ?wait= pentru long-poll)"""
     try:
+        if_none_match = request.headers.get("if-none-match")
+        
+        # Coduri DTC din cache (mode 03 doar la interval lung sau când MIL se schimbă)
+        dtc_data, dtc_meta = await read_dtc_cached(session_id)
+        etag = obd2_etag(obd2_simulator.live_version(), dtc_meta.get("version", 0))
+        
+        if etag_matches(if_none_match, etag):
+            if not wait or not obd2_simulator.connected:
+                return not_modified(etag)
+            # Simulatorul produce mostre după ceas: se așteaptă până la granița următoarei mostre
+            deadline = time.monotonic() + min(wait, OBD2_LONG_POLL_MAX)
+            while etag_matches(if_none_match, etag):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or await request.is_disconnected():
+                    return not_modified(etag)
+                delay = obd2_simulator.next_sample_in() if obd2_simulator.connected else remaining
+                await asyncio.sleep(min(remaining, delay + 0.001))
+                dtc_data, dtc_meta = await read_dtc_cached(session_id)
+                etag = obd2_etag(obd2_simulator.live_version(), dtc_meta.get("version", 0))
+        
         # Obține date live
         live_data = obd2_simulator.get_live_data()
         
-        # Obține coduri DTC
-        dtc_data = obd2_simulator.read_dtc()
-        
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
         return {
             "status": "success",
             "connected": obd2_simulator.connected,
             "device": obd2_simulator.current_device,
-            "live_data": live_data,
+            "live_data": to_api(live_data),
             "dtc_codes": dtc_data,
+            "dtc_cache": dtc_meta,
+            "versions": {
+                "generation": obd2_simulator.generation,
+                "live": obd2_simulator.live_version(),
+                "dtc": dtc_meta.get("version", 0)
+            },
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -1196,6 +2062,67 @@ async def send_obd2_command(command: OBD2Command):
         raise HTTPException(status_code=500, detail=f"Eroare comandă: {str(e)}")
 
 
+OBD2_WINDOW_MAX_SAMPLES = int(os.getenv("OBD2_WINDOW_MAX_SAMPLES", "500000"))
+
+
+class SampleWindowRequest(BaseModel):
+    """Fereastră de mostre OBD2: listă de mostre sau, pentru ferestre lungi, coloane de valori"""
+    samples: List[Dict[str, Any]] = Field(default_factory=list)
+    columns: Optional[Dict[str, List[Optional[float]]]] = None
+    coduri_dtc: List[str] = Field(default_factory=list)
+    top: int = Field(default=10, ge=1, le=100)
+    # Opțional: vehiculul ferestrei, pentru agregatele de flotă (quantile per model)
+    car_type: Optional[str] = None
+    model: Optional[str] = None
+    vin: Optional[str] = None
+
+
+@app.post("/api/v1/obd2/analyze-window")
+async def analyze_sample_window(request_data: SampleWindowRequest):
+    """Regulile de analiză pe fiecare mostră din fereastră, cu sumar și cele mai grave evenimente"""
+    columns = request_data.columns
+    rows = max((len(values) for values in columns.values()), default=0) if columns else len(request_data.samples)
+    if rows > OBD2_WINDOW_MAX_SAMPLES:
+        raise HTTPException(status_code=413, detail=f"Maxim {OBD2_WINDOW_MAX_SAMPLES} mostre per fereastră")
+    # Schițele de quantile se construiesc lângă analiză (în worker) și se unesc aici
+    sketch = bool(fleet_stats and request_data.car_type)
+    try:
+        pool = process_pool.peek() or await asyncio.to_thread(process_pool.get)
+        if pool:
+            report = await pool.analyze_window(
+                None if columns else request_data.samples,
+                request_data.coduri_dtc,
+                request_data.top,
+                columns=columns,
+                sketch=sketch
+            )
+        else:
+            from process_pool import analyze_samples_task, columns_to_samples
+            samples = await asyncio.to_thread(columns_to_samples, columns) if columns else request_data.samples
+            report = await asyncio.to_thread(
+                analyze_samples_task, samples, request_data.coduri_dtc, request_data.top, sketch
+            )
+        sketches = report.pop("signal_sketches", None)
+        if sketches:
+            fleet_stats.merge_signal_sketches(
+                request_data.car_type,
+                request_data.model,
+                sketches,
+                samples=report.get("samples", 0),
+                vehicle_id=f"vin:{request_data.vin.strip().upper()}" if request_data.vin else None
+            )
+        return {
+            "status": "success",
+            "report": report,
+            "timestamp": datetime.now().isoformat()
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Eroare analiză fereastră OBD2: {e}")
+        raise HTTPException(status_code=500, detail=f"Eroare analiză: {str(e)}")
+
+
 @app.post("/api/v1/obd2/clear-dtc")
 async def clear_obd2_dtc():
     """Șterge codurile DTC"""
@@ -1204,6 +2131,7 @@ async def clear_obd2_dtc():
             raise HTTPException(status_code=400, detail="Nu sunteti conectat la OBD2")
         
         result = obd2_simulator.clear_dtc()
+        dtc_cache.invalidate()
         return {
             "status": "success",
             "result": result,
@@ -1214,6 +2142,325 @@ async def clear_obd2_dtc():
         raise HTTPException(status_code=500, detail=f"Eroare ștergere: {str(e)}")
 
 
+OBD2_LOG_MAX_BYTES = int(os.getenv("OBD2_LOG_MAX_MB", "256")) * 1024 * 1024
+OBD2_LOG_WRITE_BYTES = 1024 * 1024  # bucățile se adună până la 1 MiB, apoi o scriere în thread
+
+
+@app.post("/api/v1/obd2/ingest")
+async def ingest_obd2_log(
+    request: Request,
+    log_format: str = Query(default="auto", alias="format", pattern="^(auto|csv|elm327)$"),
+    top: int = Query(default=10, ge=1, le=100),
+):
+    """Ingestie log OBD2 complet (CSV sau captură ELM327) cu sumar per drum"""
+    from log_ingest import get_ingest_pool, ingest_file
+    
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > OBD2_LOG_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Log prea mare (maxim {OBD2_LOG_MAX_BYTES // (1024 * 1024)} MB)")
+    
+    tmp_path = None
+    try:
+        # Body-ul se scrie pe disc pe bucăți, în thread, fără a fi ținut în memorie
+        size = 0
+        tmp = await asyncio.to_thread(tempfile.NamedTemporaryFile, delete=False, suffix=".obd2log")
+        tmp_path = tmp.name
+        try:
+            pending = []
+            pending_bytes = 0
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > OBD2_LOG_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=413, detail=f"Log prea mare (maxim {OBD2_LOG_MAX_BYTES // (1024 * 1024)} MB)"
+                    )
+                pending.append(chunk)
+                pending_bytes += len(chunk)
+                if pending_bytes >= OBD2_LOG_WRITE_BYTES:
+                    await asyncio.to_thread(tmp.write, b"".join(pending))
+                    pending, pending_bytes = [], 0
+            if pending:
+                await asyncio.to_thread(tmp.write, b"".join(pending))
+        finally:
+            await asyncio.to_thread(tmp.close)
+        
+        if not size:
+            raise HTTPException(status_code=400, detail="Log gol")
+        
+        logger.info(f"📂 Ingestie log OBD2: {size} bytes (format {log_format})")
+        
+        # Parsarea și regulile rulează într-un proces worker, nu pe event loop
+        pool = process_pool.peek()
+        if pool:
+            report = await pool.run(ingest_file, tmp_path, log_format, top)
+        else:
+            loop = asyncio.get_running_loop()
+            report = await loop.run_in_executor(get_ingest_pool(), ingest_file, tmp_path, log_format, top)
+        report["file"] = "upload"
+        
+        return {
+            "status": "success",
+            "report": report,
+            "timestamp": datetime.now().isoformat()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Eroare ingestie log OBD2: {e}")
+        raise HTTPException(status_code=500, detail=f"Eroare ingestie: {str(e)}")
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+@app.on_event("shutdown")
+async def stop_ingest_pool():
+    from log_ingest import shutdown_ingest_pool
+    shutdown_ingest_pool()
+
+
+# ============================================================================
+# TELEMETRIE DE LA GATEWAY-URI (ÎNCĂRCĂRI ÎN MASĂ)
+# ============================================================================
+
+TELEMETRY_MAX_BODY_BYTES = int(os.getenv("TELEMETRY_MAX_BODY_MB", "512")) * 1024 * 1024
+TELEMETRY_BLOCK_BYTES = int(os.getenv("TELEMETRY_BLOCK_KB", "256")) * 1024
+TELEMETRY_ENQUEUE_TIMEOUT = float(os.getenv("TELEMETRY_ENQUEUE_TIMEOUT", "5"))
+TELEMETRY_RETRY_AFTER = int(os.getenv("TELEMETRY_RETRY_AFTER", "2"))
+
+telemetry_store = create_telemetry_store()
+
+
+async def process_telemetry_batch(batch: TelemetryBatch):
+    """Un bloc: parsare + reguli (+ schițe de flotă) în pool, apoi starea vehiculului"""
+    sketch = bool(fleet_stats and batch.car_type)
+    pool = process_pool.peek()
+    if pool:
+        result = await pool.run(analyze_block_task, batch.fmt, batch.data, DEFAULT_TOP_EVENTS, sketch)
+    else:
+        result = await asyncio.to_thread(analyze_block_task, batch.fmt, batch.data, DEFAULT_TOP_EVENTS, sketch)
+    telemetry_store.merge(batch.vehicle_id, result)
+    if result["signal_sketches"]:
+        fleet_stats.merge_signal_sketches(
+            batch.car_type,
+            batch.model,
+            result["signal_sketches"],
+            samples=result["report"]["samples"],
+            vehicle_id=f"gateway:{batch.vehicle_id}"
+        )
+
+
+telemetry_pipeline = TelemetryPipeline(
+    process_telemetry_batch,
+    queue_size=int(os.getenv("TELEMETRY_QUEUE_SIZE", "64")),
+    workers=int(os.getenv("TELEMETRY_WORKERS", str(os.cpu_count() or 4)))
+)
+
+
+@app.on_event("shutdown")
+async def stop_telemetry_pipeline():
+    await telemetry_pipeline.stop()
+
+
+@app.post("/api/v1/telemetry/ingest", status_code=202)
+async def ingest_telemetry(
+    request: Request,
+    vehicle_id: str = Query(..., min_length=1, max_length=128),
+    car_type: Optional[str] = None,
+    model: Optional[str] = None,
+    body_format: Optional[str] = Query(default=None, alias="format", pattern="^(ndjson|binary)$")
+):
+    """
+    Mostre OBD2 în masă: NDJSON (o mostră per linie) sau lot binar OBDB
+    (Content-Type application/vnd.obd2-batch), opțional cu Content-Encoding
+    gzip/deflate/zstd. Răspunsul (202) vine după ce toate blocurile sunt în
+    coada de analiză; starea per vehicul: /api/v1/telemetry/vehicles/{vehicle_id}
+    """
+    fmt = body_format or (
+        FORMAT_BINARY if BATCH_CONTENT_TYPE in request.headers.get("content-type", "") else FORMAT_NDJSON
+    )
+    try:
+        decoder = StreamDecoder(request.headers.get("content-encoding"), TELEMETRY_MAX_BODY_BYTES)
+    except UnsupportedEncoding as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    framer = create_framer(fmt, TELEMETRY_BLOCK_BYTES)
+    started = time.perf_counter()
+    samples = batches = 0
+    
+    async def enqueue(blocks):
+        nonlocal samples, batches
+        for block, count in blocks:
+            batch = TelemetryBatch(vehicle_id, car_type, model, fmt, block, count)
+            if not await telemetry_pipeline.submit(batch, TELEMETRY_ENQUEUE_TIMEOUT):
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Coada de analiză e plină; {samples} mostre acceptate înainte de respingere",
+                    headers={"Retry-After": str(TELEMETRY_RETRY_AFTER)}
+                )
+            samples += count
+            batches += 1
+    
+    try:
+        # Corpul se decomprimă și se taie în blocuri pe măsură ce sosește
+        async for chunk in request.stream():
+            await enqueue(framer.feed(decoder.feed(chunk)))
+        await enqueue(framer.finish())
+    except BodyTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except DECODE_ERRORS as e:
+        raise HTTPException(status_code=400, detail=f"Corp invalid ({fmt}): {e}")
+    
+    elapsed = time.perf_counter() - started
+    return {
+        "status": "accepted",
+        "vehicle_id": vehicle_id,
+        "format": fmt,
+        "samples": samples,
+        "batches": batches,
+        "bytes_received": decoder.bytes_in,
+        "bytes_decoded": decoder.bytes_out,
+        "samples_per_second": round(samples / elapsed) if elapsed else None,
+        "pipeline": telemetry_pipeline.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/v1/telemetry/vehicles/{vehicle_id}")
+async def get_vehicle_telemetry(vehicle_id: str):
+    """Sumarul cumulat al telemetriei încărcate pentru un vehicul"""
+    vehicle = telemetry_store.get(vehicle_id)
+    if not vehicle:
+        raise HTTPException(status_code=404, detail="Vehicul fără telemetrie (sau eliminat din memorie)")
+    return {
+        "status": "success",
+        **vehicle.to_dict(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+# ============================================================================
+# AGREGATE DE FLOTĂ
+# ============================================================================
+
+def _parse_csv_floats(text: str) -> List[float]:
+    try:
+        values = [float(part) for part in text.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Listă de numere invalidă: {text}")
+    if any(not 0 <= value <= 1 for value in values):
+        raise HTTPException(status_code=422, detail="Quantilele trebuie să fie între 0 și 1")
+    return values
+
+
+@app.get("/api/v1/fleet/stats")
+async def get_fleet_stats(
+    car_type: Optional[str] = None,
+    model: Optional[str] = None,
+    year: Optional[int] = Query(default=None, ge=1950, le=2100),
+    weeks: int = Query(default=1, ge=1, le=52),
+    signals: Optional[str] = Query(default=None, description=f"Separate prin virgulă: {', '.join(FLEET_SIGNALS)}"),
+    quantiles: str = "0.5,0.95,0.99",
+    top: int = Query(default=10, ge=1, le=100)
+):
+    """
+    Agregate aproximative (schițe): cele mai frecvente DTC pentru marcă/model/an,
+    quantile per semnal (per model, dacă modelul nu e specificat) și vehicule distincte
+    """
+    if not fleet_stats:
+        raise HTTPException(status_code=404, detail="Agregatele de flotă sunt dezactivate (FLEET_STATS_ENABLED)")
+    if model and not car_type:
+        raise HTTPException(status_code=422, detail="Parametrul model necesită car_type")
+    
+    result = await asyncio.to_thread(
+        fleet_stats.query,
+        car_type,
+        model,
+        year,
+        weeks,
+        [signal.strip() for signal in signals.split(",")] if signals else None,
+        tuple(_parse_csv_floats(quantiles)) or (0.5,),
+        top
+    )
+    return {
+        "status": "success",
+        **result,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+# ============================================================================
+# ADMINISTRARE (PROFILARE, TRASĂRI)
+# ============================================================================
+
+# Fără ADMIN_TOKEN setat, endpoint-urile de administrare sunt dezactivate
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+
+def is_admin(request: Request) -> bool:
+    token = request.headers.get("x-admin-token", "")
+    return bool(ADMIN_TOKEN) and secrets.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+def require_admin(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Administrarea nu este activată (ADMIN_TOKEN)")
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Token de administrare invalid")
+
+
+@app.get("/api/v1/admin/profile")
+async def profile_process(
+    request: Request,
+    seconds: float = Query(default=10.0, gt=0),
+    output: str = Query(default="collapsed", alias="format", pattern="^(collapsed|json)$"),
+    lines: bool = False,
+    thread: Optional[str] = None
+):
+    """Profil statistic al procesului (collapsed stacks pentru flamegraph sau JSON cu top funcții)"""
+    require_admin(request)
+    seconds = min(seconds, PROFILE_MAX_SECONDS)
+    try:
+        profile = await asyncio.to_thread(profiler.profile, seconds, lines, thread)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    logger.info(f"🔬 Profil {seconds}s: {profile['samples']} eșantioane, overhead {profile['overhead_pct']}%")
+    if output == "collapsed":
+        return PlainTextResponse(
+            collapsed(profile),
+            headers={
+                "X-Profile-Samples": str(profile["samples"]),
+                "X-Profile-Overhead-Pct": str(profile["overhead_pct"])
+            }
+        )
+    return {
+        "status": "success",
+        "profile": {**profile, "top_functions": top_functions(profile)},
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/v1/admin/traces")
+async def list_traces(request: Request, limit: int = Query(default=20, ge=1, le=200)):
+    """Ultimele cereri trasate (X-Trace)"""
+    require_admin(request)
+    return {
+        "traces": trace_store.recent(limit),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/v1/admin/traces/{trace_id}")
+async def get_trace(request: Request, trace_id: str):
+    """Span-urile complete ale unei cereri trasate"""
+    require_admin(request)
+    trace = trace_store.get(trace_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail=f"Trasare inexistentă: {trace_id}")
+    return {**trace.to_dict(), "timestamp": datetime.now().isoformat()}
+
+
 # ============================================================================
 # UTILITARE
 # ============================================================================
@@ -1250,6 +2497,41 @@ async def debug_endpoint(request: Request):
         }
 
 
+@app.get("/api/v1/metrics")
+async def get_metrics():
+    """Metrici runtime: throttling, motoare AI, coada de joburi"""
+    return {
+        "rate_limit": {
+            "diagnostic": diagnostic_rate_limiter.stats(),
+            "api": api_rate_limiter.stats()
+        },
+        "ai_engines": engine_limiter.stats(),
+        "ai_usage": usage_stats.stats(),
+        "ai_json": dict(extraction_stats),
+        "routing": diagnostic_router.stats() if diagnostic_router else None,
+        "cpu_model": cpu_engine.peek().stats() if cpu_engine.peek() else None,
+        "diagnostic_jobs": diagnostic_jobs.stats(),
+        "event_loop": loop_monitor.stats() if loop_monitor else None,
+        "process_pool": process_pool.peek().stats() if process_pool.peek() else None,
+        "obd2_cache": {"dtc": dtc_cache.stats(), "bluetooth": device_scanner.stats()},
+        "traffic_capture": traffic_recorder.stats() if traffic_recorder else None,
+        "fleet_stats": fleet_stats.stats() if fleet_stats else None,
+        "telemetry": {"pipeline": telemetry_pipeline.stats(), "store": telemetry_store.stats()},
+        "compression": response_compressor.stats() if response_compressor else None,
+        "ai_mock": AI_MOCK_ENABLED,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/v1/startup-profile")
+async def get_startup_profile(top: int = Query(default=30, ge=1, le=500)):
+    """Profilul de pornire: faze, importuri (STARTUP_PROFILE=1), componente leneșe"""
+    return {
+        "profile": startup_profile.report(top),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @app.get("/api/v1/test-minimal")
 async def test_minimal_diagnostic():
     """Test cu date minime"""
@@ -1279,6 +2561,9 @@ async def test_minimal_diagnostic():
     }
 
 
+startup_profile.mark("routes")
+
+
 # ============================================================================
 # CONFIGURARE ȘI PORNIRE SERVER
 # ============================================================================
@@ -1308,23 +2593,56 @@ def check_environment():
     print("=" * 60)
 
 
+def serve_http2(host: str, port: int, certfile: Optional[str], keyfile: Optional[str]) -> bool:
+    """
+    HTTP/2 cu hypercorn (uvicorn servește doar HTTP/1.1): h2 prin TLS/ALPN când
+    există certificat, altfel h2c (prior knowledge / upgrade). False dacă
+    hypercorn nu e instalat.
+    """
+    try:
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+    except ImportError:
+        logger.warning("⚠️ SERVER_MODE=http2 cere hypercorn (pip install hypercorn) - pornesc uvicorn (HTTP/1.1)")
+        return False
+    
+    config = Config()
+    config.bind = [f"{host}:{port}"]
+    config.alpn_protocols = ["h2", "http/1.1"]
+    config.certfile = certfile
+    config.keyfile = keyfile
+    config.accesslog = None
+    asyncio.run(serve(app, config))
+    return True
+
+
 if __name__ == "__main__":
     import uvicorn
     
     # Verifică configurarea
     check_environment()
     
+    host = os.getenv("SERVER_HOST", "0.0.0.0")
+    port = int(os.getenv("SERVER_PORT", "8000"))
+    certfile = os.getenv("SSL_CERTFILE") or None
+    keyfile = os.getenv("SSL_KEYFILE") or None
+    scheme = "https" if certfile else "http"
+    http2 = os.getenv("SERVER_MODE", "http1").lower() == "http2"
+    
     # Pornește serverul
     print("\n🚀 PORNIRE SERVER AUTO-DIAGNOSTIC OBD2")
-    print("📡 Server: http://0.0.0.0:8000")
-    print("🌐 Acces local: http://localhost:8000")
-    print("🔌 WebSocket: ws://localhost:8000/ws/obd2")
+    print(f"📡 Server: {scheme}://{host}:{port} ({'HTTP/2' if http2 else 'HTTP/1.1'})")
+    print(f"🌐 Acces local: {scheme}://localhost:{port}")
+    print(f"🔌 WebSocket: {'wss' if certfile else 'ws'}://localhost:{port}/ws/obd2")
     print("=" * 60)
     
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    if not (http2 and serve_http2(host, port, certfile, keyfile)):
+        uvicorn.run(
+            "main:app",
+            host=host,
+            port=port,
+            reload=True,
+            log_level="info",
+            ssl_certfile=certfile,
+            ssl_keyfile=keyfile
+        )
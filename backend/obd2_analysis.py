@@ -0,0 +1,148 @@
+"""
+🔍 ANALIZĂ DATE OBD2
+Regulile de analiză pentru date live și coduri DTC, fără dependențe de
+FastAPI, ca să poată rula și în procese worker (ingestie loguri).
+Primesc fie o mostră LiveSample (simulator, schemă fixă), fie un dicționar
+(cereri API, loguri parsate) cu valorile lipsă luate din obd2_sample.DEFAULTS.
+"""
+
+from typing import Any, Dict, List, Union
+
+from obd2_sample import DEFAULTS, LiveSample
+
+
+def analyze_obd2_data(obd2_data: Union[LiveSample, Dict[str, Any]], dtc_codes: List[str]) -> Dict[str, Any]:
+    """Analizează datele OBD2 pentru probleme"""
+    
+    problems = []
+    warnings = []
+    recommendations = []
+    
+    if type(obd2_data) is LiveSample:
+        # Schemă fixă: atribute citite direct, fără căutări cu valori implicite
+        engine_on = obd2_data.engine_on
+        rpm = obd2_data.rpm
+        speed = obd2_data.speed
+        coolant_temp = obd2_data.coolant_temp
+        fuel_pressure = obd2_data.fuel_pressure
+        o2_voltage = obd2_data.oxygen_sensor_voltage
+        battery_voltage = obd2_data.battery_voltage
+        fuel_level = obd2_data.fuel_level
+    elif not obd2_data or "error" in obd2_data:
+        return {
+            "obd2_connected": False,
+            "message": "Nu există date OBD2 disponibile"
+        }
+    else:
+        get = obd2_data.get
+        engine_on = get('engine_on', DEFAULTS['engine_on'])
+        rpm = get('rpm', DEFAULTS['rpm'])
+        speed = get('speed', DEFAULTS['speed'])
+        coolant_temp = get('coolant_temp', DEFAULTS['coolant_temp'])
+        fuel_pressure = get('fuel_pressure', DEFAULTS['fuel_pressure'])
+        o2_voltage = get('oxygen_sensor_voltage', DEFAULTS['oxygen_sensor_voltage'])
+        battery_voltage = get('battery_voltage', DEFAULTS['battery_voltage'])
+        fuel_level = get('fuel_level', DEFAULTS['fuel_level'])
+    
+    # Analiză RPM
+    if rpm == 0 and speed > 0:
+        problems.append("Motor oprit în mers (coasting)")
+    elif rpm > 4000 and speed < 20:
+        warnings.append("RPM prea mare la viteză mică - posibil ambreiaj")
+    elif rpm < 600 and engine_on:
+        warnings.append("Turație joasă la relanti - posibil mură motor")
+    
+    # Analiză temperatură
+    if coolant_temp > 105:
+        problems.append("Supraîncălzire motor - risc daune majore")
+        recommendations.append("Opriți motorul imediat și verificați lichid de răcire")
+    elif coolant_temp > 100:
+        warnings.append("Temperatură motor ridicată")
+    elif coolant_temp < 70 and engine_on:
+        warnings.append("Motorul nu ajunge la temperatură optimă de funcționare")
+    
+    # Analiză presiune combustibil
+    if fuel_pressure < 300:
+        problems.append("Presiune combustibil scăzută - posibil pompă defectă")
+    elif fuel_pressure > 500:
+        warnings.append("Presiune combustibil prea mare - risc daune injectoare")
+    
+    # Analiză senzor oxigen
+    if o2_voltage < 0.1 or o2_voltage > 0.9:
+        problems.append("Senzor oxigen defect - consum crescut")
+    
+    # Analiză tensiune baterie
+    if battery_voltage < 12.0:
+        problems.append("Baterie descărcată - risc defecțiune")
+    elif battery_voltage > 15.0:
+        warnings.append("Tensiune baterie prea mare - posibil regulator defect")
+    
+    # Analiză nivel combustibil
+    if fuel_level < 15:
+        warnings.append("Nivel combustibil foarte scăzut - risc pompă combustibil")
+    
+    # Analiză coduri DTC
+    dtc_analysis = []
+    dtc_severity = {"high": [], "medium": [], "low": []}
+    
+    for code in dtc_codes:
+        if code.startswith('P0'):
+            category = "Motor"
+            severity = "high"
+        elif code.startswith('P1'):
+            category = "Combustibil/Aer"
+            severity = "medium"
+        elif code.startswith('P2'):
+            category = "Injectoare"
+            severity = "high"
+        elif code.startswith('B'):
+            category = "Caroserie"
+            severity = "medium"
+        elif code.startswith('C'):
+            category = "Șasiu"
+            severity = "medium"
+        elif code.startswith('U'):
+            category = "Comunicare"
+            severity = "high"
+        else:
+            category = "Necunoscut"
+            severity = "low"
+        
+        dtc_analysis.append({
+            "code": code,
+            "category": category,
+            "severity": severity
+        })
+        
+        if severity == "high":
+            dtc_severity["high"].append(code)
+        elif severity == "medium":
+            dtc_severity["medium"].append(code)
+        else:
+            dtc_severity["low"].append(code)
+    
+    # Adaugă probleme bazate pe severitate coduri DTC
+    if dtc_severity["high"]:
+        problems.append(f"Coduri eroare critice: {', '.join(dtc_severity['high'][:3])}")
+    if dtc_severity["medium"]:
+        warnings.append(f"Coduri eroare medii: {', '.join(dtc_severity['medium'][:3])}")
+    
+    return {
+        "obd2_connected": True,
+        "live_data": {
+            "rpm": rpm,
+            "speed": speed,
+            "coolant_temp": coolant_temp,
+            "battery_voltage": battery_voltage,
+            "fuel_pressure": fuel_pressure
+        },
+        "problems": problems[:5],  # Maxim 5 probleme
+        "warnings": warnings[:5],  # Maxim 5 avertizări
+        "recommendations": recommendations[:3],  # Maxim 3 recomandări
+        "dtc_analysis": dtc_analysis,
+        "summary": {
+            "total_problems": len(problems),
+            "total_warnings": len(warnings),
+            "critical_issues": len(dtc_severity["high"]) > 0
+        }
+    }
@@ -0,0 +1,214 @@
+"""
+🗃️ CACHE OBD2 BAZAT PE SCHIMBĂRI
+Codurile DTC (mode 03, sute de ms pe un adaptor real) se citesc per sesiune
+doar la un interval lung sau când starea MIL din PID 0101 se schimbă; poll-urile
+răspund din memorie (cel mult max_sessions sesiuni, cele nefolosite de mult ies
+primele). Lista dispozitivelor Bluetooth e menținută în fundal (scanare
+periodică, intrări expirate după TTL) cât timp există cereri de scanare.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Callable, Dict, List, Tuple
+
+from obd2_protocol import decode_pid_response
+
+logger = logging.getLogger(__name__)
+
+
+class _DtcEntry:
+    __slots__ = ("data", "fetched_at", "mil_on", "mil_checked_at", "refreshes", "version", "lock")
+
+    def __init__(self):
+        self.data: Optional[Dict[str, Any]] = None
+        self.fetched_at = 0.0
+        self.mil_on: Optional[bool] = None
+        self.mil_checked_at = 0.0
+        self.refreshes = 0
+        # Crește doar când codurile citite diferă de cele anterioare (pentru ETag)
+        self.version = 0
+        self.lock = asyncio.Lock()
+
+
+class DtcCache:
+    """DTC per sesiune: recitite la refresh_interval sau la schimbarea MIL; LRU pe session_id"""
+
+    def __init__(self, refresh_interval: float = 60.0, mil_interval: float = 1.0, max_sessions: int = 1024):
+        self.refresh_interval = refresh_interval
+        self.mil_interval = mil_interval
+        self.max_sessions = max_sessions
+        # session_id vine de la client: fără limită, fiecare id nou ar rămâne în memorie
+        self._entries: "OrderedDict[str, _DtcEntry]" = OrderedDict()
+        self.hits = 0
+        self.evictions = 0
+        self.reads = 0
+        self.mil_checks = 0
+
+    @staticmethod
+    def parse_mil(response: Dict[str, Any]) -> Optional[bool]:
+        """Starea MIL dintr-un răspuns la comanda 0101; None dacă nu se poate decoda"""
+        decoded = decode_pid_response(str(response.get("response", ""))) if isinstance(response, dict) else None
+        if decoded and decoded[0] == "mil_on":
+            return decoded[1]
+        return None
+
+    async def get(
+        self,
+        session: str,
+        read_dtc: Callable[[], Dict[str, Any]],
+        read_mil: Callable[[], Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(date DTC, metadate cache); apelurile către adaptor rulează în thread"""
+        entry = self._entries.get(session)
+        if entry is None:
+            entry = self._entries[session] = _DtcEntry()
+            self._evict()
+        else:
+            self._entries.move_to_end(session)
+
+        async with entry.lock:
+            now = time.monotonic()
+            reason = None
+            if entry.data is None:
+                reason = "initial"
+            elif now - entry.fetched_at >= self.refresh_interval:
+                reason = "interval"
+            elif now - entry.mil_checked_at >= self.mil_interval:
+                # PID 0101 e o singură interogare scurtă, mult mai ieftină decât mode 03
+                self.mil_checks += 1
+                entry.mil_checked_at = now
+                mil_on = self.parse_mil(await asyncio.to_thread(read_mil))
+                if mil_on is not None and entry.mil_on is not None and mil_on != entry.mil_on:
+                    reason = "mil_changed"
+                    logger.info(f"🔧 MIL {'aprins' if mil_on else 'stins'} (sesiune {session}) - recitesc DTC")
+                if mil_on is not None:
+                    entry.mil_on = mil_on
+
+            if reason:
+                self.reads += 1
+                data = await asyncio.to_thread(read_dtc)
+                if not isinstance(data, dict) or "error" in data:
+                    # Erorile (adaptor deconectat) nu se păstrează în cache
+                    entry.data = None
+                    return data, {
+                        "cached": False, "refresh_reason": reason, "age_s": 0.0, "mil_on": None, "version": 0
+                    }
+                if entry.data is None or data.get("codes") != entry.data.get("codes"):
+                    entry.version += 1
+                entry.data = data
+                entry.refreshes += 1
+                entry.fetched_at = entry.mil_checked_at = time.monotonic()
+                if entry.mil_on is None:
+                    entry.mil_on = self.parse_mil(await asyncio.to_thread(read_mil))
+            else:
+                self.hits += 1
+
+            return entry.data, {
+                "cached": reason is None,
+                "refresh_reason": reason,
+                "age_s": round(time.monotonic() - entry.fetched_at, 3),
+                "mil_on": entry.mil_on,
+                "version": entry.version,
+                "next_refresh_s": round(max(0.0, self.refresh_interval - (time.monotonic() - entry.fetched_at)), 3),
+            }
+
+    def _evict(self):
+        """Scoate sesiunile nefolosite de mult peste max_sessions (cea nouă și cele cu o citire în curs rămân)"""
+        excess = len(self._entries) - self.max_sessions
+        for session in list(self._entries)[:-1]:
+            if excess <= 0:
+                break
+            if not self._entries[session].lock.locked():
+                del self._entries[session]
+                self.evictions += 1
+                excess -= 1
+
+    def invalidate(self, session: Optional[str] = None):
+        """După ștergerea codurilor sau schimbarea conexiunii"""
+        if session is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(session, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._entries),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "hits": self.hits,
+            "reads": self.reads,
+            "mil_checks": self.mil_checks,
+            "refresh_interval_s": self.refresh_interval,
+        }
+
+
+class DeviceScanner:
+    """Lista dispozitivelor descoperite, actualizată în fundal; o intrare expiră după ttl"""
+
+    def __init__(
+        self,
+        scan: Callable[[], List[Dict[str, Any]]],
+        interval: float = 15.0,
+        ttl: float = 60.0,
+        idle_stop: float = 120.0,
+    ):
+        self.scan = scan
+        self.interval = interval
+        self.ttl = ttl
+        self.idle_stop = idle_stop
+        # adresă -> (dispozitiv, văzut ultima dată)
+        self._devices: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.last_scan = 0.0
+        self.last_request = 0.0
+        self.scans = 0
+
+    async def refresh(self):
+        async with self._lock:
+            devices = await asyncio.to_thread(self.scan)
+            now = time.monotonic()
+            for device in devices:
+                self._devices[device["address"]] = (device, now)
+            self.last_scan = now
+            self.scans += 1
+
+    async def _run(self):
+        try:
+            # Scanarea continuă doar cât timp cineva folosește lista
+            while time.monotonic() - self.last_request < self.idle_stop:
+                await asyncio.sleep(self.interval)
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.warning(f"Scanare Bluetooth eșuată: {e}")
+        finally:
+            self._task = None
+
+    async def devices(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Dispozitivele nevăzute de mai mult de ttl secunde sunt eliminate"""
+        self.last_request = time.monotonic()
+        if force or not self.last_scan:
+            await self.refresh()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+        now = time.monotonic()
+        for address, (_, seen) in list(self._devices.items()):
+            if now - seen > self.ttl:
+                del self._devices[address]
+        return [
+            {**device, "last_seen_s": round(now - seen, 1)}
+            for device, seen in self._devices.values()
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "devices": len(self._devices),
+            "scans": self.scans,
+            "background": self._task is not None,
+            "last_scan_age_s": round(time.monotonic() - self.last_scan, 1) if self.last_scan else None,
+            "ttl_s": self.ttl,
+        }
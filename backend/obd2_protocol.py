@@ -0,0 +1,333 @@
+"""
+📦 PROTOCOL OBD2: FRAME-URI BINARE /ws/obd2 + DECODARE ELM327
+Subprotocol WebSocket opțional: schema PID se negociază o singură dată,
+apoi fiecare mostră live se trimite ca frame binar cu layout fix.
+Include și decodarea răspunsurilor ELM327 (mode 01 / mode 03).
+"""
+
+import struct
+import zlib
+from datetime import datetime
+from operator import attrgetter
+from typing import Optional, Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from obd2_sample import LiveSample
+
+# Subprotocoale acceptate (Sec-WebSocket-Protocol)
+SUBPROTOCOL_BINARY = "obd2-bin.v1"
+SUBPROTOCOL_BINARY_DEFLATE = "obd2-bin-deflate.v1"
+SUPPORTED_SUBPROTOCOLS = (SUBPROTOCOL_BINARY_DEFLATE, SUBPROTOCOL_BINARY)
+
+PROTOCOL_VERSION = 1
+
+# Tipuri de frame
+FRAME_LIVE_DATA = 0x01
+
+# Flag-uri header
+FLAG_ABSOLUTE_TS = 0x01  # timestamp absolut (ms epoch) în loc de delta
+FLAG_DEFLATE = 0x02      # corpul frame-ului este comprimat (deflate raw)
+
+# Header: tip frame, flag-uri, număr de secvență
+HEADER = struct.Struct("<BBH")
+ABSOLUTE_TS = struct.Struct("<q")
+DELTA_TS = struct.Struct("<H")
+
+# Schema PID: (câmp, format struct, factor de scalare)
+# Valorile zecimale se transmit ca întregi scalați (ex: 13.8V -> 1380)
+LIVE_DATA_SCHEMA: List[Tuple[str, str, int]] = [
+    ("engine_on", "B", 1),
+    ("rpm", "H", 1),
+    ("speed", "H", 1),
+    ("coolant_temp", "h", 1),
+    ("throttle_position", "B", 1),
+    ("maf", "H", 10),
+    ("engine_load", "B", 1),
+    ("fuel_pressure", "H", 1),
+    ("intake_temp", "h", 1),
+    ("timing_advance", "h", 10),
+    ("oxygen_sensor_voltage", "H", 1000),
+    ("battery_voltage", "H", 100),
+    ("fuel_level", "H", 10),
+    ("ambient_temp", "h", 1),
+    ("barometric_pressure", "H", 10),
+]
+
+# Limitele fiecărui format struct (pentru saturare în loc de struct.error)
+_FORMAT_LIMITS = {
+    "B": (0, 0xFF),
+    "b": (-0x80, 0x7F),
+    "H": (0, 0xFFFF),
+    "h": (-0x8000, 0x7FFF),
+    "I": (0, 0xFFFFFFFF),
+    "i": (-0x80000000, 0x7FFFFFFF),
+}
+
+
+def negotiate_subprotocol(requested: List[str]) -> Optional[str]:
+    """Alege subprotocolul binar cerut de client (None = JSON implicit)"""
+    for subprotocol in SUPPORTED_SUBPROTOCOLS:
+        if subprotocol in (requested or []):
+            return subprotocol
+    return None
+
+
+def _timestamp_ms(value: Any) -> int:
+    """Convertește timestamp-ul mostrei în milisecunde epoch"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(datetime.fromisoformat(value).timestamp() * 1000)
+        except ValueError:
+            pass
+    return int(datetime.now().timestamp() * 1000)
+
+
+class LiveFrameEncoder:
+    """Encoder per conexiune pentru frame-uri live binare"""
+
+    def __init__(self, deflate: bool = False, schema: List[Tuple[str, str, int]] = None):
+        self.schema = schema or LIVE_DATA_SCHEMA
+        self.payload = struct.Struct("<" + "".join(fmt for _, fmt, _ in self.schema))
+        self._limits = [_FORMAT_LIMITS[fmt] for _, fmt, _ in self.schema]
+        # Câmpurile schemei citite dintr-o mostră LiveSample cu un singur apel (în C)
+        self._fields = attrgetter(*(name for name, _, _ in self.schema))
+        self._scales = [(scale, low, high) for (_, _, scale), (low, high) in zip(self.schema, self._limits)]
+        self.deflate = deflate
+        self.sequence = 0
+        self.last_timestamp_ms: Optional[int] = None
+        # Context deflate păstrat între mesaje (ca permessage-deflate cu context takeover)
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, -15) if deflate else None
+
+    def schema_message(self) -> Dict[str, Any]:
+        """Mesajul JSON trimis o singură dată după negociere"""
+        return {
+            "type": "schema",
+            "version": PROTOCOL_VERSION,
+            "encoding": SUBPROTOCOL_BINARY_DEFLATE if self.deflate else SUBPROTOCOL_BINARY,
+            "header": HEADER.format,
+            "timestamp": {"absolute": ABSOLUTE_TS.format, "delta": DELTA_TS.format, "unit": "ms"},
+            "payload": self.payload.format,
+            "fields": [
+                {"name": name, "format": fmt, "scale": scale}
+                for name, fmt, scale in self.schema
+            ],
+            "frame_types": {"live_data": FRAME_LIVE_DATA},
+            "flags": {"absolute_ts": FLAG_ABSOLUTE_TS, "deflate": FLAG_DEFLATE},
+        }
+
+    def pack_values(self, sample: Union[LiveSample, Dict[str, Any]]) -> List[int]:
+        """Valorile schemei scalate și saturate la limitele formatului"""
+        if type(sample) is LiveSample:
+            raw_values = self._fields(sample)
+        else:
+            raw_values = [sample.get(name) for name, _, _ in self.schema]
+        values = []
+        for raw, (scale, low, high) in zip(raw_values, self._scales):
+            scaled = int(round(float(raw or 0) * scale))
+            values.append(min(high, max(low, scaled)))
+        return values
+
+    def encode(self, sample: Union[LiveSample, Dict[str, Any]]) -> bytes:
+        """Împachetează o mostră live într-un frame binar"""
+        live = type(sample) is LiveSample
+        values = self.pack_values(sample)
+
+        flags = 0
+        if live and sample.timestamp is not None:
+            timestamp_ms = sample.timestamp_ms()
+        else:
+            timestamp_ms = _timestamp_ms(sample.get("timestamp"))
+        delta = None
+        if self.last_timestamp_ms is not None:
+            delta = timestamp_ms - self.last_timestamp_ms
+        if delta is None or not 0 <= delta <= 0xFFFF:
+            flags |= FLAG_ABSOLUTE_TS
+            body = ABSOLUTE_TS.pack(timestamp_ms)
+        else:
+            body = DELTA_TS.pack(delta)
+        self.last_timestamp_ms = timestamp_ms
+
+        body += self.payload.pack(*values)
+        if self._compressor is not None:
+            flags |= FLAG_DEFLATE
+            body = self._compressor.compress(body) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            body = body[:-4]  # elimină marcajul 00 00 FF FF (RFC 7692)
+
+        header = HEADER.pack(FRAME_LIVE_DATA, flags, self.sequence)
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        return header + body
+
+
+class LiveFrameDecoder:
+    """Decoder de referință (clienți, teste de integrare, benchmark)"""
+
+    def __init__(self, schema_message: Dict[str, Any] = None):
+        if schema_message:
+            self.schema = [(f["name"], f["format"], f["scale"]) for f in schema_message["fields"]]
+        else:
+            self.schema = LIVE_DATA_SCHEMA
+        self.payload = struct.Struct("<" + "".join(fmt for _, fmt, _ in self.schema))
+        self.last_timestamp_ms: Optional[int] = None
+        self._decompressor = zlib.decompressobj(-15)
+
+    def decode(self, frame: bytes) -> Dict[str, Any]:
+        """Reconstruiește mostra live (dict) dintr-un frame binar"""
+        frame_type, flags, sequence = HEADER.unpack_from(frame)
+        if frame_type != FRAME_LIVE_DATA:
+            raise ValueError(f"Tip frame necunoscut: {frame_type}")
+
+        body = frame[HEADER.size:]
+        if flags & FLAG_DEFLATE:
+            body = self._decompressor.decompress(body + b"\x00\x00\xff\xff")
+
+        if flags & FLAG_ABSOLUTE_TS:
+            (timestamp_ms,) = ABSOLUTE_TS.unpack_from(body)
+            offset = ABSOLUTE_TS.size
+        else:
+            if self.last_timestamp_ms is None:
+                raise ValueError("Frame delta primit înaintea unui timestamp absolut")
+            (delta,) = DELTA_TS.unpack_from(body)
+            timestamp_ms = self.last_timestamp_ms + delta
+            offset = DELTA_TS.size
+        self.last_timestamp_ms = timestamp_ms
+
+        values = self.payload.unpack_from(body, offset)
+        sample: Dict[str, Any] = {}
+        for (name, _, scale), value in zip(self.schema, values):
+            sample[name] = value / scale if scale != 1 else value
+        sample["engine_on"] = bool(sample.get("engine_on"))
+        sample["timestamp"] = datetime.fromtimestamp(timestamp_ms / 1000).isoformat()
+        sample["sequence"] = sequence
+        return sample
+
+
+# ============================================================================
+# LOTURI BINARE (ÎNCĂRCĂRI ÎN MASĂ DE LA GATEWAY-URI)
+# ============================================================================
+
+# Antet: magic, versiune, rezervat, lungimea unei înregistrări (validează schema)
+BATCH_MAGIC = b"OBDB"
+BATCH_VERSION = 1
+BATCH_HEADER = struct.Struct("<4sBBH")
+# Înregistrare de lungime fixă: timestamp absolut (ms epoch) + payload-ul frame-ului live
+BATCH_RECORD = struct.Struct("<q" + "".join(fmt for _, fmt, _ in LIVE_DATA_SCHEMA))
+BATCH_CONTENT_TYPE = "application/vnd.obd2-batch"
+
+# Câmpurile LIVE_DATA_SCHEMA sunt exact câmpurile LiveSample (fără timestamp), în aceeași ordine
+_BATCH_SCALES = [scale for _, _, scale in LIVE_DATA_SCHEMA]
+
+
+def batch_header() -> bytes:
+    return BATCH_HEADER.pack(BATCH_MAGIC, BATCH_VERSION, 0, BATCH_RECORD.size)
+
+
+def check_batch_header(header: bytes):
+    """ValueError dacă antetul nu descrie formatul de înregistrare al acestui server"""
+    if len(header) != BATCH_HEADER.size:
+        raise ValueError("Antet lot binar incomplet")
+    magic, version, _, record_size = BATCH_HEADER.unpack(header)
+    if magic != BATCH_MAGIC or version != BATCH_VERSION:
+        raise ValueError("Antet lot binar necunoscut")
+    if record_size != BATCH_RECORD.size:
+        raise ValueError(f"Înregistrări de {record_size} octeți, așteptat {BATCH_RECORD.size}")
+
+
+def encode_batch(samples: Iterable[Union[LiveSample, Dict[str, Any]]]) -> bytes:
+    """Lot binar complet (antet + înregistrări), cum îl trimite un gateway"""
+    encoder = LiveFrameEncoder()
+    pack = BATCH_RECORD.pack
+    records = []
+    for sample in samples:
+        if type(sample) is LiveSample and sample.timestamp is not None:
+            timestamp_ms = sample.timestamp_ms()
+        else:
+            timestamp_ms = _timestamp_ms(sample.get("timestamp"))
+        records.append(pack(timestamp_ms, *encoder.pack_values(sample)))
+    return batch_header() + b"".join(records)
+
+
+def decode_batch_records(data: bytes) -> Iterator[LiveSample]:
+    """Mostrele din înregistrări complete (fără antet); despachetarea rulează în C"""
+    if len(data) % BATCH_RECORD.size:
+        raise ValueError(f"Lot binar trunchiat ({len(data) % BATCH_RECORD.size} octeți în plus)")
+    scales = _BATCH_SCALES
+    for record in BATCH_RECORD.iter_unpack(data):
+        values = [value / scale if scale != 1 else value for value, scale in zip(record[1:], scales)]
+        values[0] = values[0] != 0
+        yield LiveSample(*values, record[0] / 1000)
+
+
+# ============================================================================
+# DECODARE RĂSPUNSURI ELM327 (MODE 01 / MODE 03)
+# ============================================================================
+
+# PID mode 01 -> (câmp, număr octeți, formulă SAE J1979)
+PID_DECODERS = {
+    "04": ("engine_load", 1, lambda a, b: round(a * 100 / 255, 1)),
+    "05": ("coolant_temp", 1, lambda a, b: a - 40),
+    "0A": ("fuel_pressure", 1, lambda a, b: a * 3),
+    "0C": ("rpm", 2, lambda a, b: (256 * a + b) // 4),
+    "0D": ("speed", 1, lambda a, b: a),
+    "0E": ("timing_advance", 1, lambda a, b: a / 2 - 64),
+    "0F": ("intake_temp", 1, lambda a, b: a - 40),
+    "10": ("maf", 2, lambda a, b: round((256 * a + b) / 100, 2)),
+    "11": ("throttle_position", 1, lambda a, b: round(a * 100 / 255, 1)),
+    "14": ("oxygen_sensor_voltage", 1, lambda a, b: round(a / 200, 3)),
+    "2F": ("fuel_level", 1, lambda a, b: round(a * 100 / 255, 1)),
+    "33": ("barometric_pressure", 1, lambda a, b: a),
+    "42": ("battery_voltage", 2, lambda a, b: round((256 * a + b) / 1000, 2)),
+    "46": ("ambient_temp", 1, lambda a, b: a - 40),
+}
+
+_DTC_PREFIX = "PCBU"
+
+
+def _hex_bytes(response: str) -> List[int]:
+    """Transformă '41 0C 1A F8' sau '410C1AF8' în listă de octeți"""
+    cleaned = "".join(response.split()).upper()
+    if len(cleaned) % 2 or any(c not in "0123456789ABCDEF" for c in cleaned):
+        return []
+    return [int(cleaned[i:i + 2], 16) for i in range(0, len(cleaned), 2)]
+
+
+def decode_pid_response(response: str) -> Optional[Tuple[str, Any]]:
+    """Decodează un răspuns mode 01 în (câmp, valoare); None dacă nu e cunoscut"""
+    data = _hex_bytes(response)
+    if len(data) < 3 or data[0] != 0x41:
+        return None
+
+    pid = f"{data[1]:02X}"
+    if pid == "01":
+        # Monitor status: bitul 7 din A = MIL (lampa check engine)
+        return ("mil_on", bool(data[2] & 0x80))
+
+    decoder = PID_DECODERS.get(pid)
+    if not decoder:
+        return None
+    name, size, formula = decoder
+    if len(data) < 2 + size:
+        return None
+    a = data[2]
+    b = data[3] if size > 1 else 0
+    return (name, formula(a, b))
+
+
+def decode_dtc_response(response: str) -> List[str]:
+    """Decodează un răspuns mode 03 ('43 ...') în coduri DTC (ex: P0300)"""
+    data = _hex_bytes(response)
+    if not data or data[0] != 0x43:
+        return []
+
+    payload = data[1:]
+    if len(payload) % 2:
+        # ISO 15765 (CAN): primul octet este numărul de coduri
+        payload = payload[1:]
+
+    codes = []
+    for i in range(0, len(payload) - 1, 2):
+        a, b = payload[i], payload[i + 1]
+        if a == 0 and b == 0:
+            continue
+        codes.append(f"{_DTC_PREFIX[a >> 6]}{(a >> 4) & 0x03}{a & 0x0F:X}{b:02X}")
+    return codes
@@ -0,0 +1,130 @@
+"""
+📦 MOSTRĂ LIVE OBD2 CU SCHEMĂ FIXĂ
+O mostră e un obiect cu __slots__ (fără dicționar per instanță) și timestamp
+numeric (secunde epoch), folosit de la simulator prin analiză, sumare de drum
+și encodarea binară /ws/obd2. Conversia în dicționar (cu timestamp ISO) se
+face doar la granița API-ului, prin to_dict().
+"""
+
+from datetime import datetime
+from typing import Optional, Any, Dict, Tuple
+
+# Ordinea semnalelor e și ordinea câmpurilor (după engine_on, înainte de timestamp)
+SIGNALS = [
+    "rpm", "speed", "coolant_temp", "throttle_position", "maf", "engine_load",
+    "fuel_pressure", "intake_temp", "timing_advance", "oxygen_sensor_voltage",
+    "battery_voltage", "fuel_level", "ambient_temp", "barometric_pressure",
+]
+
+FIELDS: Tuple[str, ...] = ("engine_on", *SIGNALS, "timestamp")
+
+# Valorile presupuse de analyze_obd2_data când un semnal lipsește din dicționar
+DEFAULTS: Dict[str, Any] = {
+    "engine_on": True,
+    "rpm": 0,
+    "speed": 0,
+    "coolant_temp": 90,
+    "throttle_position": 0,
+    "maf": 0.0,
+    "engine_load": 0,
+    "fuel_pressure": 400,
+    "intake_temp": 0,
+    "timing_advance": 0,
+    "oxygen_sensor_voltage": 0.5,
+    "battery_voltage": 13.5,
+    "fuel_level": 50,
+    "ambient_temp": 0,
+    "barometric_pressure": 0,
+}
+
+
+def to_epoch(value: Any) -> Optional[float]:
+    """Timestamp ISO sau numeric (secunde ori milisecunde epoch) -> secunde epoch"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        # Peste ~5138 d.Hr. în secunde: valoarea e în milisecunde
+        return value / 1000 if value > 1e11 else value
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
+class LiveSample:
+    """O mostră live: 14 semnale + engine_on + timestamp (secunde epoch)"""
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        engine_on: bool = True,
+        rpm: int = 0,
+        speed: int = 0,
+        coolant_temp: int = 90,
+        throttle_position: int = 0,
+        maf: float = 0.0,
+        engine_load: int = 0,
+        fuel_pressure: int = 400,
+        intake_temp: int = 0,
+        timing_advance: int = 0,
+        oxygen_sensor_voltage: float = 0.5,
+        battery_voltage: float = 13.5,
+        fuel_level: int = 50,
+        ambient_temp: int = 0,
+        barometric_pressure: int = 0,
+        timestamp: Optional[float] = None,
+    ):
+        self.engine_on = engine_on
+        self.rpm = rpm
+        self.speed = speed
+        self.coolant_temp = coolant_temp
+        self.throttle_position = throttle_position
+        self.maf = maf
+        self.engine_load = engine_load
+        self.fuel_pressure = fuel_pressure
+        self.intake_temp = intake_temp
+        self.timing_advance = timing_advance
+        self.oxygen_sensor_voltage = oxygen_sensor_voltage
+        self.battery_voltage = battery_voltage
+        self.fuel_level = fuel_level
+        self.ambient_temp = ambient_temp
+        self.barometric_pressure = barometric_pressure
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LiveSample":
+        """Din formatul vechi (dicționar, timestamp ISO); semnalele lipsă primesc DEFAULTS"""
+        values = {name: data.get(name, default) for name, default in DEFAULTS.items()}
+        return cls(**values, timestamp=to_epoch(data.get("timestamp")))
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Acces ca la dicționar (pentru codul care primește și mostre parsate din loguri)"""
+        return getattr(self, name, default)
+
+    def timestamp_ms(self) -> Optional[int]:
+        return None if self.timestamp is None else int(self.timestamp * 1000)
+
+    def values(self) -> Tuple[Any, ...]:
+        """Valorile în ordinea FIELDS (pentru stocare pe coloane)"""
+        return tuple(getattr(self, name) for name in FIELDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Formatul API (același ca înainte de schema fixă): timestamp ISO"""
+        data = {name: getattr(self, name) for name in FIELDS}
+        timestamp = self.timestamp
+        data["timestamp"] = (
+            datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
+        ).isoformat()
+        return data
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, LiveSample) and self.values() == other.values()
+
+    def __repr__(self) -> str:
+        return f"LiveSample(rpm={self.rpm}, speed={self.speed}, coolant_temp={self.coolant_temp}, timestamp={self.timestamp})"
+
+
+def to_api(sample: Any) -> Any:
+    """Mostră -> dicționar la granița API-ului (erorile sunt deja dicționare)"""
+    return sample.to_dict() if isinstance(sample, LiveSample) else sample
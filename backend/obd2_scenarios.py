@@ -0,0 +1,248 @@
+"""
+🎬 SCENARII OBD2 PRE-GENERATE PENTRU SIMULATOR
+Cicluri de drum (idle, oraș, autostradă, supraîncălzire, baterie defectă)
+generate procedural o singură dată, cu RNG determinist, în array-uri compacte.
+Mii de vehicule simulate partajează aceleași array-uri și diferă doar prin
+scenariu și offset, deci o mostră costă doar câteva citiri de index.
+"""
+
+import math
+import random
+import threading
+import time
+from array import array
+from typing import Optional, Dict, Iterator, List, Tuple
+
+from obd2_sample import SIGNALS, LiveSample
+
+DEFAULT_HZ = 10.0
+DEFAULT_DURATION_S = 600.0
+DEFAULT_SEED = 42
+
+# Semnale raportate ca întregi (ca în simulatorul inițial)
+INT_SIGNALS = {
+    "rpm", "speed", "coolant_temp", "throttle_position", "engine_load",
+    "fuel_pressure", "intake_temp", "timing_advance", "fuel_level",
+    "ambient_temp", "barometric_pressure",
+}
+
+# Profil per scenariu: viteza țintă (segmente), temperatură, tensiune baterie
+SCENARIOS = {
+    "idle": {"speed_targets": [0], "coolant_end": 90, "battery_end": 14.1},
+    "city": {"speed_targets": [0, 30, 50, 0, 40, 20, 0, 50], "coolant_end": 92, "battery_end": 14.0},
+    "highway": {"speed_targets": [90, 110, 125, 100, 115], "coolant_end": 94, "battery_end": 14.2},
+    "overheating": {"speed_targets": [0, 40, 60, 20, 0, 30], "coolant_end": 118, "battery_end": 13.9},
+    "battery_failure": {"speed_targets": [0, 40, 50, 0, 30], "coolant_end": 91, "battery_end": 11.3},
+}
+
+
+class DriveCycle:
+    """Un ciclu de drum: câte un array per semnal, cu lungime fixă"""
+
+    def __init__(self, name: str, hz: float, signals: Dict[str, array], engine_on: array):
+        self.name = name
+        self.hz = hz
+        self.engine_on = engine_on
+        self.length = len(engine_on)
+        # Rotunjirea se face o singură dată aici, nu la fiecare mostră redată
+        self.signals: Dict[str, array] = {
+            name: (
+                array("i", (int(round(v)) for v in signals[name]))
+                if name in INT_SIGNALS
+                else array("d", (round(v, 2) for v in signals[name]))
+            )
+            for name in SIGNALS
+        }
+        # În ordinea câmpurilor LiveSample, pentru construcția pozițională
+        self._columns: List[array] = [self.signals[name] for name in SIGNALS]
+
+    def sample(self, index: int, timestamp: Optional[float] = None) -> LiveSample:
+        """Mostra de la poziția index (circular); timestamp în secunde epoch"""
+        index %= self.length
+        return LiveSample(
+            bool(self.engine_on[index]),
+            *[values[index] for values in self._columns],
+            timestamp if timestamp is not None else time.time(),
+        )
+
+
+def _smooth_walk(rng: random.Random, targets: List[float], length: int, noise: float, alpha: float) -> List[float]:
+    """Urmărește ținte pe segmente egale, cu inerție și zgomot gaussian"""
+    values = []
+    current = targets[0]
+    segment = max(1, length // len(targets))
+    for i in range(length):
+        target = targets[min(i // segment, len(targets) - 1)]
+        current = current * alpha + target * (1 - alpha) + rng.gauss(0, noise)
+        values.append(current)
+    return values
+
+
+def _ramp(start: float, end: float, length: int, warmup_fraction: float) -> List[float]:
+    """Rampă liniară pe primele warmup_fraction din ciclu, apoi constantă"""
+    warmup = max(1, int(length * warmup_fraction))
+    return [start + (end - start) * min(1.0, i / warmup) for i in range(length)]
+
+
+def generate_cycle(
+    scenario: str,
+    hz: float = DEFAULT_HZ,
+    duration_s: float = DEFAULT_DURATION_S,
+    seed: int = DEFAULT_SEED,
+) -> DriveCycle:
+    """Generează procedural un ciclu de drum (determinist pentru același seed)"""
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Scenariu necunoscut: {scenario}")
+
+    profile = SCENARIOS[scenario]
+    rng = random.Random(f"{scenario}:{seed}")
+    length = max(1, int(duration_s * hz))
+    # Inerția se raportează la secunde, nu la numărul de mostre
+    alpha = math.exp(-1.0 / (hz * 4.0))
+
+    speed = [max(0.0, v) for v in _smooth_walk(rng, profile["speed_targets"], length, 0.4, alpha)]
+    coolant = [
+        v + rng.gauss(0, 0.3)
+        for v in _ramp(rng.uniform(35, 50), profile["coolant_end"], length, 0.6 if scenario == "overheating" else 0.25)
+    ]
+    battery = [
+        v + rng.gauss(0, 0.05)
+        for v in _ramp(14.1 if profile["battery_end"] > 13 else 12.6, profile["battery_end"], length, 0.8)
+    ]
+    ambient = rng.uniform(5, 30)
+    baro = rng.uniform(97, 103)
+    fuel_start = rng.uniform(40, 100)
+
+    signals = {name: array("f") for name in SIGNALS}
+    engine_on = array("b")
+    for i in range(length):
+        v = speed[i]
+        # Treaptă de viteză aproximativă -> turație
+        gear_ratio = 45 if v < 20 else 32 if v < 50 else 24 if v < 80 else 21
+        rpm = max(750.0, v * gear_ratio) + rng.gauss(0, 25)
+        throttle = min(95.0, max(0.0, 3 + v * 0.25 + (speed[i] - speed[i - 1]) * hz * 6 + rng.gauss(0, 1.5)))
+        load = min(99.0, 18 + throttle * 0.7 + rng.gauss(0, 2))
+        phase = 2 * math.pi * i / max(1.0, hz) * 1.5
+
+        signals["rpm"].append(rpm)
+        signals["speed"].append(v)
+        signals["coolant_temp"].append(coolant[i])
+        signals["throttle_position"].append(throttle)
+        signals["maf"].append(max(1.5, rpm * load / 9000) + rng.gauss(0, 0.2))
+        signals["engine_load"].append(load)
+        signals["fuel_pressure"].append(400 + rng.gauss(0, 8))
+        signals["intake_temp"].append(ambient + 8 + coolant[i] * 0.1)
+        signals["timing_advance"].append(10 + min(15.0, v / 10) + rng.gauss(0, 1))
+        signals["oxygen_sensor_voltage"].append(0.5 + 0.35 * math.sin(phase) + rng.gauss(0, 0.02))
+        signals["battery_voltage"].append(battery[i])
+        signals["fuel_level"].append(max(5.0, fuel_start - 10 * i / length))
+        signals["ambient_temp"].append(ambient)
+        signals["barometric_pressure"].append(baro)
+        engine_on.append(1)
+
+    return DriveCycle(scenario, hz, signals, engine_on)
+
+
+def load_recorded_cycle(path: str, name: Optional[str] = None, hz: float = DEFAULT_HZ) -> DriveCycle:
+    """Încarcă un drum înregistrat (CSV/ELM327, ca la ingestie) pentru playback"""
+    from log_ingest import detect_format, iter_csv_samples, iter_elm327_samples, iter_lines
+
+    parser = iter_csv_samples if detect_format(path) == "csv" else iter_elm327_samples
+    signals = {signal: array("f") for signal in SIGNALS}
+    engine_on = array("b")
+    last: Dict[str, float] = {}
+    for sample in parser(iter_lines(path)):
+        for signal in SIGNALS:
+            value = sample.get(signal, last.get(signal, 0.0))
+            last[signal] = value
+            signals[signal].append(value)
+        engine_on.append(1 if sample.get("engine_on", True) else 0)
+
+    if not engine_on:
+        raise ValueError(f"Logul nu conține mostre: {path}")
+    return DriveCycle(name or path, hz, signals, engine_on)
+
+
+_cycle_cache: Dict[Tuple[str, float, float, int], DriveCycle] = {}
+_cache_lock = threading.Lock()
+
+
+def get_cycle(
+    scenario: str,
+    hz: float = DEFAULT_HZ,
+    duration_s: float = DEFAULT_DURATION_S,
+    seed: int = DEFAULT_SEED,
+) -> DriveCycle:
+    """Ciclul pre-generat (din cache) pentru scenariu/frecvență/seed"""
+    key = (scenario, hz, duration_s, seed)
+    cycle = _cycle_cache.get(key)
+    if cycle is None:
+        with _cache_lock:
+            cycle = _cycle_cache.get(key)
+            if cycle is None:
+                cycle = generate_cycle(scenario, hz, duration_s, seed)
+                _cycle_cache[key] = cycle
+    return cycle
+
+
+def prewarm(scenarios: List[str] = None, hz: float = DEFAULT_HZ, seed: int = DEFAULT_SEED):
+    """Generează din timp ciclurile, ca primele cereri să nu plătească costul"""
+    for scenario in scenarios or list(SCENARIOS):
+        get_cycle(scenario, hz, seed=seed)
+
+
+class ScenarioPlayer:
+    """Redă un ciclu pentru un vehicul: în timp real sau pas cu pas (determinist)"""
+
+    def __init__(self, cycle: DriveCycle, offset: int = 0):
+        self.cycle = cycle
+        self.offset = offset
+        self.tick = 0
+        self.started_at = time.monotonic()
+
+    def current_index(self) -> int:
+        """Indexul (necircular) al mostrei curente: crește la fiecare mostră nouă"""
+        return self.offset + int((time.monotonic() - self.started_at) * self.cycle.hz)
+
+    def next_sample_in(self) -> float:
+        """Secunde până la următoarea mostră"""
+        elapsed = (time.monotonic() - self.started_at) * self.cycle.hz
+        return (int(elapsed) + 1 - elapsed) / self.cycle.hz
+
+    def live_sample(self) -> LiveSample:
+        """Mostra corespunzătoare timpului real scurs de la pornire"""
+        return self.cycle.sample(self.current_index())
+
+    def next_sample(self, timestamp: Optional[float] = None) -> LiveSample:
+        """Mostra următoare (reproductibilă, independentă de ceas)"""
+        sample = self.cycle.sample(self.offset + self.tick, timestamp)
+        self.tick += 1
+        return sample
+
+
+class SimulatedFleet:
+    """Flotă de vehicule simulate pentru teste de încărcare"""
+
+    def __init__(
+        self,
+        size: int,
+        scenarios: List[str] = None,
+        hz: float = DEFAULT_HZ,
+        seed: int = DEFAULT_SEED,
+    ):
+        rng = random.Random(seed)
+        names = scenarios or list(SCENARIOS)
+        cycles = [get_cycle(name, hz, seed=seed) for name in names]
+        self.players = [
+            ScenarioPlayer(cycles[i % len(cycles)], offset=rng.randrange(cycles[i % len(cycles)].length))
+            for i in range(size)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def step(self) -> Iterator[Tuple[int, LiveSample]]:
+        """Un tick pentru toată flota: (index vehicul, mostră)"""
+        timestamp = time.time()
+        for vehicle, player in enumerate(self.players):
+            yield vehicle, player.next_sample(timestamp)
@@ -0,0 +1,235 @@
+"""
+💰 MOTOR DE PREȚURI PE BAZĂ DE TABEL
+Tabelul (pricing_table.json: categorii de mărci, modele, DTC, regiuni, trepte de
+vârstă/kilometraj) este compilat la pornire în dicționare și liste sortate;
+multiplicatorii de vârstă/kilometraj se găsesc prin căutare binară. Fișierul
+este reîncărcat automat la modificare (verificare mtime cel mult o dată la N
+secunde), iar prețurile pentru o flotă întreagă se calculează în lot.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional, Any, Dict, Iterable, List, Tuple
+
+from vehicle_names import normalize_car_data
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pricing_table.json")
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+class _Brackets:
+    """Trepte (prag, multiplicator, descriere): valoarea > prag[i-1] și <= prag[i] -> treapta i"""
+
+    __slots__ = ("thresholds", "multipliers", "issues")
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.thresholds = [float(t) for t in spec["thresholds"]]
+        self.multipliers = [float(m) for m in spec["multipliers"]]
+        self.issues = list(spec.get("issues") or [""] * len(self.multipliers))
+        if self.thresholds != sorted(self.thresholds) or len(self.multipliers) != len(self.thresholds) + 1:
+            raise ValueError("Trepte invalide: pragurile trebuie sortate, cu un multiplicator în plus")
+
+    def lookup(self, value: float) -> Tuple[float, str]:
+        i = bisect_left(self.thresholds, value)
+        return self.multipliers[i], self.issues[i]
+
+
+class PricingTable:
+    """Tabelul compilat (imutabil; o reîncărcare construiește unul nou)"""
+
+    def __init__(self, data: Dict[str, Any], source: str = ""):
+        self.source = source
+        self.version = data.get("version", 1)
+        self.currency = data.get("currency", "RON")
+        self.base_price = float(data["base_price"])
+        self.reference_year = int(data.get("reference_year") or time.localtime().tm_year)
+        self.round_to = float(data.get("round_to", 50))
+
+        categories = data["categories"]
+        self.default_category = data.get("default_category", "standard")
+        # categorie -> (multiplicator, sistem principal)
+        self.categories: Dict[str, Tuple[float, str]] = {
+            name: (float(spec["multiplier"]), spec.get("system", "Sistem general"))
+            for name, spec in categories.items()
+        }
+        if self.default_category not in self.categories:
+            raise ValueError(f"Categoria implicită lipsește: {self.default_category}")
+        self.brands: Dict[str, str] = {}
+        for brand, category in data.get("brands", {}).items():
+            if category not in self.categories:
+                raise ValueError(f"Marca {brand} are o categorie necunoscută: {category}")
+            self.brands[brand.lower()] = category
+        self.models: Dict[str, float] = {key.lower(): float(m) for key, m in data.get("models", {}).items()}
+
+        self.age = _Brackets(data["age_brackets"])
+        self.mileage = _Brackets(data["mileage_brackets"])
+
+        self.symptom_cost = float(data.get("symptom_cost", 0))
+        self.dtc_default_cost = float(data.get("dtc_default_cost", 0))
+        # Cod exact sau prefix (ex. "P03" = toate rateurile)
+        self.dtc_costs: Dict[str, float] = {code.upper(): float(c) for code, c in data.get("dtc_costs", {}).items()}
+        self._dtc_prefix_lengths = sorted({len(code) for code in self.dtc_costs}, reverse=True)
+        self.obd2_problem_cost = float(data.get("obd2_problem_cost", 0))
+        self.obd2_warning_cost = float(data.get("obd2_warning_cost", 0))
+
+        self.regions: Dict[str, float] = {name.lower(): float(m) for name, m in data.get("regions", {}).items()}
+        self.default_region = str(data.get("default_region", "default")).lower()
+
+    def brand_of(self, car_type: str) -> Optional[str]:
+        """Prima marcă/categorie din tabel găsită în car_type (ex. „electric”)"""
+        text = str(car_type or "").lower().strip()
+        if text in self.brands:
+            return text
+        for token in _TOKEN_SPLIT.split(text):
+            if token in self.brands:
+                return token
+        return None
+
+    def dtc_cost(self, code: str) -> float:
+        code = str(code).strip().upper()
+        for length in self._dtc_prefix_lengths:
+            cost = self.dtc_costs.get(code[:length])
+            if cost is not None:
+                return cost
+        return self.dtc_default_cost
+
+    def quote(
+        self,
+        car_data: Dict[str, Any],
+        obd2_analysis: Dict[str, Any] = None,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Devizul detaliat pentru un vehicul (marca/modelul canonice, din indexul de nume)"""
+        if brand is None:
+            name = normalize_car_data(car_data)
+            brand = name.make if name.make in self.brands else self.brand_of(car_data.get("car_type", "standard"))
+            model = model or name.model or name.model_text
+        category = self.brands.get(brand, self.default_category) if brand else self.default_category
+        category_multiplier, main_system = self.categories[category]
+        model_key = f"{brand}|{str(model or '').lower().strip()}"
+        model_multiplier = self.models.get(model_key, 1.0)
+
+        car_age = self.reference_year - int(car_data.get("year", self.reference_year) or self.reference_year)
+        mileage = float(car_data.get("mileage") or 0.0)
+        age_multiplier, age_issue = self.age.lookup(car_age)
+        mileage_multiplier, mileage_issue = self.mileage.lookup(mileage)
+
+        region = str(car_data.get("region") or self.default_region).lower()
+        region_multiplier = self.regions.get(region, self.regions.get(self.default_region, 1.0))
+
+        symptom_cost = len(car_data.get("simptome", []) or []) * self.symptom_cost
+        dtc_cost = sum(self.dtc_cost(code) for code in car_data.get("coduri_dtc", []) or [])
+        obd2_cost = 0.0
+        if obd2_analysis and obd2_analysis.get("obd2_connected"):
+            obd2_cost = (
+                len(obd2_analysis.get("problems", [])) * self.obd2_problem_cost
+                + len(obd2_analysis.get("warnings", [])) * self.obd2_warning_cost
+            )
+
+        base = self.base_price * category_multiplier * model_multiplier
+        total = (base * age_multiplier * mileage_multiplier + symptom_cost + dtc_cost + obd2_cost) * region_multiplier
+        if self.round_to:
+            total = round(total / self.round_to) * self.round_to
+
+        return {
+            "total": total,
+            "currency": self.currency,
+            "brand": brand,
+            "category": category,
+            "main_system": main_system,
+            "car_age": car_age,
+            "age_multiplier": age_multiplier,
+            "age_issue": age_issue,
+            "mileage_multiplier": mileage_multiplier,
+            "mileage_issue": mileage_issue,
+            "model_multiplier": model_multiplier,
+            "region": region,
+            "region_multiplier": region_multiplier,
+            "symptom_cost": symptom_cost,
+            "dtc_cost": dtc_cost,
+            "obd2_cost": obd2_cost,
+        }
+
+
+class PricingEngine:
+    """Tabelul curent + reîncărcare la schimbarea fișierului"""
+
+    def __init__(self, path: str = DEFAULT_TABLE_PATH, reload_interval: float = 5.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = 0.0
+        self._checked_at = 0.0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.quotes = 0
+        self.table = self._load()
+
+    def _load(self) -> PricingTable:
+        self._mtime = os.path.getmtime(self.path)
+        with open(self.path, "r", encoding="utf-8") as f:
+            return PricingTable(json.load(f), self.path)
+
+    def current(self) -> PricingTable:
+        """Tabelul activ; verifică mtime cel mult o dată la reload_interval secunde"""
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_interval:
+            self._checked_at = now
+            self.maybe_reload()
+        return self.table
+
+    def maybe_reload(self) -> bool:
+        try:
+            if os.path.getmtime(self.path) == self._mtime:
+                return False
+            with self._lock:
+                table = self._load()
+                self.table = table
+                self.reloads += 1
+            logger.info(f"💰 Tabel prețuri reîncărcat: {self.path} (v{table.version})")
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            # Un fișier invalid nu înlocuiește tabelul bun existent
+            self.reload_errors += 1
+            logger.error(f"Tabelul de prețuri nu a putut fi reîncărcat: {e}")
+            return False
+
+    def quote(self, car_data: Dict[str, Any], obd2_analysis: Dict[str, Any] = None, **kwargs) -> Dict[str, Any]:
+        self.quotes += 1
+        return self.current().quote(car_data, obd2_analysis, **kwargs)
+
+    def quote_batch(self, vehicles: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Prețuri pentru o flotă, toate cu același tabel (o singură verificare de reîncărcare)"""
+        table = self.current()
+        quotes = [table.quote(car_data) for car_data in vehicles]
+        self.quotes += len(quotes)
+        return quotes
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "version": self.table.version,
+            "brands": len(self.table.brands),
+            "models": len(self.table.models),
+            "dtc_costs": len(self.table.dtc_costs),
+            "regions": len(self.table.regions),
+            "quotes": self.quotes,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+        }
+
+
+def create_pricing_engine() -> PricingEngine:
+    return PricingEngine(
+        os.getenv("PRICING_TABLE_PATH", DEFAULT_TABLE_PATH),
+        float(os.getenv("PRICING_RELOAD_INTERVAL", "5")),
+    )
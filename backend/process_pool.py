@@ -0,0 +1,319 @@
+"""
+🏭 POOL DE PROCESE CALD PENTRU MUNCA CPU
+Workerii sunt porniți la startup (nu la prima cerere) și își încarcă o singură
+dată tabelul de prețuri, indexul de mărci/modele și regulile de analiză.
+Ferestrele lungi de mostre OBD2 trimise pe coloane ajung la worker printr-un
+bloc de memorie partajată (float64) în loc să fie serializate cu pickle prin
+pipe; loturile mari se împart pe toți workerii.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import signal
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Any, Callable, Dict, Iterable, List
+
+from fleet_stats import SignalSketches
+from log_ingest import DEFAULT_TOP_EVENTS, DriveSummary
+
+logger = logging.getLogger(__name__)
+
+# Semnalele numerice ale unei mostre (engine_on ca 0/1); NaN = lipsă
+WINDOW_COLUMNS = [
+    "timestamp", "rpm", "speed", "coolant_temp", "throttle_position", "maf",
+    "engine_load", "fuel_pressure", "intake_temp", "timing_advance",
+    "oxygen_sensor_voltage", "battery_voltage", "fuel_level", "ambient_temp",
+    "barometric_pressure", "engine_on",
+]
+
+# Starea fiecărui worker, creată de inițializator
+_worker_state: Dict[str, Any] = {}
+
+
+# ============================================================================
+# FUNCȚII RULATE ÎN WORKERI
+# ============================================================================
+
+def _warm_worker():
+    """Inițializatorul workerului: tot ce e scump se încarcă acum, nu la prima sarcină"""
+    # Ctrl+C e tratat de procesul principal, care oprește pool-ul
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from pricing import create_pricing_engine
+    from vehicle_names import get_index
+
+    get_index()
+    _worker_state["pricing"] = create_pricing_engine()
+    _worker_state["pid"] = os.getpid()
+
+
+def _ping(delay: float = 0.0) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _pricing_engine():
+    if "pricing" not in _worker_state:
+        from pricing import create_pricing_engine
+        _worker_state["pricing"] = create_pricing_engine()
+    return _worker_state["pricing"]
+
+
+def quote_batch_task(vehicles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Prețuri pentru o parte din flotă (tabelul workerului se reîncarcă singur la modificare)"""
+    return _pricing_engine().quote_batch(vehicles)
+
+
+def analyze_samples_task(
+    samples: Iterable[Dict[str, Any]],
+    dtc_codes: List[str] = None,
+    top_n: int = DEFAULT_TOP_EVENTS,
+    sketch: bool = False,
+) -> Dict[str, Any]:
+    """Regulile OBD2 pe fiecare mostră a ferestrei + sumar (ca la ingestia de loguri)
+
+    sketch=True adaugă "signal_sketches" (quantile per semnal, de unit în agregatele de flotă)
+    """
+    summary = DriveSummary(0, top_n)
+    summary.dtc_codes.update(dtc_codes or [])
+    sketches = SignalSketches() if sketch else None
+    for sample in samples:
+        summary.add(sample)
+        if sketches:
+            sketches.add(sample)
+    report = summary.to_dict()
+    if sketches:
+        report["signal_sketches"] = sketches.to_dict()
+    return report
+
+
+def analyze_shared_window_task(
+    spec: tuple,
+    dtc_codes: List[str] = None,
+    top_n: int = DEFAULT_TOP_EVENTS,
+    sketch: bool = False,
+) -> Dict[str, Any]:
+    """Ca analyze_samples_task, cu mostrele citite direct din memoria partajată"""
+    name, rows, columns = spec
+    shm = SharedMemory(name=name)
+    try:
+        values = shm.buf[:rows * len(columns) * 8].cast("d")
+        try:
+            # O coloană = rows valori float64 consecutive; tolist() le convertește în C
+            series = [values[i * rows:(i + 1) * rows].tolist() for i in range(len(columns))]
+        finally:
+            values.release()
+    finally:
+        shm.close()
+    return analyze_samples_task(_iter_rows(series, columns), dtc_codes, top_n, sketch)
+
+
+def _iter_rows(series: List[List[float]], columns: List[str]):
+    for row in zip(*series):
+        sample = {name: value for name, value in zip(columns, row) if value == value}
+        if "engine_on" in sample:
+            sample["engine_on"] = sample["engine_on"] != 0.0
+        yield sample
+
+
+def _float_series(values: Iterable[Any]) -> array:
+    """Coloană float64; valorile lipsă sau nenumerice devin NaN"""
+    values = list(values)
+    try:
+        return array("d", values)
+    except TypeError:
+        return array("d", [
+            float(value) if isinstance(value, (int, float)) else math.nan for value in values
+        ])
+
+
+def columns_to_samples(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Format pe coloane -> listă de mostre (pentru rularea fără pool)"""
+    names = [name for name in WINDOW_COLUMNS if name in columns]
+    return list(_iter_rows([_float_series(columns[name]).tolist() for name in names], names))
+
+
+# ============================================================================
+# MEMORIE PARTAJATĂ
+# ============================================================================
+
+class SharedSamples:
+    """Fereastră de mostre copiată o singură dată într-un bloc SharedMemory (pe coloane)"""
+
+    def __init__(self, series: Dict[str, array]):
+        self.columns = list(series)
+        self.rows = len(next(iter(series.values()))) if series else 0
+        if any(len(values) != self.rows for values in series.values()):
+            raise ValueError("Coloanele ferestrei au lungimi diferite")
+        self.nbytes = self.rows * len(self.columns) * 8
+        self.shm = SharedMemory(create=True, size=max(8, self.nbytes))
+        for i, values in enumerate(series.values()):
+            start = i * self.rows * 8
+            self.shm.buf[start:start + self.rows * 8] = memoryview(values).cast("B")
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, List[Any]]) -> "SharedSamples":
+        """Clientul trimite deja coloane: conversia e o singură copiere per coloană"""
+        return cls({name: _float_series(columns[name]) for name in WINDOW_COLUMNS if name in columns})
+
+    @property
+    def spec(self) -> tuple:
+        """Ce ajunge la worker prin pickle: doar numele blocului și forma"""
+        return (self.shm.name, self.rows, self.columns)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+class WarmProcessPool:
+    """ProcessPoolExecutor pornit și încălzit dinainte, cu repornire la crash"""
+
+    def __init__(
+        self,
+        workers: int = 0,
+        start_method: Optional[str] = None,
+        shared_min_bytes: int = 256 * 1024,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.start_method = start_method
+        self.shared_min_bytes = shared_min_bytes
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._start_lock = threading.Lock()
+        self.pids: List[int] = []
+        self.warmup_ms: Optional[float] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+        self.in_flight = 0
+        self.busy_ms = 0.0
+        self.shared_bytes = 0
+
+    def start(self) -> "WarmProcessPool":
+        """Pornește toți workerii și așteaptă inițializarea lor (blocant: se apelează dintr-un thread)"""
+        with self._start_lock:
+            if self._pool is not None:
+                return self
+            started = time.perf_counter()
+            context = get_context(self.start_method) if self.start_method else None
+            # Workerii moștenesc tracker-ul părintelui: blocurile partajate au un singur proprietar
+            resource_tracker.ensure_running()
+            pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_warm_worker)
+            # Câte o sarcină (ocupată puțin) per worker forțează pornirea și inițializarea tuturor
+            futures = [pool.submit(_ping, 0.05) for _ in range(self.workers)]
+            self.pids = sorted({future.result() for future in futures})
+            self.warmup_ms = round((time.perf_counter() - started) * 1000, 2)
+            self._pool = pool
+        logger.info(f"🏭 Pool de procese pregătit: {len(self.pids)} workeri în {self.warmup_ms} ms")
+        return self
+
+    def shutdown(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Execută func(*args) într-un worker; la pool stricat (worker omorât) repornește o dată"""
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            for attempt in range(2):
+                if self._pool is None:
+                    await asyncio.to_thread(self.start)
+                try:
+                    result = await loop.run_in_executor(self._pool, func, *args)
+                    self.completed += 1
+                    return result
+                except BrokenProcessPool:
+                    logger.error("🏭 Pool de procese stricat - repornesc workerii")
+                    self.restarts += 1
+                    self.shutdown()
+                    if attempt:
+                        raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.busy_ms += (time.perf_counter() - started) * 1000
+
+    async def map_chunks(self, func: Callable[[List[Any]], List[Any]], items: List[Any], min_chunk: int = 100) -> List[Any]:
+        """Împarte lista pe workeri și concatenează rezultatele în ordine"""
+        chunks = max(1, min(self.workers, len(items) // max(1, min_chunk)))
+        size = math.ceil(len(items) / chunks) if items else 0
+        parts = await asyncio.gather(*(
+            self.run(func, items[i:i + size]) for i in range(0, len(items), size or 1)
+        ))
+        return [item for part in parts for item in part]
+
+    async def analyze_window(
+        self,
+        samples: Optional[List[Dict[str, Any]]] = None,
+        dtc_codes: List[str] = None,
+        top_n: int = DEFAULT_TOP_EVENTS,
+        columns: Optional[Dict[str, List[Any]]] = None,
+        sketch: bool = False,
+    ) -> Dict[str, Any]:
+        """Ferestrele mari pe coloane trec prin memorie partajată; listele de mostre prin pickle
+
+        (împachetarea dicționarelor în float64 costă mai mult decât economisește, vezi
+        benchmarks/bench_process_pool.py)
+        """
+        if columns is None:
+            return await self.run(analyze_samples_task, samples or [], dtc_codes, top_n, sketch)
+        rows = max((len(values) for values in columns.values()), default=0)
+        if rows * len(columns) * 8 < self.shared_min_bytes:
+            return await self.run(analyze_samples_task, columns_to_samples(columns), dtc_codes, top_n, sketch)
+        shared = await asyncio.to_thread(SharedSamples.from_columns, columns)
+        try:
+            self.shared_bytes += shared.nbytes
+            return await self.run(analyze_shared_window_task, shared.spec, dtc_codes, top_n, sketch)
+        finally:
+            shared.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self._pool is not None,
+            "pids": self.pids,
+            "warmup_ms": self.warmup_ms,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "restarts": self.restarts,
+            "in_flight": self.in_flight,
+            "avg_task_ms": round(self.busy_ms / self.completed, 2) if self.completed else None,
+            "shared_bytes": self.shared_bytes,
+        }
+
+
+def create_process_pool() -> Optional[WarmProcessPool]:
+    """Pool din variabilele de mediu, pornit; None dacă PROCESS_POOL_ENABLED=false"""
+    if os.getenv("PROCESS_POOL_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    pool = WarmProcessPool(
+        workers=int(os.getenv("PROCESS_POOL_WORKERS", "0")),
+        start_method=os.getenv("PROCESS_POOL_START_METHOD") or None,
+        shared_min_bytes=int(os.getenv("PROCESS_POOL_SHARED_MIN_BYTES", str(256 * 1024))),
+    )
+    return pool.start()
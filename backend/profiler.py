@@ -0,0 +1,122 @@
+"""
+🔬 PROFILER STATISTIC PENTRU PRODUCȚIE
+Un thread eșantionează periodic stivele tuturor thread-urilor procesului
+(sys._current_frames), fără instrumentare și fără a opri event loop-ul.
+Rezultatul e în format „collapsed stacks” (cadru;cadru;cadru număr), direct
+utilizabil de flamegraph.pl / speedscope / inferno.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional, Any, Dict, List
+
+
+class ProfilerBusy(Exception):
+    """Un profil rulează deja (eșantionarea e exclusivă)"""
+
+
+class SamplingProfiler:
+    """Eșantionare la interval fix; un singur profil simultan"""
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self.runs = 0
+
+    def _frame_label(self, frame, lines: bool) -> str:
+        code = frame.f_code
+        location = os.path.basename(code.co_filename)
+        if lines:
+            location += f":{frame.f_lineno}"
+        return f"{code.co_name} ({location})"
+
+    def profile(
+        self,
+        seconds: float,
+        lines: bool = False,
+        thread_filter: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Eșantionează `seconds` secunde (blocant: se rulează într-un thread separat)"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("Un profil rulează deja")
+        try:
+            self.runs += 1
+            own = threading.get_ident()
+            stacks: Counter = Counter()
+            samples = 0
+            started = time.perf_counter()
+            deadline = started + seconds
+            next_tick = started
+            sampling_s = 0.0
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    name = names.get(ident, f"thread-{ident}")
+                    if thread_filter and thread_filter not in name:
+                        continue
+                    labels: List[str] = []
+                    while frame is not None and len(labels) < self.max_depth:
+                        labels.append(self._frame_label(frame, lines))
+                        frame = frame.f_back
+                    labels.append(name)
+                    stacks[";".join(reversed(labels))] += 1
+                samples += 1
+                sampling_s += time.perf_counter() - now
+                next_tick += self.interval
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Întârziere (GIL ocupat): nu recupera eșantioanele pierdute în rafală
+                    next_tick = time.perf_counter()
+            elapsed = time.perf_counter() - started
+        finally:
+            self._lock.release()
+
+        return {
+            "duration_s": round(elapsed, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": samples,
+            # Cât din durată a consumat eșantionarea însăși (costul profilerului)
+            "overhead_pct": round(sampling_s / elapsed * 100, 2) if elapsed else 0.0,
+            "stacks": dict(stacks.most_common()),
+        }
+
+
+def collapsed(profile: Dict[str, Any]) -> str:
+    """Textul „collapsed stacks” (o linie per stivă: cadre separate prin ; și numărul)"""
+    return "".join(f"{stack} {count}\n" for stack, count in profile["stacks"].items())
+
+
+def top_functions(profile: Dict[str, Any], limit: int = 30) -> List[Dict[str, Any]]:
+    """Funcțiile cu cele mai multe eșantioane proprii (vârful stivei) și cumulate"""
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in profile["stacks"].items():
+        frames = stack.split(";")[1:]
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    samples = sum(profile["stacks"].values()) or 1
+    return [
+        {
+            "function": frame,
+            "self_pct": round(count / samples * 100, 2),
+            "total_pct": round(total[frame] / samples * 100, 2),
+        }
+        for frame, count in own.most_common(limit)
+    ]
+
+
+profiler = SamplingProfiler(interval=float(os.getenv("PROFILER_INTERVAL_MS", "5")) / 1000)
@@ -0,0 +1,170 @@
+"""
+🚦 RATE LIMITING ȘI COTE DE CONCURENȚĂ
+Token bucket per client (user_id / IP) pentru API și limite de apeluri
+simultane per motor AI, cu redirecționare la motorul următor când un motor
+este saturat sau în cooldown după un 429 de la furnizor.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, defaultdict
+from typing import Optional, Any, Dict, Tuple
+
+
+class TokenBucket:
+    """Găleată cu jetoane, reumplută leneș la fiecare consum"""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate  # jetoane / secundă
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def consume(self, amount: float = 1.0) -> Tuple[bool, float]:
+        """(permis, secunde de așteptat până la următorul jeton)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True, 0.0
+        return False, (amount - self.tokens) / self.rate if self.rate else math.inf
+
+
+class RateLimiter:
+    """Găleți per cheie, cu număr maxim de chei (LRU) ca memoria să fie limitată"""
+
+    def __init__(self, per_minute: float, burst: float, max_keys: int = 100000):
+        self.per_minute = per_minute
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.allowed = 0
+        self.throttled = 0
+
+    def check(self, key: str) -> Tuple[bool, float, int]:
+        """(permis, Retry-After în secunde, jetoane rămase)"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.burst, self.per_minute / 60.0)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+
+        allowed, wait = bucket.consume()
+        if allowed:
+            self.allowed += 1
+        else:
+            self.throttled += 1
+        return allowed, wait, int(bucket.tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "per_minute": self.per_minute,
+            "burst": self.burst,
+            "tracked_clients": len(self._buckets),
+            "allowed": self.allowed,
+            "throttled": self.throttled,
+        }
+
+
+class ClientRateLimiter:
+    """Găleată per IP (obligatorie) + găleată secundară per IP|user
+
+    Identitatea declarată de client (X-User-Id / user_id) nu poate ocoli
+    limita: un user_id nou la fiecare cerere primește o găleată secundară
+    nouă, dar consumă din aceeași găleată a IP-ului. Găleata IP-ului e de
+    ip_factor ori mai mare, pentru mai mulți utilizatori în spatele unui NAT.
+    """
+
+    def __init__(self, per_minute: float, burst: float, ip_factor: float = 3.0, max_keys: int = 100000):
+        self.per_ip = RateLimiter(per_minute * ip_factor, burst * ip_factor, max_keys)
+        self.per_user = RateLimiter(per_minute, burst, max_keys)
+
+    def check(self, ip: str, user: Optional[str] = None) -> Tuple[bool, float, int]:
+        """(permis, Retry-After în secunde, jetoane rămase) - cea mai strictă dintre găleți"""
+        allowed, wait, remaining = self.per_ip.check(ip)
+        if not allowed:
+            return allowed, wait, remaining
+        user_allowed, user_wait, user_remaining = self.per_user.check(f"{ip}|{user or ''}")
+        return user_allowed, user_wait, min(remaining, user_remaining)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"per_ip": self.per_ip.stats(), "per_user": self.per_user.stats()}
+
+
+class EngineLimiter:
+    """Semafor per motor AI (apeluri simultane la furnizor) + cooldown după 429"""
+
+    def __init__(self, limits: Dict[str, int], queue_timeout: float = 0.5):
+        self.limits = limits
+        self.queue_timeout = queue_timeout
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._cooldown_until: Dict[str, float] = {}
+        self.in_flight: Dict[str, int] = defaultdict(int)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.rerouted: Dict[str, int] = defaultdict(int)
+        self.cooldown_skips: Dict[str, int] = defaultdict(int)
+        self.upstream_429: Dict[str, int] = defaultdict(int)
+
+    def _semaphore(self, engine: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(engine)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limits.get(engine, 4))
+            self._semaphores[engine] = semaphore
+        return semaphore
+
+    def cooldown(self, engine: str, seconds: float):
+        """Motorul a primit 429: nu mai e încercat până expiră Retry-After"""
+        self.upstream_429[engine] += 1
+        self._cooldown_until[engine] = max(
+            self._cooldown_until.get(engine, 0.0), time.monotonic() + max(1.0, seconds)
+        )
+
+    def in_cooldown(self, engine: str) -> bool:
+        return self._cooldown_until.get(engine, 0.0) > time.monotonic()
+
+    async def acquire(self, engine: str) -> bool:
+        """Ocupă un slot; False dacă motorul e în cooldown sau saturat (=> următorul motor)"""
+        if self.in_cooldown(engine):
+            self.cooldown_skips[engine] += 1
+            return False
+        try:
+            await asyncio.wait_for(self._semaphore(engine).acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rerouted[engine] += 1
+            return False
+        self.in_flight[engine] += 1
+        self.calls[engine] += 1
+        return True
+
+    def release(self, engine: str):
+        self.in_flight[engine] -= 1
+        self._semaphore(engine).release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            engine: {
+                "limit": limit,
+                "in_flight": self.in_flight[engine],
+                "calls": self.calls[engine],
+                "rerouted": self.rerouted[engine],
+                "cooldown_skips": self.cooldown_skips[engine],
+                "upstream_429": self.upstream_429[engine],
+                "in_cooldown": self.in_cooldown(engine),
+            }
+            for engine, limit in self.limits.items()
+        }
+
+
+def parse_retry_after(value: Optional[str], default: float = 30.0) -> float:
+    """Header Retry-After (secunde) de la furnizor"""
+    try:
+        return float(value) if value else default
+    except ValueError:
+        return default
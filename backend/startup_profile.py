@@ -0,0 +1,152 @@
+"""
+⏱️ PROFIL PORNIRE (COLD START)
+Măsoară fazele de încărcare ale aplicației, timpul de import per modul
+(stil `-X importtime`, activ cu STARTUP_PROFILE=1) și componentele grele
+încărcate leneș la prima utilizare.
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Optional, Any, Callable, Dict, List
+
+_PROCESS_T0 = time.perf_counter()
+
+
+class _TimedLoader:
+    """Proxy peste loader-ul unui modul care cronometrează exec_module"""
+
+    def __init__(self, loader, name: str, timer: "_ImportTimer"):
+        self._loader = loader
+        self._name = name
+        self._timer = timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # Introspecția din modul vede loader-ul original
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+
+        stack = self._timer.stack
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self._timer.records.append((self._name, elapsed - children, elapsed))
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class _ImportTimer:
+    """Meta path finder care învelește loader-ele pentru cronometrare"""
+
+    def __init__(self):
+        self.stack: List[float] = []
+        self.records: List[tuple] = []  # (modul, self_s, cumulativ_s)
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+        finally:
+            self._local.busy = False
+
+        if spec is None or spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+        spec.loader = _TimedLoader(spec.loader, fullname, self)
+        return spec
+
+
+class LazyComponent:
+    """Componentă grea creată la prima utilizare (thread-safe)"""
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.factory = factory
+        self.load_ms: Optional[float] = None
+        self._value: Any = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        startup_profile.components[name] = self
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self) -> Any:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    start = time.perf_counter()
+                    self._value = self.factory()
+                    self.load_ms = round((time.perf_counter() - start) * 1000, 2)
+                    self._loaded = True
+        return self._value
+
+    def peek(self) -> Any:
+        """Valoarea curentă fără a declanșa încărcarea"""
+        return self._value if self._loaded else None
+
+
+class StartupProfile:
+    """Fazele de pornire ale procesului și timpii de import"""
+
+    def __init__(self):
+        self.phases: List[tuple] = []
+        self.components: Dict[str, LazyComponent] = {}
+        self._last_mark = _PROCESS_T0
+        self._import_timer: Optional[_ImportTimer] = None
+
+    def enable_import_timing(self):
+        if self._import_timer is None:
+            self._import_timer = _ImportTimer()
+            sys.meta_path.insert(0, self._import_timer)
+
+    def mark(self, phase: str):
+        """Închide faza curentă (durata de la marcajul anterior)"""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last_mark) * 1000))
+        self._last_mark = now
+
+    def report(self, top: int = 30) -> Dict[str, Any]:
+        report: Dict[str, Any] = {
+            "phases": [{"name": name, "ms": round(ms, 2)} for name, ms in self.phases],
+            "total_ms": round(sum(ms for _, ms in self.phases), 2),
+            "lazy_components": {
+                name: {"loaded": component.loaded, "load_ms": component.load_ms}
+                for name, component in self.components.items()
+            },
+            "import_profiling": self._import_timer is not None,
+        }
+        if self._import_timer is not None:
+            records = sorted(self._import_timer.records, key=lambda r: r[2], reverse=True)
+            report["imports"] = [
+                {"module": name, "self_ms": round(own * 1000, 2), "cumulative_ms": round(cumulative * 1000, 2)}
+                for name, own, cumulative in records[:top]
+            ]
+        return report
+
+
+startup_profile = StartupProfile()
+
+if os.getenv("STARTUP_PROFILE", "").lower() in ("1", "true", "yes"):
+    startup_profile.enable_import_timing()
@@ -0,0 +1,405 @@
+"""
+🛰️ INGESTIE TELEMETRIE ÎN MASĂ (GATEWAY-URI / DONGLE-URI)
+Corpul cererii (NDJSON sau lot binar OBDB, opțional gzip/zstd) se decomprimă
+și se împarte pe bucăți pe măsură ce sosește, fără a fi ținut întreg în
+memorie. Event loop-ul doar decomprimă și taie blocuri de linii/înregistrări
+complete; parsarea, regulile de analiză și schițele de flotă rulează în
+workeri, alimentați printr-o coadă mărginită (backpressure către client).
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Optional, Any, Awaitable, Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+from fleet_stats import SignalSketches
+from log_ingest import DEFAULT_TOP_EVENTS, DriveSummary
+from obd2_protocol import BATCH_HEADER, BATCH_RECORD, check_batch_header, decode_batch_records
+from obd2_sample import to_epoch
+
+try:
+    import zstandard
+except ImportError:  # zstd e opțional: fără pachet, cererile zstd primesc 415
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_BINARY = "binary"
+
+SUPPORTED_ENCODINGS = ("identity", "gzip", "deflate") + (("zstd",) if zstandard else ())
+
+
+class UnsupportedEncoding(ValueError):
+    """Content-Encoding necunoscut sau indisponibil (415)"""
+
+
+class BodyTooLarge(ValueError):
+    """Corpul decomprimat depășește limita (413, protecție contra arhivelor-bombă)"""
+
+
+# Erori de format/decomprimare ale corpului (400)
+DECODE_ERRORS = (ValueError, zlib.error) + ((zstandard.ZstdError,) if zstandard else ())
+
+
+# ============================================================================
+# DECOMPRIMARE ȘI ÎMPĂRȚIRE ÎN BLOCURI (EVENT LOOP)
+# ============================================================================
+
+class StreamDecoder:
+    """Decomprimare incrementală după Content-Encoding, cu limită pe totalul decomprimat
+
+    Limita se aplică în timpul decomprimării (nu după fiecare bucată), ca o
+    arhivă-bombă să nu poată umfla o bucată mică de intrare la sute de MB.
+    """
+
+    # zstandard nu are max_length: intrarea se dă în felii mici; un bloc zstd
+    # (minim ~3 octeți comprimați) produce cel mult 128 KB, deci o felie de
+    # ZSTD_SLICE octeți depășește limita cu cel mult ~11 MB înainte de verificare
+    ZSTD_SLICE = 256
+
+    def __init__(self, encoding: Optional[str], max_bytes: int):
+        encoding = (encoding or "identity").strip().lower()
+        self.max_bytes = max_bytes
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._zlib = None
+        self._zstd = None
+        if encoding == "identity":
+            pass
+        elif encoding in ("gzip", "x-gzip", "deflate"):
+            # 32 + MAX_WBITS: detectează automat antetul gzip sau zlib
+            self._zlib = zlib.decompressobj(32 + zlib.MAX_WBITS)
+        elif encoding == "zstd" and zstandard:
+            self._zstd = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            raise UnsupportedEncoding(
+                f"Content-Encoding nesuportat: {encoding} (acceptate: {', '.join(SUPPORTED_ENCODINGS)})"
+            )
+
+    def _too_large(self) -> BodyTooLarge:
+        return BodyTooLarge(f"Corp decomprimat peste {self.max_bytes} octeți")
+
+    def _inflate(self, chunk: bytes) -> List[bytes]:
+        # Cel mult un octet peste limită per apel: suficient ca depășirea să fie detectată
+        parts = []
+        data = chunk
+        while data:
+            part = self._zlib.decompress(data, self.max_bytes - self.bytes_out + 1)
+            self.bytes_out += len(part)
+            if self.bytes_out > self.max_bytes:
+                raise self._too_large()
+            parts.append(part)
+            data = self._zlib.unconsumed_tail
+        return parts
+
+    def _unzstd(self, chunk: bytes) -> List[bytes]:
+        parts = []
+        view = memoryview(chunk)
+        for start in range(0, len(view), self.ZSTD_SLICE):
+            part = self._zstd.decompress(view[start:start + self.ZSTD_SLICE])
+            self.bytes_out += len(part)
+            if self.bytes_out > self.max_bytes:
+                raise self._too_large()
+            parts.append(part)
+        return parts
+
+    def feed(self, chunk: bytes) -> bytes:
+        self.bytes_in += len(chunk)
+        if self._zlib:
+            return b"".join(self._inflate(chunk))
+        if self._zstd:
+            return b"".join(self._unzstd(chunk))
+        self.bytes_out += len(chunk)
+        if self.bytes_out > self.max_bytes:
+            raise self._too_large()
+        return chunk
+
+
+class NdjsonFramer:
+    """Blocuri de linii complete (una per mostră), de cel puțin block_bytes"""
+
+    def __init__(self, block_bytes: int):
+        self.block_bytes = block_bytes
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> Iterator[Tuple[bytes, int]]:
+        self._buffer += data
+        if len(self._buffer) < self.block_bytes:
+            return
+        end = self._buffer.rfind(b"\n") + 1
+        if end:
+            block = bytes(self._buffer[:end])
+            del self._buffer[:end]
+            yield block, block.count(b"\n")
+
+    def finish(self) -> Iterator[Tuple[bytes, int]]:
+        block = bytes(self._buffer).strip()
+        self._buffer.clear()
+        if block:
+            yield block + b"\n", block.count(b"\n") + 1
+
+
+class BinaryFramer:
+    """Blocuri de înregistrări OBDB complete; antetul se validează la început"""
+
+    def __init__(self, block_bytes: int):
+        self.block_bytes = max(BATCH_RECORD.size, block_bytes - block_bytes % BATCH_RECORD.size)
+        self._buffer = bytearray()
+        self._header_checked = False
+
+    def feed(self, data: bytes) -> Iterator[Tuple[bytes, int]]:
+        self._buffer += data
+        if not self._header_checked:
+            if len(self._buffer) < BATCH_HEADER.size:
+                return
+            check_batch_header(bytes(self._buffer[:BATCH_HEADER.size]))
+            del self._buffer[:BATCH_HEADER.size]
+            self._header_checked = True
+        if len(self._buffer) < self.block_bytes:
+            return
+        end = len(self._buffer) - len(self._buffer) % BATCH_RECORD.size
+        block = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        yield block, end // BATCH_RECORD.size
+
+    def finish(self) -> Iterator[Tuple[bytes, int]]:
+        if not self._header_checked:
+            if self._buffer:
+                raise ValueError("Lot binar fără antet complet")
+            return
+        if len(self._buffer) % BATCH_RECORD.size:
+            raise ValueError(f"Lot binar trunchiat ({len(self._buffer) % BATCH_RECORD.size} octeți în plus)")
+        block = bytes(self._buffer)
+        self._buffer.clear()
+        if block:
+            yield block, len(block) // BATCH_RECORD.size
+
+
+def create_framer(fmt: str, block_bytes: int):
+    return BinaryFramer(block_bytes) if fmt == FORMAT_BINARY else NdjsonFramer(block_bytes)
+
+
+# ============================================================================
+# ANALIZA UNUI BLOC (RULEAZĂ ÎN WORKER)
+# ============================================================================
+
+def _iter_ndjson(block: bytes, errors: List[int]) -> Iterator[Dict[str, Any]]:
+    for line in block.splitlines():
+        if not line.strip():
+            continue
+        try:
+            sample = json.loads(line)
+        except ValueError:
+            errors[0] += 1
+            continue
+        if not isinstance(sample, dict):
+            errors[0] += 1
+            continue
+        if "timestamp" in sample:
+            # Sumarul per drum lucrează cu secunde epoch, nu cu text ISO
+            sample["timestamp"] = to_epoch(sample["timestamp"])
+        yield sample
+
+
+def analyze_block_task(fmt: str, block: bytes, top_n: int = DEFAULT_TOP_EVENTS, sketch: bool = False) -> Dict[str, Any]:
+    """Parsează blocul și aplică regulile OBD2 (sumar + schițe de quantile pentru flotă)"""
+    errors = [0]
+    samples = decode_batch_records(block) if fmt == FORMAT_BINARY else _iter_ndjson(block, errors)
+    summary = DriveSummary(0, top_n)
+    sketches = SignalSketches() if sketch else None
+    for sample in samples:
+        summary.add(sample)
+        if sketches:
+            sketches.add(sample)
+    return {
+        "report": summary.to_dict(),
+        "invalid": errors[0],
+        "signal_sketches": sketches.to_dict() if sketches else None,
+    }
+
+
+# ============================================================================
+# PIPELINE ASINCRON MĂRGINIT
+# ============================================================================
+
+class TelemetryBatch(NamedTuple):
+    vehicle_id: str
+    car_type: Optional[str]
+    model: Optional[str]
+    fmt: str
+    data: bytes
+    samples: int
+
+
+class TelemetryPipeline:
+    """Coadă mărginită + consumatori: submit() așteaptă cât coada e plină (backpressure)"""
+
+    def __init__(
+        self,
+        process: Callable[[TelemetryBatch], Awaitable[Any]],
+        queue_size: int = 64,
+        workers: int = 4,
+    ):
+        self.process = process
+        self.queue_size = queue_size
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.accepted_samples = 0
+        self.processed_samples = 0
+        self.processed_batches = 0
+        self.failed_batches = 0
+        self.rejected_batches = 0
+        self.busy_ms = 0.0
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(self.queue_size)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._consume()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        """Procesează ce e deja în coadă (cel mult timeout secunde), apoi oprește consumatorii"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"🛰️ Oprire ingestie: {self._queue.qsize()} loturi neprocesate")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, batch: TelemetryBatch, timeout: float) -> bool:
+        """False dacă coada a rămas plină timeout secunde"""
+        if not self._tasks:
+            self.start()
+        try:
+            await asyncio.wait_for(self._queue.put(batch), timeout)
+        except asyncio.TimeoutError:
+            self.rejected_batches += 1
+            return False
+        self.accepted_samples += batch.samples
+        return True
+
+    async def _consume(self):
+        while True:
+            batch = await self._queue.get()
+            started = time.perf_counter()
+            try:
+                await self.process(batch)
+                self.processed_batches += 1
+                self.processed_samples += batch.samples
+            except Exception as e:
+                self.failed_batches += 1
+                logger.error(f"🛰️ Lot telemetrie eșuat ({batch.vehicle_id}, {batch.samples} mostre): {e}")
+            finally:
+                self.busy_ms += (time.perf_counter() - started) * 1000
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued_batches": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+            "workers": self.workers,
+            "accepted_samples": self.accepted_samples,
+            "processed_samples": self.processed_samples,
+            "processed_batches": self.processed_batches,
+            "failed_batches": self.failed_batches,
+            "rejected_batches": self.rejected_batches,
+            "avg_batch_ms": round(self.busy_ms / self.processed_batches, 2) if self.processed_batches else None,
+        }
+
+
+# ============================================================================
+# STARE PER VEHICUL
+# ============================================================================
+
+class VehicleTelemetry:
+    """Sumarul cumulat al telemetriei unui vehicul (din rapoartele blocurilor)"""
+
+    def __init__(self, vehicle_id: str, top_n: int):
+        self.vehicle_id = vehicle_id
+        self.top_n = top_n
+        self.samples = 0
+        self.invalid = 0
+        self.first_ts: Optional[float] = None
+        self.last_ts: Optional[float] = None
+        self.last_seen = time.time()
+        self.problems: Counter = Counter()
+        self.warnings: Counter = Counter()
+        self.dtc_codes: set = set()
+        self._worst: List[Tuple[int, int, Dict[str, Any]]] = []
+        self._events = 0
+
+    def merge(self, result: Dict[str, Any]):
+        report = result["report"]
+        self.samples += report["samples"]
+        self.invalid += result.get("invalid", 0)
+        self.last_seen = time.time()
+        if report.get("start") is not None:
+            self.first_ts = report["start"] if self.first_ts is None else min(self.first_ts, report["start"])
+            self.last_ts = report["end"] if self.last_ts is None else max(self.last_ts, report["end"])
+        self.problems.update(report.get("problems", {}))
+        self.warnings.update(report.get("warnings", {}))
+        self.dtc_codes.update(report.get("dtc_codes", []))
+        for event in report.get("worst_events", []):
+            self._events += 1
+            entry = (event["score"], -self._events, event)
+            if len(self._worst) < self.top_n:
+                heapq.heappush(self._worst, entry)
+            elif entry > self._worst[0]:
+                heapq.heapreplace(self._worst, entry)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "vehicle_id": self.vehicle_id,
+            "samples": self.samples,
+            "invalid_samples": self.invalid,
+            "first_sample": self.first_ts,
+            "last_sample": self.last_ts,
+            "last_upload": self.last_seen,
+            "problems": dict(self.problems.most_common()),
+            "warnings": dict(self.warnings.most_common()),
+            "dtc_codes": sorted(self.dtc_codes),
+            "worst_events": [event for _, _, event in sorted(self._worst, reverse=True)],
+        }
+
+
+class TelemetryStore:
+    """Ultimele max_vehicles vehicule active (LRU)"""
+
+    def __init__(self, max_vehicles: int = 10000, top_n: int = DEFAULT_TOP_EVENTS):
+        self.max_vehicles = max_vehicles
+        self.top_n = top_n
+        self._vehicles: "OrderedDict[str, VehicleTelemetry]" = OrderedDict()
+        self.evicted = 0
+
+    def merge(self, vehicle_id: str, result: Dict[str, Any]):
+        vehicle = self._vehicles.get(vehicle_id)
+        if vehicle is None:
+            vehicle = self._vehicles[vehicle_id] = VehicleTelemetry(vehicle_id, self.top_n)
+            while len(self._vehicles) > self.max_vehicles:
+                self._vehicles.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._vehicles.move_to_end(vehicle_id)
+        vehicle.merge(result)
+
+    def get(self, vehicle_id: str) -> Optional[VehicleTelemetry]:
+        return self._vehicles.get(vehicle_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"vehicles": len(self._vehicles), "max_vehicles": self.max_vehicles, "evicted": self.evicted}
+
+
+def create_telemetry_store() -> TelemetryStore:
+    return TelemetryStore(max_vehicles=int(os.getenv("TELEMETRY_MAX_VEHICLES", "10000")))
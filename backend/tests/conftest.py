@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modulele backend-ului se importă direct (ca în benchmarks/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,72 @@
+import pytest
+
+from ai_json import JSONObjectScanner, _as_number, extract_json_object, normalize_diagnostic, repair_json
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1.200 RON", 1200.0),
+    ("1,200 RON", 1200.0),
+    ("2,500 lei", 2500.0),
+    ("1,200.50 RON", 1200.5),
+    ("1.200,50 lei", 1200.5),
+    ("1 200,50 lei", 1200.5),
+    ("1200,50 lei", 1200.5),
+    ("1.200.000", 1200000.0),
+    ("0,850", 0.85),
+    ("12,5", 12.5),
+    ("350 RON.", 350.0),
+    ("85%", 85.0),
+])
+def test_as_number_handles_separators(text, expected):
+    assert _as_number(text) == expected
+
+
+@pytest.mark.parametrize("text", ["1,2,3", "1,20.5", "1.2.3", "fără preț"])
+def test_as_number_rejects_ambiguous(text):
+    assert _as_number(text) is None
+
+
+def test_as_number_types():
+    assert _as_number(True) is None
+    assert _as_number(7) == 7.0
+
+
+def test_extract_skips_prose_braces():
+    text = 'Text {with braces} then {"diagnostic": "Termostat", "total_price": 900}'
+    assert extract_json_object(text) == {"diagnostic": "Termostat", "total_price": 900}
+
+
+def test_extract_from_code_fence_with_repairs():
+    text = "Iată:\n```json\n{'problems': ['Baterie'], 'ok': True, 'x': None,}\n```"
+    assert extract_json_object(text) == {"problems": ["Baterie"], "ok": True, "x": None}
+
+
+def test_extract_truncated_keeps_complete_items():
+    assert extract_json_object('{"problems": ["A", "B"], "diagnostic": "incomp') == {"problems": ["A", "B"]}
+
+
+def test_extract_none_without_object():
+    assert extract_json_object("nimic aici") is None
+    assert extract_json_object("") is None
+
+
+def test_scanner_is_incremental():
+    scanner = JSONObjectScanner()
+    assert scanner.feed('prefix {"a": "}') is None
+    assert scanner.feed('", "b": [1, 2]} rest') == '{"a": "}", "b": [1, 2]}'
+
+
+def test_repair_json_trailing_commas():
+    assert repair_json('{"a": [1, 2,], }') == '{"a": [1, 2] }'
+
+
+def test_normalize_diagnostic():
+    result = normalize_diagnostic(
+        {"problems": "Baterie slabă; Alternator", "total_price": "1,200.50 RON", "ai_confidence": "85"},
+        {"solutions": ["Verificare"]},
+    )
+    assert result["problems"] == ["Baterie slabă", "Alternator"]
+    assert result["diagnostic"] == "Baterie slabă; Alternator"
+    assert result["total_price"] == 1200.5
+    assert result["ai_confidence"] == 0.85
+    assert result["solutions"] == ["Verificare"]
@@ -0,0 +1,91 @@
+import asyncio
+import zlib
+
+from compression import CompressionMiddleware, ResponseCompressor, parse_accept_encoding
+
+JSON = [(b"content-type", b"application/json")]
+
+
+def gzip_only(**kwargs):
+    return ResponseCompressor(preference=("gzip",), **kwargs)
+
+
+def call(compressor, bodies, accept="gzip", headers=JSON, status=200):
+    """Rulează middleware-ul peste o aplicație care trimite bodies; întoarce mesajele trimise"""
+    sent = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": list(headers)})
+        for index, body in enumerate(bodies):
+            await send({"type": "http.response.body", "body": body, "more_body": index < len(bodies) - 1})
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept.encode())] if accept else []}
+    asyncio.run(CompressionMiddleware(app, compressor)(scope, None, send))
+    return sent
+
+
+def headers_of(messages):
+    return {key.decode(): value.decode() for key, value in messages[0]["headers"]}
+
+
+def test_parse_accept_encoding_q_values():
+    assert parse_accept_encoding("gzip, br;q=0.9, *;q=0, zstd;q=bad") == {
+        "gzip": 1.0, "br": 0.9, "*": 0.0, "zstd": 0.0
+    }
+
+
+def test_negotiation_honours_q_zero_and_wildcard():
+    compressor = gzip_only()
+    assert compressor.negotiate("gzip;q=0, identity") is None
+    assert compressor.negotiate("*") == "gzip"
+    assert compressor.negotiate("*;q=0.5, gzip;q=0") is None
+    assert compressor.negotiate("br") is None
+    assert compressor.negotiate(None) is None
+
+
+def test_small_body_passes_through_with_vary():
+    sent = call(gzip_only(min_size=1024), [b'{"ok": true}'])
+    headers = headers_of(sent)
+    assert "content-encoding" not in headers and headers["vary"] == "Accept-Encoding"
+    assert sent[1]["body"] == b'{"ok": true}'
+
+
+def test_whole_body_is_compressed_and_strong_etag_weakened():
+    body = b'{"problems": ["' + b"supraincalzire motor " * 200 + b'"]}'
+    compressor = gzip_only(min_size=100)
+    sent = call(compressor, [body], headers=JSON + [(b"etag", b'"abc"'), (b"content-length", str(len(body)).encode())])
+    headers = headers_of(sent)
+    assert headers["content-encoding"] == "gzip" and headers["etag"] == 'W/"abc"'
+    assert int(headers["content-length"]) == len(sent[1]["body"]) < len(body)
+    assert zlib.decompress(sent[1]["body"], 16 + zlib.MAX_WBITS) == body
+    assert compressor.stats()["by_encoding"]["gzip"]["responses"] == 1
+
+
+def test_weak_etag_and_existing_vary_are_kept():
+    sent = call(gzip_only(min_size=10), [b"x" * 100],
+                headers=JSON + [(b"etag", b'W/"v1"'), (b"vary", b"Origin")])
+    headers = headers_of(sent)
+    assert headers["etag"] == 'W/"v1"' and headers["vary"] == "Origin, Accept-Encoding"
+
+
+def test_streaming_flushes_every_chunk():
+    lines = [b'{"vehicle": %d, "total": 850.0}\n' % i for i in range(3)]
+    sent = call(gzip_only(min_size=10), lines, headers=[(b"content-type", b"application/x-ndjson")])
+    assert "content-length" not in headers_of(sent)
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # Fiecare bucată se decomprimă imediat în linia ei (flush sincron), fără să aștepte finalul
+    for line, message in zip(lines, sent[1:]):
+        assert decoder.decompress(message["body"]) == line
+    assert [m["more_body"] for m in sent[1:]] == [True, True, False]
+    assert decoder.eof
+
+
+def test_not_compressed_without_accept_encoding_or_for_binary_types():
+    body = b"x" * 5000
+    assert call(gzip_only(), [body], accept=None)[1]["body"] == body
+    compressor = gzip_only()
+    sent = call(compressor, [body], headers=[(b"content-type", b"application/vnd.obd2-batch")])
+    assert "content-encoding" not in headers_of(sent) and compressor.skipped_type == 1
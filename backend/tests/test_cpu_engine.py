@@ -0,0 +1,27 @@
+from cpu_engine import DiagnosticClassifier
+from pricing import DEFAULT_TABLE_PATH, PricingEngine
+
+OVERHEATING = {"simptome": ["temperatură mare"], "coduri_dtc": ["P0217"]}
+RESPONSE = {"problems": ["Supraîncălzire motor - termostat blocat"], "solutions": ["Înlocuire termostat"]}
+
+
+def trained(pricer=None):
+    classifier = DiagnosticClassifier(min_support=2, pricer=pricer)
+    # Un BMW nou și o Dacia veche cu aceeași problemă și prețuri foarte diferite
+    classifier.learn({"car_type": "bmw", "year": 2022, **OVERHEATING}, {**RESPONSE, "total_price": 5000})
+    classifier.learn({"car_type": "dacia", "year": 2008, **OVERHEATING}, {**RESPONSE, "total_price": 400})
+    return classifier
+
+
+def test_price_comes_from_pricing_engine_for_requested_vehicle():
+    engine = PricingEngine(DEFAULT_TABLE_PATH, reload_interval=3600)
+    classifier = trained(lambda car, obd2: engine.quote(car, obd2)["total"])
+    for car in ({"car_type": "dacia", "year": 2010, **OVERHEATING}, {"car_type": "bmw", "year": 2021, **OVERHEATING}):
+        result = classifier.predict(car)
+        assert result["problems"] == RESPONSE["problems"]
+        assert result["total_price"] == round(engine.quote(car)["total"], 2)
+
+
+def test_without_pricer_labels_do_not_set_price():
+    result = trained().predict({"car_type": "dacia", "year": 2010, **OVERHEATING})
+    assert result["total_price"] == 0.0 and "price_range" not in result
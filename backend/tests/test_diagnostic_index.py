@@ -0,0 +1,19 @@
+from diagnostic_index import DiagnosticIndex, partition_key, vehicle_identified
+
+SYMPTOMS = {"simptome": ["rateuri motor la ralanti"], "coduri_dtc": ["P0300"]}
+
+
+def test_default_vehicle_fields_are_not_identified():
+    unknown = {"car_type": "standard", "model": "Unknown", "year": 2023}
+    assert partition_key(unknown) == partition_key({"car_type": "", "model": ""})
+    assert not vehicle_identified(unknown)
+    assert vehicle_identified({"car_type": "VW", "model": "Golf"})
+
+
+def test_query_stays_within_make_model_partition():
+    index = DiagnosticIndex(max_entries=100)
+    index.add("logan", {"car_type": "dacia", "model": "logan", "year": 2015, **SYMPTOMS}, {"problems": ["Bujii"]})
+    golf = index.query({"car_type": "volkswagen", "model": "golf", "year": 2015, **SYMPTOMS}, min_score=0.0)
+    logan = index.query({"car_type": "Dacia", "model": "Logan", "year": 2016, **SYMPTOMS}, min_score=0.0)
+    assert golf == []
+    assert logan[0].entry_id == "logan" and logan[0].score > 0.9
@@ -0,0 +1,91 @@
+import json
+import random
+
+import pytest
+
+from fleet_stats import CountMinSketch, FleetStats, HyperLogLog, QuantileSketch
+
+
+def test_count_min_never_underestimates_and_merges():
+    left, right = CountMinSketch(width=256, depth=4), CountMinSketch(width=256, depth=4)
+    for i in range(2000):
+        left.add(f"P{i % 300:04d}")
+    right.add("P0001", 50)
+    assert left.estimate("P0001") >= 7
+    left.merge(right)
+    restored = CountMinSketch.from_dict(json.loads(json.dumps(left.to_dict())))
+    assert restored.estimate("P0001") == left.estimate("P0001") >= 57
+    assert restored.total == left.total
+
+
+def test_quantiles_within_relative_error():
+    rng = random.Random(3)
+    values = [rng.uniform(600, 6500) for _ in range(20000)]
+    sketch = QuantileSketch(alpha=0.01)
+    for value in values:
+        sketch.add(value)
+    ordered = sorted(values)
+    for q in (0.5, 0.95, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - exact) / exact <= 0.02
+
+
+def test_add_many_matches_add_and_merge_matches_single_sketch():
+    values = [-3.5, 0.0, 0.2, 12.0, 90.5, 90.5, float("nan"), 4200.0]
+    one, bulk = QuantileSketch(), QuantileSketch()
+    for value in values:
+        one.add(value)
+    bulk.add_many(values)
+    assert bulk.to_dict() == one.to_dict()
+
+    first, second = QuantileSketch(), QuantileSketch()
+    first.add_many(values[:4])
+    second.add_many(values[4:])
+    first.merge(second)
+    assert first.to_dict() == one.to_dict()
+    assert QuantileSketch.from_dict(one.to_dict()).quantile(0.5) == one.quantile(0.5)
+    with pytest.raises(ValueError):
+        first.merge(QuantileSketch(alpha=0.05))
+
+
+def test_collapse_keeps_bucket_count_bounded():
+    values = [1.01 ** i for i in range(2000)]
+    sketch = QuantileSketch(alpha=0.01, max_buckets=32)
+    sketch.add_many(values)
+    assert len(sketch.positive) <= 32 and sketch.count == 2000
+    # Se unesc bucketele mici: quantilele mari rămân în eroarea relativă
+    exact = values[int(0.99 * (len(values) - 1))]
+    assert abs(sketch.quantile(0.99) - exact) / exact <= 0.02
+
+
+def test_hyperloglog_count_and_merge():
+    left, right = HyperLogLog(p=12), HyperLogLog(p=12)
+    for i in range(6000):
+        left.add(f"vin:{i}")
+    for i in range(4000, 10000):
+        right.add(f"vin:{i}")
+    left.merge(right)
+    assert abs(left.count() - 10000) / 10000 < 0.05
+    assert HyperLogLog.from_dict(left.to_dict()).count() == left.count()
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(p=8))
+
+
+def test_snapshot_merge_combines_instances():
+    a, b = FleetStats(), FleetStats()
+    car = {"car_type": "Dacia", "model": "Logan", "year": 2012, "coduri_dtc": ["P0300"]}
+    a.record_diagnostic({**car, "vin": "UU1AAA"})
+    b.record_diagnostic({**car, "vin": "UU1BBB", "coduri_dtc": ["P0300", "P0171"]})
+    b.record_samples("Dacia", "Logan", [{"rpm": 800 + i, "coolant_temp": 90} for i in range(100)])
+
+    merged = FleetStats()
+    merged.merge_snapshot(json.loads(json.dumps(a.snapshot())))
+    merged.merge_snapshot(b.snapshot())
+    result = merged.query("Dacia", "Logan")
+    assert result["diagnostics"] == 2 and result["samples"] == 100
+    assert result["top_dtc"][0] == {"code": "P0300", "count": 2}
+    assert result["distinct_vehicles"] == 2
+    assert result["signals"]["rpm"]["count"] == 100
+
+    with pytest.raises(ValueError):
+        merged.merge_snapshot({"version": -1})
@@ -0,0 +1,86 @@
+from history_store import DiagnosticHistoryStore, input_fingerprint, vehicle_key
+
+CAR = {"car_type": "dacia", "model": "logan", "year": 2015, "mileage": 150000, "simptome": ["consum mare"]}
+
+
+def make_store(tmp_path):
+    store = DiagnosticHistoryStore(str(tmp_path / "history.db"))
+    store.start()
+    return store
+
+
+def record(store, car, engine="openai"):
+    fingerprint = input_fingerprint(car)
+    diagnostic_id = store.record(car, {"ai_engine_used": engine, "total_price": 500}, fingerprint)
+    return fingerprint, diagnostic_id
+
+
+def flush(store):
+    store.stop()
+    store.start()
+
+
+def test_reuse_requires_same_user_or_session(tmp_path):
+    store = make_store(tmp_path)
+    fingerprint, diagnostic_id = record(store, {**CAR, "user_id": "ana", "session_id": "s1"})
+    flush(store)
+
+    assert store.find_reusable(fingerprint) is None
+    assert store.find_reusable(fingerprint, user_id="mihai") is None
+    assert store.find_reusable(fingerprint, user_id="ana")["diagnostic_id"] == diagnostic_id
+    assert store.find_reusable(fingerprint, session_id="s1")["diagnostic_id"] == diagnostic_id
+    store.stop()
+
+
+def test_reuse_skips_fallback_engines(tmp_path):
+    store = make_store(tmp_path)
+    fingerprint, _ = record(store, {**CAR, "user_id": "ana"}, engine="smart_diagnostic")
+    flush(store)
+
+    assert store.find_reusable(fingerprint, user_id="ana", exclude_engines=["smart_diagnostic"]) is None
+    assert store.find_reusable(fingerprint, user_id="ana") is not None
+    store.stop()
+
+
+def test_vehicle_history_without_vin_is_scoped_and_stripped(tmp_path):
+    store = make_store(tmp_path)
+    record(store, {**CAR, "user_id": "ana"})
+    record(store, {**CAR, "user_id": "mihai", "simptome": ["rateuri"]})
+    flush(store)
+
+    key = vehicle_key(CAR)
+    assert store.vehicle_history(key) == []
+    rows = store.vehicle_history(key, user_id="ana")
+    assert len(rows) == 1
+    assert "user_id" not in rows[0] and "session_id" not in rows[0] and "request" not in rows[0]
+    assert rows[0]["symptoms"] == ["consum mare"]
+    store.stop()
+
+
+def test_vehicle_history_by_vin_is_shared_but_stripped(tmp_path):
+    store = make_store(tmp_path)
+    car = {**CAR, "vin": "uu1abc", "user_id": "ana"}
+    record(store, car)
+    flush(store)
+
+    rows = store.vehicle_history(vehicle_key(car))
+    assert len(rows) == 1 and rows[0]["vehicle_key"] == "vin:UU1ABC"
+    assert "user_id" not in rows[0]
+    store.stop()
+
+
+def test_get_by_id_exposes_request_only_to_owner(tmp_path):
+    store = make_store(tmp_path)
+    _, diagnostic_id = record(store, {**CAR, "user_id": "ana", "session_id": "s1", "vin": "UU1SECRET"})
+    flush(store)
+
+    for caller in ({}, {"user_id": "mihai"}, {"session_id": "s2"}):
+        entry = store.get(diagnostic_id, **caller)
+        assert entry["diagnostic_id"] == diagnostic_id
+        assert not {"user_id", "session_id", "request"} & set(entry)
+        assert "UU1SECRET" not in str(entry)
+
+    assert store.get(diagnostic_id, user_id="ana")["request"]["vin"] == "UU1SECRET"
+    assert store.get(diagnostic_id, session_id="s1")["user_id"] == "ana"
+    assert store.get("missing") is None
+    store.stop()
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from job_queue import FairJobQueue, JobQueueFull
+from tracing import current_trace, span, start_trace
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_round_robin_between_users():
+    order = []
+
+    async def handler(payload):
+        order.append(payload)
+
+    async def scenario():
+        queue = FairJobQueue(handler, workers=1)
+        jobs = [queue.submit(f"a{i}", "a") for i in range(3)] + [queue.submit("b0", "b")]
+        while not all(job.finished for job in jobs):
+            await asyncio.sleep(0.001)
+        await queue.stop()
+
+    run(scenario())
+    assert order.index("b0") < order.index("a2")
+
+
+def test_per_user_cap_rejects():
+    async def handler(payload):
+        await asyncio.sleep(1)
+
+    async def scenario():
+        queue = FairJobQueue(handler, workers=1, max_per_user=2)
+        queue.submit(1, "a")
+        queue.submit(2, "a")
+        with pytest.raises(JobQueueFull) as error:
+            queue.submit(3, "a")
+        queue.submit(4, "b")
+        await queue.stop()
+        return error.value
+
+    assert run(scenario()).per_user
+
+
+def test_workers_do_not_inherit_request_trace():
+    seen = []
+
+    async def handler(payload):
+        seen.append(current_trace())
+        with span("job"):
+            pass
+
+    async def scenario():
+        queue = FairJobQueue(handler, workers=2)
+        # Primul submit (care pornește workerii) vine dintr-o cerere trasată
+        trace = start_trace("POST /api/v1/diagnostic")
+        first = queue.submit("traced", "a")
+        trace.finish()
+        jobs = [first] + [queue.submit(i, f"u{i}") for i in range(5)]
+        while not all(job.finished for job in jobs):
+            await asyncio.sleep(0.001)
+        await queue.stop()
+        return trace
+
+    assert run(scenario()).spans == []
+    assert seen == [None] * 6
+
+
+def test_finished_trace_ignores_late_spans():
+    async def scenario():
+        trace = start_trace("GET /")
+        with span("inside"):
+            pass
+        trace.finish()
+        with span("late"):
+            pass
+        return trace
+
+    assert [s["name"] for s in run(scenario()).spans] == ["inside"]
+
+
+def test_public_job_payload_has_no_user_id():
+    async def handler(payload):
+        return {"ok": payload}
+
+    async def scenario():
+        queue = FairJobQueue(handler, workers=1)
+        job = queue.submit(1, "10.0.0.7")
+        while not job.finished:
+            await asyncio.sleep(0.001)
+        await queue.stop()
+        return job.to_dict()
+
+    payload = run(scenario())
+    assert payload["result"] == {"ok": 1}
+    assert "user_id" not in payload and "10.0.0.7" not in str(payload)
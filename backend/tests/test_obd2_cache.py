@@ -0,0 +1,35 @@
+import asyncio
+
+from obd2_cache import DtcCache
+
+MIL_OFF = {"response": "41 01 00 07 E5 00"}
+
+
+def read_dtc():
+    return {"codes": ["P0300"]}
+
+
+def test_sessions_are_bounded_least_recently_used_first():
+    cache = DtcCache(max_sessions=2)
+
+    async def scenario():
+        await cache.get("a", read_dtc, lambda: MIL_OFF)
+        await cache.get("b", read_dtc, lambda: MIL_OFF)
+        await cache.get("a", read_dtc, lambda: MIL_OFF)
+        await cache.get("c", read_dtc, lambda: MIL_OFF)
+
+    asyncio.run(scenario())
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_repeat_poll_is_served_from_cache():
+    cache = DtcCache(refresh_interval=60, mil_interval=60, max_sessions=1)
+
+    async def scenario():
+        await cache.get("a", read_dtc, lambda: MIL_OFF)
+        return await cache.get("a", read_dtc, lambda: MIL_OFF)
+
+    data, meta = asyncio.run(scenario())
+    assert data == {"codes": ["P0300"]} and meta["cached"]
+    assert cache.reads == 1 and cache.hits == 1
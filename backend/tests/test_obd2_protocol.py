@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+
+from obd2_protocol import (
+    BATCH_HEADER, BATCH_RECORD, FLAG_ABSOLUTE_TS, FLAG_DEFLATE, HEADER, LiveFrameDecoder, LiveFrameEncoder,
+    check_batch_header, decode_batch_records, encode_batch
+)
+from obd2_sample import LiveSample
+
+T0 = 1_760_000_000.0
+
+
+def sample(offset: float, **values) -> LiveSample:
+    return LiveSample(rpm=850, speed=32, coolant_temp=92, maf=4.7, battery_voltage=13.82,
+                      oxygen_sensor_voltage=0.451, timestamp=T0 + offset, **values)
+
+
+def flags(frame: bytes) -> int:
+    return HEADER.unpack_from(frame)[1]
+
+
+def test_frames_use_delta_timestamps_after_the_first():
+    encoder, decoder = LiveFrameEncoder(), LiveFrameDecoder()
+    frames = [encoder.encode(sample(i * 0.1)) for i in range(3)]
+    # Pauză peste 65.535 s: delta nu mai încape în 16 biți -> timestamp absolut
+    frames.append(encoder.encode(sample(100.0)))
+
+    assert [bool(flags(frame) & FLAG_ABSOLUTE_TS) for frame in frames] == [True, False, False, True]
+    assert len(frames[1]) < len(frames[0])
+    decoded = [decoder.decode(frame) for frame in frames]
+    assert [d["sequence"] for d in decoded] == [0, 1, 2, 3]
+    assert [d["timestamp"] for d in decoded] == [
+        datetime.fromtimestamp(round((T0 + offset) * 1000) / 1000).isoformat() for offset in (0, 0.1, 0.2, 100.0)
+    ]
+    assert decoded[1]["rpm"] == 850 and decoded[1]["battery_voltage"] == 13.82
+    assert decoded[1]["oxygen_sensor_voltage"] == 0.451 and decoded[1]["maf"] == 4.7
+
+
+def test_delta_frame_before_absolute_is_rejected():
+    encoder = LiveFrameEncoder()
+    encoder.encode(sample(0))
+    with pytest.raises(ValueError):
+        LiveFrameDecoder().decode(encoder.encode(sample(0.1)))
+
+
+def test_missing_dict_fields_encode_as_zero_and_values_saturate():
+    decoded = LiveFrameDecoder().decode(
+        LiveFrameEncoder().encode({"rpm": 99999, "coolant_temp": -40, "timestamp": int(T0 * 1000)})
+    )
+    assert decoded["rpm"] == 0xFFFF and decoded["coolant_temp"] == -40
+    assert decoded["speed"] == 0 and decoded["battery_voltage"] == 0 and decoded["engine_on"] is False
+
+
+def test_deflated_frames_share_the_compression_context():
+    encoder, plain = LiveFrameEncoder(deflate=True), LiveFrameEncoder()
+    decoder, reference = LiveFrameDecoder(encoder.schema_message()), LiveFrameDecoder()
+    for i in range(5):
+        frame = encoder.encode(sample(i * 0.1))
+        assert flags(frame) & FLAG_DEFLATE
+        assert decoder.decode(frame) == reference.decode(plain.encode(sample(i * 0.1)))
+
+
+def test_batch_round_trip():
+    samples = [sample(i * 0.1, engine_on=bool(i % 2)) for i in range(4)]
+    body = encode_batch(samples)
+    check_batch_header(body[:BATCH_HEADER.size])
+    decoded = list(decode_batch_records(body[BATCH_HEADER.size:]))
+    assert [s.to_dict() for s in decoded] == [s.to_dict() for s in samples]
+
+
+def test_bad_header_or_truncated_batch_raises():
+    body = encode_batch([sample(0), sample(0.1)])
+    with pytest.raises(ValueError):
+        check_batch_header(b"XXXX" + body[4:BATCH_HEADER.size])
+    with pytest.raises(ValueError):
+        check_batch_header(body[:BATCH_HEADER.size - 1])
+    with pytest.raises(ValueError):
+        list(decode_batch_records(body[BATCH_HEADER.size:-1]))
+    assert len(body) == BATCH_HEADER.size + 2 * BATCH_RECORD.size
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from pricing import DEFAULT_TABLE_PATH, PricingEngine, PricingTable
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return PricingEngine(DEFAULT_TABLE_PATH, reload_interval=3600)
+
+
+def test_unknown_brand_gets_default_category(engine):
+    lancia = engine.quote({"car_type": "Lancia", "model": "Ypsilon", "year": 2015})
+    assert lancia["brand"] is None and lancia["category"] == engine.table.default_category
+
+
+def test_fuzzy_make_does_not_change_category(engine):
+    # "Smart" nu devine SEAT, "Tesco" nu devine Tesla (preț electric)
+    assert engine.quote({"car_type": "Smart", "year": 2015})["brand"] is None
+    tesco = engine.quote({"car_type": "Tesco", "year": 2015})
+    assert tesco["brand"] is None and tesco["category"] == engine.table.default_category
+
+
+def test_quote_batch_matches_single_quotes(engine):
+    vehicles = [
+        {"car_type": "dacia", "model": "logan", "year": 2012, "mileage": 210000, "coduri_dtc": ["P0300"]},
+        {"car_type": "bmw", "model": "seria 3", "year": 2019, "simptome": ["consum mare"]},
+    ]
+    assert engine.quote_batch(vehicles) == [engine.quote(vehicle) for vehicle in vehicles]
+
+
+def test_dtc_and_symptom_costs_add_up(engine):
+    base = engine.quote({"car_type": "dacia", "year": 2015})
+    with_codes = engine.quote({"car_type": "dacia", "year": 2015, "coduri_dtc": ["P0171"], "simptome": ["a"]})
+    assert with_codes["dtc_cost"] > 0 and with_codes["symptom_cost"] > 0
+    assert with_codes["total"] > base["total"]
+
+
+def test_invalid_brackets_rejected():
+    with open(DEFAULT_TABLE_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    data["age_brackets"]["multipliers"] = data["age_brackets"]["multipliers"][:-1]
+    with pytest.raises(ValueError):
+        PricingTable(data)
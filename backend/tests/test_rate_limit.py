@@ -0,0 +1,52 @@
+import asyncio
+
+from rate_limit import ClientRateLimiter, EngineLimiter, RateLimiter, TokenBucket, parse_retry_after
+
+
+def test_token_bucket_burst_then_wait():
+    bucket = TokenBucket(capacity=2, rate=1.0)
+    assert bucket.consume()[0] and bucket.consume()[0]
+    allowed, wait = bucket.consume()
+    assert not allowed and 0 < wait <= 1.0
+
+
+def test_rate_limiter_evicts_oldest_keys():
+    limiter = RateLimiter(per_minute=60, burst=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.check(key)
+    assert limiter.stats()["tracked_clients"] == 2
+
+
+def test_rotating_user_ids_cannot_bypass_ip_bucket():
+    limiter = ClientRateLimiter(per_minute=1, burst=2, ip_factor=3)
+    results = [limiter.check("10.0.0.1", f"user-{i}")[0] for i in range(10)]
+    assert results.count(True) == 6
+    # Alt IP are propria găleată
+    assert limiter.check("10.0.0.2", "user-0")[0]
+
+
+def test_user_bucket_is_per_ip_and_user():
+    limiter = ClientRateLimiter(per_minute=1, burst=2, ip_factor=3)
+    assert [limiter.check("10.0.0.1", "ana")[0] for _ in range(3)] == [True, True, False]
+    assert limiter.check("10.0.0.1", "mihai")[0]
+    assert limiter.check("10.0.0.1")[0]
+
+
+def test_engine_limiter_cooldown_and_saturation():
+    async def scenario():
+        limiter = EngineLimiter({"openai": 1}, queue_timeout=0.01)
+        assert await limiter.acquire("openai")
+        assert not await limiter.acquire("openai")
+        limiter.release("openai")
+        limiter.cooldown("openai", 5)
+        assert not await limiter.acquire("openai")
+        return limiter.stats()["openai"]
+
+    stats = asyncio.run(scenario())
+    assert stats["rerouted"] == 1 and stats["cooldown_skips"] == 1 and stats["in_cooldown"]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", 30.0) == 30.0
+    assert parse_retry_after(None, 5.0) == 5.0
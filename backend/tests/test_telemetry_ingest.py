@@ -0,0 +1,69 @@
+import gzip
+import json
+
+import pytest
+
+from obd2_protocol import encode_batch
+from obd2_scenarios import get_cycle
+from telemetry_ingest import (
+    FORMAT_BINARY, FORMAT_NDJSON, BodyTooLarge, StreamDecoder, UnsupportedEncoding, analyze_block_task,
+    create_framer,
+)
+
+
+def samples(count):
+    cycle = get_cycle("city")
+    return [cycle.sample(i, 1.7e9 + i / 10) for i in range(count)]
+
+
+def frame(fmt, body, encoding="gzip", chunk=7000, block_bytes=16384):
+    decoder = StreamDecoder(encoding, 1 << 30)
+    framer = create_framer(fmt, block_bytes)
+    blocks = []
+    for start in range(0, len(body), chunk):
+        blocks.extend(framer.feed(decoder.feed(body[start:start + chunk])))
+    blocks.extend(framer.finish())
+    return blocks
+
+
+def test_gzip_bomb_is_stopped_while_inflating():
+    bomb = gzip.compress(b"\0" * (64 << 20))
+    decoder = StreamDecoder("gzip", 1 << 20)
+    with pytest.raises(BodyTooLarge):
+        decoder.feed(bomb[:65536])
+    assert decoder.bytes_out <= (1 << 20) + 1
+
+
+def test_identity_limit():
+    decoder = StreamDecoder(None, 10)
+    assert decoder.feed(b"12345") == b"12345"
+    with pytest.raises(BodyTooLarge):
+        decoder.feed(b"123456")
+
+
+def test_unsupported_encoding():
+    with pytest.raises(UnsupportedEncoding):
+        StreamDecoder("br", 100)
+
+
+@pytest.mark.parametrize("fmt", [FORMAT_NDJSON, FORMAT_BINARY])
+def test_framers_keep_every_sample(fmt):
+    batch = samples(3000)
+    if fmt == FORMAT_BINARY:
+        body = encode_batch(batch)
+    else:
+        body = "\n".join(json.dumps(sample.to_dict()) for sample in batch).encode()
+    blocks = frame(fmt, gzip.compress(body))
+    assert len(blocks) > 1
+    assert sum(count for _, count in blocks) == 3000
+
+    reports = [analyze_block_task(fmt, block, 10, True) for block, _ in blocks]
+    assert sum(r["report"]["samples"] for r in reports) == 3000
+    assert all(r["invalid"] == 0 and r["signal_sketches"] for r in reports)
+
+
+def test_ndjson_counts_invalid_lines():
+    body = b'{"rpm": 800, "speed": 0}\nnu e json\n{"rpm": 900}\n'
+    (block, count), = frame(FORMAT_NDJSON, body, encoding=None)
+    result = analyze_block_task(FORMAT_NDJSON, block)
+    assert count == 3 and result["invalid"] == 1 and result["report"]["samples"] == 2
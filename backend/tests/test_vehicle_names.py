@@ -0,0 +1,40 @@
+import pytest
+
+from vehicle_names import AliasTrie, clean_text, get_index, normalize_car_data
+
+
+@pytest.mark.parametrize("car_type, make", [
+    ("Dacia", "dacia"),
+    ("VW", "volkswagen"),
+    ("Mercedes Benz", "mercedes-benz"),
+    ("Renalt", "renault"),
+    ("Volkswagn", "volkswagen"),
+    ("bmv", "bmw"),
+])
+def test_known_makes_and_single_typos(car_type, make):
+    assert get_index().normalize(car_type, "x").make == make
+
+
+@pytest.mark.parametrize("car_type", ["Lancia", "Tesco", "Smart", "Dacai"])
+def test_unknown_brands_are_not_remapped(car_type):
+    name = get_index().normalize(car_type, "x")
+    assert name.make is None
+    assert name.key == f"{clean_text(car_type)}|x"
+
+
+def test_make_written_in_model_field():
+    name = normalize_car_data({"car_type": "standard", "model": "VW Golf", "year": 2015})
+    assert name.make == "volkswagen" and name.model == "golf"
+
+
+def test_clean_text_strips_diacritics_and_punctuation():
+    assert clean_text("Škoda  Octavia-RS") == "skoda octavia rs"
+
+
+def test_alias_trie_matches_all_within_limit():
+    trie = AliasTrie()
+    for alias in ("seat", "smart", "skoda"):
+        trie.add(alias, alias)
+    assert trie.matches("seet", 1) == {"seat": 1}
+    assert trie.fuzzy("skod", 1) == (1, "skoda")
+    assert trie.matches("xeat", 1, same_first=True) == {}
@@ -0,0 +1,147 @@
+"""
+⏱️ TRASARE PER CERERE (SPAN-URI)
+Activată per cerere prin headerul X-Trace: etapele diagnosticului și fiecare
+apel de motor AI își înregistrează durata. Rezultatul se întoarce în headerul
+standard Server-Timing (vizibil în DevTools) și se păstrează pentru
+/api/v1/admin/traces. Fără trasare activă, span() nu costă aproape nimic.
+"""
+
+import contextvars
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any, Dict, List
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Trace:
+    """Span-urile unei cereri"""
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.id = trace_id or uuid.uuid4().hex[:16]
+        self.name = name
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.duration_ms: Optional[float] = None
+
+    def offset_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def finish(self):
+        self.duration_ms = round(self.offset_ms(), 3)
+
+    def server_timing(self, limit: int = 30) -> str:
+        """Valoarea headerului Server-Timing (numele sunt token-uri HTTP)"""
+        entries = []
+        for i, span in enumerate(self.spans[:limit]):
+            if span["duration_ms"] is None:
+                continue
+            token = "".join(c if c.isalnum() or c in "-_." else "." for c in span["name"])
+            entries.append(f'{i}.{token};dur={span["duration_ms"]}')
+        if self.duration_ms is not None:
+            entries.append(f"total;dur={self.duration_ms}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "spans": self.spans,
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "record", "_token")
+
+    def __init__(self, trace: Trace, name: str, attrs: Dict[str, Any]):
+        self.trace = trace
+        parent = _current_span.get()
+        self.record = {
+            "id": len(trace.spans),
+            "parent": parent["id"] if parent else None,
+            "name": name,
+            "start_ms": 0.0,
+            "duration_ms": None,
+            **({"attrs": attrs} if attrs else {}),
+        }
+        trace.spans.append(self.record)
+
+    def set(self, **attrs: Any):
+        self.record.setdefault("attrs", {}).update(attrs)
+
+    def __enter__(self):
+        self.record["start_ms"] = round(self.trace.offset_ms(), 3)
+        self._token = _current_span.set(self.record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record["duration_ms"] = round(self.trace.offset_ms() - self.record["start_ms"], 3)
+        if exc_type is not None:
+            self.set(error=exc_type.__name__)
+        _current_span.reset(self._token)
+        return False
+
+
+class _NoSpan:
+    """Span inactiv (cererea nu e trasată)"""
+
+    __slots__ = ()
+
+    def set(self, **attrs: Any):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, **attrs: Any):
+    """with span("etapă"): ... — înregistrată doar dacă cererea curentă e trasată"""
+    trace = _current_trace.get()
+    if trace is None or trace.duration_ms is not None:
+        # O trasare încheiată nu mai primește span-uri (task-uri care i-au moștenit contextul)
+        return _NO_SPAN
+    return _Span(trace, name, attrs)
+
+
+def start_trace(name: str, trace_id: Optional[str] = None) -> Trace:
+    trace = Trace(name, trace_id)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+class TraceStore:
+    """Ultimele N trasări, pentru inspecție ulterioară"""
+
+    def __init__(self, capacity: int = 200):
+        self.capacity = capacity
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+
+    def add(self, trace: Trace):
+        self._traces[trace.id] = trace
+        while len(self._traces) > self.capacity:
+            self._traces.popitem(last=False)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        return self._traces.get(trace_id)
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        traces = list(self._traces.values())[-limit:]
+        return [
+            {"trace_id": t.id, "name": t.name, "started_at": t.started_at, "duration_ms": t.duration_ms}
+            for t in reversed(traces)
+        ]
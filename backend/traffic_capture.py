@@ -0,0 +1,187 @@
+"""
+🎥 CAPTURĂ DE TRAFIC PENTRU TESTE DE REGRESIE DE PERFORMANȚĂ
+Mod opțional (CAPTURE_ENABLED=true): cererile eșantionate către
+/api/v1/diagnostic și comenzile OBD2, plus cronologia mesajelor /ws/obd2,
+sunt scrise în NDJSON comprimat gzip, cu decalajul de timp față de începutul
+capturii. Scrierea se face pe un thread dedicat, printr-o coadă (nu blochează
+event loop-ul); fișierele se rotesc după dimensiune.
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from typing import Optional, Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATHS = ["/api/v1/diagnostic", "/api/v1/obd2/command", "/api/v1/obd2/data", "/ws/obd2"]
+# Doar aceste headere sunt păstrate (identitatea clientului pentru rate limiting, tipul conținutului)
+KEPT_HEADERS = ("content-type", "x-user-id", "accept", "if-none-match")
+
+
+class TrafficRecorder:
+    """Eșantionare + coadă de scriere către fișiere .ndjson.gz rotite"""
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float = 0.1,
+        paths: List[str] = None,
+        max_body_bytes: int = 1024 * 1024,
+        max_file_bytes: int = 64 * 1024 * 1024,
+        queue_size: int = 10000,
+    ):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.paths = paths or DEFAULT_PATHS
+        self.max_body_bytes = max_body_bytes
+        self.max_file_bytes = max_file_bytes
+        self.started = time.monotonic()
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._rng = random.Random()
+        self.captured = 0
+        self.dropped = 0
+        self.files: List[str] = []
+        os.makedirs(directory, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Eșantionare și înregistrare (apelate din event loop)
+    # ------------------------------------------------------------------
+
+    def should_capture(self, path: str) -> bool:
+        return any(path.startswith(prefix) for prefix in self.paths) and self._rng.random() < self.sample_rate
+
+    def offset(self) -> float:
+        """Secunde de la pornirea capturii (baza cronologiei pentru replay)"""
+        return round(time.monotonic() - self.started, 6)
+
+    def _put(self, record: Dict[str, Any]):
+        if self._writer is None:
+            self.start()
+        try:
+            self._queue.put_nowait(record)
+            self.captured += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def record_http(
+        self,
+        offset: float,
+        method: str,
+        path: str,
+        query: str,
+        headers: Dict[str, str],
+        body: bytes,
+        status: int,
+        duration_ms: float,
+    ):
+        self._put({
+            "type": "http",
+            "t": offset,
+            "ts": time.time(),
+            "method": method,
+            "path": path,
+            "query": query,
+            "headers": {k: v for k, v in headers.items() if k.lower() in KEPT_HEADERS},
+            "body": body[:self.max_body_bytes].decode("utf-8", errors="replace") if body else "",
+            "status": status,
+            "duration_ms": round(duration_ms, 3),
+        })
+
+    def new_ws_connection(self, path: str, subprotocol: Optional[str]) -> Optional[str]:
+        """Id-ul conexiunii capturate, sau None dacă nu e eșantionată"""
+        if not self.should_capture(path):
+            return None
+        conn_id = uuid.uuid4().hex[:12]
+        self._put({"type": "ws", "conn": conn_id, "t": self.offset(), "event": "connect",
+                   "path": path, "subprotocol": subprotocol})
+        return conn_id
+
+    def record_ws(self, conn_id: Optional[str], event: str, data: str = ""):
+        """Mesaje primite de la client („message”) și deconectarea"""
+        if conn_id:
+            self._put({"type": "ws", "conn": conn_id, "t": self.offset(), "event": event, "data": data})
+
+    # ------------------------------------------------------------------
+    # Scriere (thread dedicat)
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._writer and self._writer.is_alive():
+            return
+        self._writer = threading.Thread(target=self._write_loop, name="traffic-capture", daemon=True)
+        self._writer.start()
+        logger.info(f"🎥 Captură trafic activă: {self.directory} (eșantion {self.sample_rate:.0%})")
+
+    def stop(self, timeout: float = 5.0):
+        if self._writer and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout)
+
+    def _open(self):
+        path = os.path.join(self.directory, f"capture-{time.strftime('%Y%m%d-%H%M%S')}-{len(self.files)}.ndjson.gz")
+        self.files.append(path)
+        raw = open(path, "wb")
+        return raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6)
+
+    def _write_loop(self):
+        raw, out = self._open()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+            lines = "".join(
+                json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                for record in batch if record is not None
+            )
+            try:
+                out.write(lines.encode("utf-8"))
+                # Membru gzip complet pe disc după fiecare lot (captura rămâne citibilă la crash)
+                out.flush()
+                if raw.tell() >= self.max_file_bytes:
+                    out.close()
+                    raw.close()
+                    raw, out = self._open()
+            except OSError as e:
+                logger.error(f"Eroare scriere captură: {e}")
+        out.close()
+        raw.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "sample_rate": self.sample_rate,
+            "paths": self.paths,
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "files": self.files[-5:],
+        }
+
+
+def create_recorder() -> Optional[TrafficRecorder]:
+    """Recorder din variabilele de mediu; None dacă captura nu e activată"""
+    if os.getenv("CAPTURE_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        return None
+    paths = [p.strip() for p in os.getenv("CAPTURE_PATHS", "").split(",") if p.strip()]
+    return TrafficRecorder(
+        directory=os.getenv(
+            "CAPTURE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "captures")
+        ),
+        sample_rate=float(os.getenv("CAPTURE_SAMPLE_RATE", "0.1")),
+        paths=paths or DEFAULT_PATHS,
+        max_body_bytes=int(os.getenv("CAPTURE_MAX_BODY_BYTES", str(1024 * 1024))),
+    )
@@ -0,0 +1,348 @@
+"""
+🚗 NORMALIZARE MARCĂ / MODEL / GENERAȚIE
+Tabel de alias-uri („VW”, „Volkswagen”, „vw golf”, „Merc”) compilat o singură
+dată într-un trie; potrivirea aproximativă acceptă o distanță de editare
+limitată (greșeli de tastare), iar generația se găsește prin căutare binară
+după anul fabricației. Cheile canonice alimentează cache-urile (istoric,
+similaritate), tabelul de prețuri și promptul AI.
+"""
+
+import os
+import unicodedata
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Optional, Any, Dict, List, NamedTuple, Tuple
+
+# marcă canonică -> (nume afișat, alias-uri)
+MAKES: Dict[str, Tuple[str, List[str]]] = {
+    "volkswagen": ("Volkswagen", ["vw", "volkswagen", "volkswagon", "vokswagen", "v w"]),
+    "mercedes-benz": ("Mercedes-Benz", ["mercedes", "mercedes benz", "merc", "mb", "benz"]),
+    "bmw": ("BMW", ["bmw", "beemer"]),
+    "audi": ("Audi", ["audi"]),
+    "porsche": ("Porsche", ["porsche", "porshe"]),
+    "dacia": ("Dacia", ["dacia"]),
+    "skoda": ("Škoda", ["skoda"]),
+    "renault": ("Renault", ["renault", "renaut"]),
+    "toyota": ("Toyota", ["toyota"]),
+    "honda": ("Honda", ["honda"]),
+    "tesla": ("Tesla", ["tesla"]),
+    "ford": ("Ford", ["ford"]),
+    "opel": ("Opel", ["opel", "vauxhall"]),
+    "peugeot": ("Peugeot", ["peugeot", "pegeot", "peugot"]),
+    "citroen": ("Citroën", ["citroen"]),
+    "hyundai": ("Hyundai", ["hyundai", "hyndai", "hiundai"]),
+    "kia": ("Kia", ["kia"]),
+    "nissan": ("Nissan", ["nissan"]),
+    "fiat": ("Fiat", ["fiat"]),
+    "volvo": ("Volvo", ["volvo"]),
+    "mazda": ("Mazda", ["mazda"]),
+    "seat": ("SEAT", ["seat"]),
+}
+
+# marcă -> model canonic -> (alias-uri, generații [(an început, nume)])
+MODELS: Dict[str, Dict[str, Tuple[List[str], List[Tuple[int, str]]]]] = {
+    "volkswagen": {
+        "golf": (["golf"], [(1997, "Mk4"), (2003, "Mk5"), (2008, "Mk6"), (2012, "Mk7"), (2019, "Mk8")]),
+        "passat": (["passat"], [(2005, "B6"), (2010, "B7"), (2014, "B8")]),
+        "polo": (["polo"], [(2009, "Mk5"), (2017, "Mk6")]),
+        "tiguan": (["tiguan"], [(2007, "I"), (2016, "II")]),
+        "touran": (["touran"], []),
+        "jetta": (["jetta"], []),
+        "id.3": (["id3", "id 3"], []),
+    },
+    "mercedes-benz": {
+        "a-class": (["a class", "clasa a", "a180", "a200"], []),
+        "c-class": (["c class", "clasa c", "c180", "c200", "c220"], [(2007, "W204"), (2014, "W205"), (2021, "W206")]),
+        "e-class": (["e class", "clasa e", "e200", "e220", "e300"], [(2009, "W212"), (2016, "W213"), (2023, "W214")]),
+        "s-class": (["s class", "clasa s", "s350", "s500"], [(2005, "W221"), (2013, "W222"), (2020, "W223")]),
+        "gla": (["gla"], []),
+    },
+    "bmw": {
+        "3 series": (["3 series", "seria 3", "series 3", "3er", "318d", "320d", "320i", "330i"], [(2005, "E90"), (2012, "F30"), (2019, "G20")]),
+        "5 series": (["5 series", "seria 5", "series 5", "5er", "520d", "530d"], [(2003, "E60"), (2010, "F10"), (2017, "G30")]),
+        "x3": (["x3"], []),
+        "x5": (["x5"], [(2006, "E70"), (2013, "F15"), (2018, "G05")]),
+        "m3": (["m3"], []),
+    },
+    "audi": {
+        "a3": (["a3"], []), "a4": (["a4"], [(2007, "B8"), (2015, "B9")]), "a6": (["a6"], [(2011, "C7"), (2018, "C8")]),
+        "q5": (["q5"], []), "q7": (["q7"], []),
+    },
+    "porsche": {"911": (["911"], []), "cayenne": (["cayenne"], []), "macan": (["macan"], []), "taycan": (["taycan"], [])},
+    "dacia": {
+        "logan": (["logan"], [(2004, "I"), (2012, "II"), (2020, "III")]),
+        "sandero": (["sandero"], [(2008, "I"), (2012, "II"), (2020, "III")]),
+        "duster": (["duster"], [(2010, "I"), (2017, "II"), (2024, "III")]),
+        "spring": (["spring"], []),
+    },
+    "skoda": {
+        "octavia": (["octavia"], [(1996, "I"), (2004, "II"), (2012, "III"), (2020, "IV")]),
+        "fabia": (["fabia"], []), "superb": (["superb"], []), "kodiaq": (["kodiaq"], []),
+    },
+    "renault": {"clio": (["clio"], []), "megane": (["megane"], []), "captur": (["captur"], [])},
+    "toyota": {
+        "corolla": (["corolla"], []), "yaris": (["yaris"], []), "rav4": (["rav4", "rav 4"], []),
+        "auris": (["auris"], []), "prius": (["prius"], []),
+    },
+    "honda": {"civic": (["civic"], []), "cr-v": (["crv", "cr v"], []), "jazz": (["jazz"], []), "accord": (["accord"], [])},
+    "tesla": {
+        "model 3": (["model 3", "model3", "m3"], []), "model s": (["model s", "models"], []),
+        "model y": (["model y", "modely"], []), "model x": (["model x", "modelx"], []),
+    },
+    "ford": {"focus": (["focus"], []), "fiesta": (["fiesta"], []), "mondeo": (["mondeo"], []), "kuga": (["kuga"], [])},
+    "opel": {"astra": (["astra"], [(2004, "H"), (2009, "J"), (2015, "K")]), "corsa": (["corsa"], []), "insignia": (["insignia"], []), "vectra": (["vectra"], [])},
+    "hyundai": {"i30": (["i30", "i 30"], []), "tucson": (["tucson"], []), "santa fe": (["santa fe", "santafe"], [])},
+    "kia": {"ceed": (["ceed", "cee d"], []), "sportage": (["sportage"], [])},
+    "peugeot": {"208": (["208"], []), "308": (["308"], []), "3008": (["3008"], [])},
+    "citroen": {"c3": (["c3"], []), "c4": (["c4"], []), "c5": (["c5"], [])},
+    "fiat": {"punto": (["punto"], []), "500": (["500"], []), "panda": (["panda"], [])},
+    "volvo": {"xc60": (["xc60", "xc 60"], []), "xc90": (["xc90", "xc 90"], []), "v40": (["v40"], []), "s60": (["s60"], [])},
+    "nissan": {"qashqai": (["qashqai", "qasqai"], []), "juke": (["juke"], []), "leaf": (["leaf"], [])},
+}
+
+# Valori implicite din DiagnosticRequest care nu identifică nimic
+PLACEHOLDERS = {"", "standard", "unknown", "necunoscut", "n a", "none"}
+
+
+class VehicleName(NamedTuple):
+    make: Optional[str]
+    model: Optional[str]
+    generation: Optional[str]
+    make_distance: int
+    model_distance: int
+    raw: str
+    make_text: str = ""
+    model_text: str = ""
+
+    @property
+    def key(self) -> str:
+        """Cheie stabilă marcă|model (textul curățat pentru ce nu e recunoscut)"""
+        return f"{self.make or self.make_text or 'unknown'}|{self.model or self.model_text or 'unknown'}"
+
+    @property
+    def display(self) -> str:
+        if not self.make:
+            return self.raw
+        parts = [MAKES[self.make][0]]
+        if not self.model and self.model_text:
+            parts.append(self.model_text.title())
+        if self.model:
+            short = len(self.model) <= 3 or (len(self.model) <= 4 and not self.model.isalpha())
+            parts.append(self.model.upper() if short else self.model.title())
+        if self.generation:
+            parts.append(f"({self.generation})")
+        return " ".join(parts)
+
+
+def clean_text(text: Any) -> str:
+    """Litere mici, fără diacritice; punctuația devine spațiu"""
+    text = unicodedata.normalize("NFKD", str(text or "").lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join("".join(c if c.isalnum() else " " for c in text).split())
+
+
+# Mărcile diferă adesea prin 2 litere ("lancia"/"dacia", "smart"/"seat"): doar greșeli de o literă
+MAKE_MAX_DISTANCE = 1
+
+
+def max_distance(term: str) -> int:
+    """Distanța de editare acceptată crește cu lungimea termenului"""
+    if len(term) <= 2:
+        return 0
+    if len(term) <= 4:
+        return 1
+    return 2
+
+
+class AliasTrie:
+    """Trie peste alias-uri cu căutare Levenshtein limitată (rând DP per nod)"""
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+
+    def add(self, alias: str, value: str):
+        node = self._root
+        for char in alias:
+            node = node.setdefault(char, {})
+        node["$"] = value
+
+    def exact(self, term: str) -> Optional[str]:
+        node = self._root
+        for char in term:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node.get("$")
+
+    def matches(self, term: str, limit: int, same_first: bool = False) -> Dict[str, int]:
+        """Valoare -> distanța minimă, pentru toate alias-urile cu distanța <= limit"""
+        found: Dict[str, int] = {}
+        if not term:
+            return found
+        first_row = list(range(len(term) + 1))
+        # Termenii scurți trebuie să înceapă cu aceeași literă (mai puține fals-pozitive)
+        if same_first or len(term) <= 4:
+            start = self._root.get(term[0])
+            if start is None:
+                return found
+            stack = [(start, self._next_row(first_row, term, term[0]))]
+        else:
+            stack = [
+                (child, self._next_row(first_row, term, char))
+                for char, child in self._root.items() if char != "$"
+            ]
+
+        while stack:
+            node, row = stack.pop()
+            if "$" in node and row[-1] <= limit and row[-1] < found.get(node["$"], limit + 1):
+                found[node["$"]] = row[-1]
+            if min(row) <= limit:
+                for char, child in node.items():
+                    if char != "$":
+                        stack.append((child, self._next_row(row, term, char)))
+        return found
+
+    def fuzzy(self, term: str, limit: int) -> Optional[Tuple[int, str]]:
+        """(distanță, valoare) cea mai apropiată cu distanța <= limit"""
+        found = self.matches(term, limit)
+        if not found:
+            return None
+        value = min(found, key=found.get)
+        return found[value], value
+
+    @staticmethod
+    def _next_row(previous: List[int], term: str, char: str) -> List[int]:
+        row = [previous[0] + 1]
+        for i, term_char in enumerate(term, 1):
+            row.append(min(row[i - 1] + 1, previous[i] + 1, previous[i - 1] + (term_char != char)))
+        return row
+
+
+class VehicleNameIndex:
+    """Indexul compilat: alias-uri de mărci și, per marcă, de modele"""
+
+    def __init__(self, makes=MAKES, models=MODELS):
+        self.makes = AliasTrie()
+        self._make_aliases: Dict[str, str] = {}
+        for make, (display, aliases) in makes.items():
+            for alias in {make, clean_text(display), *aliases}:
+                alias = clean_text(alias)
+                self.makes.add(alias, make)
+                self._make_aliases[alias] = make
+        self._max_make_words = max(len(alias.split()) for alias in self._make_aliases)
+
+        self.models: Dict[str, AliasTrie] = {}
+        self._model_aliases: Dict[str, Dict[str, str]] = {}
+        self._max_model_words: Dict[str, int] = {}
+        self.generations: Dict[Tuple[str, str], Tuple[List[int], List[str]]] = {}
+        for make, make_models in models.items():
+            trie = AliasTrie()
+            aliases_map: Dict[str, str] = {}
+            for model, (aliases, generations) in make_models.items():
+                for alias in {model, *aliases}:
+                    alias = clean_text(alias)
+                    trie.add(alias, model)
+                    aliases_map[alias] = model
+                if generations:
+                    generations = sorted(generations)
+                    self.generations[(make, model)] = ([year for year, _ in generations], [name for _, name in generations])
+            self.models[make] = trie
+            self._model_aliases[make] = aliases_map
+            self._max_model_words[make] = max(len(alias.split()) for alias in aliases_map)
+
+    def _match_make(self, tokens: List[str]) -> Tuple[Optional[str], int, int]:
+        """(marcă, distanță, câte cuvinte consumă) — întâi exact, cel mai lung prefix"""
+        for size in range(min(self._max_make_words, len(tokens)), 0, -1):
+            make = self._make_aliases.get(" ".join(tokens[:size]))
+            if make:
+                return make, 0, size
+        # Aproximativ: aceeași primă literă, o singură marcă în limită (altfel textul rămâne brut)
+        for position, token in enumerate(tokens[:2]):
+            found = self.makes.matches(token, min(MAKE_MAX_DISTANCE, max_distance(token)), same_first=True)
+            if len(found) == 1:
+                (make, distance), = found.items()
+                return make, distance, position + 1
+        return None, 0, 0
+
+    def _match_model(self, make: str, tokens: List[str]) -> Tuple[Optional[str], int]:
+        aliases = self._model_aliases.get(make)
+        if not aliases or not tokens:
+            return None, 0
+        max_words = self._max_model_words[make]
+        # Orice fereastră de cuvinte (ex. "golf 1.6 tdi", "seria 3 320d")
+        for size in range(min(max_words, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                model = aliases.get(" ".join(tokens[start:start + size]))
+                if model:
+                    return model, 0
+        trie = self.models[make]
+        best: Optional[Tuple[int, str]] = None
+        for token in tokens:
+            if token.isdigit():
+                continue
+            match = trie.fuzzy(token, max_distance(token))
+            if match and (best is None or match[0] < best[0]):
+                best = match
+        return (best[1], best[0]) if best else (None, 0)
+
+    def generation(self, make: str, model: str, year: Optional[int]) -> Optional[str]:
+        entry = self.generations.get((make, model))
+        if not entry or not year:
+            return None
+        index = bisect_right(entry[0], int(year)) - 1
+        return entry[1][index] if index >= 0 else None
+
+    def normalize(self, car_type: Any, model: Any = None, year: Optional[int] = None) -> VehicleName:
+        make_text = clean_text(car_type)
+        model_text = clean_text(model)
+        make_tokens = [] if make_text in PLACEHOLDERS else make_text.split()
+        model_tokens = [] if model_text in PLACEHOLDERS else model_text.split()
+
+        make, make_distance, consumed = self._match_make(make_tokens)
+        if make is None and model_tokens:
+            # Marca scrisă în câmpul model („VW Golf” cu car_type="standard")
+            make, make_distance, consumed = self._match_make(model_tokens)
+            model_tokens = model_tokens[consumed:]
+        else:
+            # Restul din car_type poate fi modelul („vw golf”)
+            model_tokens = model_tokens or make_tokens[consumed:]
+
+        raw = " ".join(t for t in (make_text, model_text) if t not in PLACEHOLDERS)
+        if make is None:
+            return VehicleName(None, None, None, 0, 0, raw, " ".join(make_tokens), " ".join(model_tokens))
+        canonical_model, model_distance = self._match_model(make, model_tokens)
+        return VehicleName(
+            make,
+            canonical_model,
+            self.generation(make, canonical_model, year) if canonical_model else None,
+            make_distance,
+            model_distance,
+            raw,
+            make,
+            " ".join(model_tokens),
+        )
+
+
+_index: Optional[VehicleNameIndex] = None
+
+
+def get_index() -> VehicleNameIndex:
+    global _index
+    if _index is None:
+        _index = VehicleNameIndex()
+    return _index
+
+
+@lru_cache(maxsize=int(os.getenv("VEHICLE_NAME_CACHE_SIZE", "65536")))
+def normalize_vehicle(car_type: Any, model: Any = None, year: Optional[int] = None) -> VehicleName:
+    """Numele canonic (cu cache: flotele repetă aceleași combinații)"""
+    return get_index().normalize(car_type, model, year)
+
+
+def normalize_car_data(car_data: Dict[str, Any]) -> VehicleName:
+    year = car_data.get("year")
+    return normalize_vehicle(
+        str(car_data.get("car_type") or ""),
+        str(car_data.get("model") or ""),
+        int(year) if isinstance(year, (int, float)) else None,
+    )